@@ -0,0 +1,141 @@
+"""
+Benchmark of the steps of `combine` before the first prompt
+
+Uses the real files in `scraped_data/` and measures
+
+- `load_data` validating every json file (no snapshots) and loading the
+  snapshots written by that run
+- `normalize_name` of all names of all sources, without and with memo
+- `to_keydict` of all sources on freshly loaded records
+- the address index: building it and looking up every record
+- the candidate generation of `extract_combination`: building the blocking
+  indices of the target and looking up the candidates of every record
+- scoring these candidates in one process
+- the global assignment of the records of every source to the targets
+
+    python benchmarks/bench_combine.py
+"""
+
+import contextlib
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator, cast
+
+from rowo_oekostrom_recherche import assignment, combine, snapshots
+from rowo_oekostrom_recherche.addresses import AddressIndex
+from rowo_oekostrom_recherche.candidates import CandidateIndex
+from rowo_oekostrom_recherche.records import Record, Target
+from rowo_oekostrom_recherche.scoring import score
+from rowo_oekostrom_recherche.scraper import base
+from rowo_oekostrom_recherche.scraper.base import NameNormal
+
+
+@contextlib.contextmanager
+def snapshot_dir(directory: Path) -> Iterator[None]:
+    original = snapshots.SNAPSHOT_DIR
+    snapshots.SNAPSHOT_DIR = directory
+    try:
+        yield
+    finally:
+        snapshots.SNAPSHOT_DIR = original
+
+
+def timed(func: Callable[[], Any]) -> tuple[Any, float]:
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def load_all() -> dict[combine.Source, dict[NameNormal, Record]]:
+    return combine.load_data()
+
+
+def load_results(source: combine.Source) -> base.ScrapeResults:
+    model = (
+        combine.Combined if source == combine.TARGET else combine.SOURCE_TYPES[source]
+    )
+    return snapshots.load_results(base.DATA_DIR / f"{source}.json", model)
+
+
+def main() -> dict[str, float]:
+    timings: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as directory, snapshot_dir(Path(directory)):
+        base.normalize_name.cache_clear()
+        _, timings["load_data validating"] = timed(load_all)
+        base.normalize_name.cache_clear()
+        sources_data, timings["load_data snapshots"] = timed(load_all)
+        # fresh records without the cached normalized names
+        results = [load_results(source) for source in sources_data]
+    names = [r.name for data in results for r in data.results]
+
+    plain = base.normalize_name.__wrapped__  # type: ignore[attr-defined]
+    _, timings["normalize_name plain"] = timed(lambda: [plain(n) for n in names])
+    base.normalize_name.cache_clear()
+    _, timings["normalize_name memoized"] = timed(
+        lambda: [base.normalize_name(n) for n in names]
+    )
+
+    base.normalize_name.cache_clear()
+    _, timings["to_keydict"] = timed(
+        lambda: [combine.to_keydict(data) for data in results]
+    )
+
+    target_data = cast(dict[NameNormal, Target], sources_data[combine.TARGET])
+    address_index, timings["address index"] = timed(
+        lambda: AddressIndex(target_data.values())
+    )
+    hits, timings["address lookup"] = timed(
+        lambda: [
+            address_index.lookup(source, record)
+            for source, records in sources_data.items()
+            if source != combine.TARGET
+            for record in records.values()
+        ]
+    )
+
+    def build() -> tuple[CandidateIndex, CandidateIndex]:
+        return (
+            CandidateIndex(target_data),
+            CandidateIndex(v.name_normalized_plz for v in target_data.values()),
+        )
+
+    (index, index_plz), timings["candidate index"] = timed(build)
+    queries = [
+        (source, combine.match_key(name, record))
+        for source, records in sources_data.items()
+        if source != combine.TARGET
+        for name, record in records.items()
+    ]
+
+    def generate() -> list[tuple[NameNormal, set[NameNormal]]]:
+        return [
+            (query, (index_plz if with_plz else index).candidates(query))
+            for _, (query, with_plz) in queries
+        ]
+
+    candidates, timings["candidate generation"] = timed(generate)
+    scored, timings["candidate scoring"] = timed(
+        lambda: [score(query, sorted(choices)) for query, choices in candidates]
+    )
+
+    weights: dict[combine.Source, assignment.Weights] = {}
+    for (source, (query, _)), ranked in zip(queries, scored):
+        weights.setdefault(source, {})[query] = dict(ranked)
+    _, timings["assignment"] = timed(
+        lambda: [assignment.propose(w) for w in weights.values()]
+    )
+
+    mean = sum(len(c) for _, c in candidates) / len(candidates)
+    print(
+        f"{len(names)} records, {len(queries)} queries, "
+        f"{mean:.1f} candidates per query of {len(index)} targets, "
+        f"{sum(hit is not None for hit in hits)} found by address"
+    )
+    for label, seconds in timings.items():
+        print(f"  {label:<24} {seconds * 1000:9.1f} ms")
+    return timings
+
+
+if __name__ == "__main__":
+    main()
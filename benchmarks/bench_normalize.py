@@ -0,0 +1,91 @@
+"""
+Micro benchmark of the name normalization
+
+Uses all names in `scraped_data/rowo2019.json` and compares
+
+- the plain `normalize_name` (chained str.replace, no memo)
+- single pass alternatives with str.translate and a regex
+- the memoized `normalize_name`
+- repeated access of `AnbieterBase.name_normalized` with and without
+  the per instance cache
+
+    python benchmarks/bench_normalize.py
+"""
+
+import json
+import re
+import timeit
+
+from rowo_oekostrom_recherche.scraper import base
+
+plain = base.normalize_name.__wrapped__  # type: ignore[attr-defined]
+
+_translation = str.maketrans(
+    {k: v for k, v in base.replaces.items() if len(k) == 1}
+)
+_regex = re.compile("|".join(re.escape(k) for k in base.replaces))
+
+
+def remove_words(name: str) -> base.NameNormal:
+    return base.NameNormal(
+        " ".join([w for w in name.split(" ") if w not in base.word_to_remove])
+    )
+
+
+def normalize_translate(name: str) -> base.NameNormal:
+    name = name.lower()
+    if name[0].isnumeric():
+        name = f"_ {name}"
+    return remove_words(name.translate(_translation).replace("marke der", ""))
+
+
+def normalize_regex(name: str) -> base.NameNormal:
+    name = name.lower()
+    if name[0].isnumeric():
+        name = f"_ {name}"
+    return remove_words(_regex.sub(lambda m: base.replaces[m.group()], name))
+
+
+def load_names() -> list[str]:
+    data = json.loads(base.DATA_DIR.joinpath("rowo2019.json").read_text())
+    return [r["name"] for r in data["results"]]
+
+
+def main(number: int = 20) -> dict[str, float]:
+    names = load_names()
+    for name in names:
+        expected = plain(name)
+        assert normalize_translate(name) == expected, name
+        assert normalize_regex(name) == expected, name
+        assert base.normalize_name(name) == expected, name
+
+    def run(func):  # type: ignore[no-untyped-def]
+        return timeit.timeit(lambda: [func(n) for n in names], number=number)
+
+    timings = {
+        "plain": run(plain),
+        "translate": run(normalize_translate),
+        "regex": run(normalize_regex),
+        "memoized": run(base.normalize_name),
+    }
+    records = [base.AnbieterBase(name=n) for n in names]
+    # 10 accesses per record, like combine does
+    timings["property_uncached"] = timeit.timeit(
+        lambda: [plain(r.name) for r in records for _ in range(10)],
+        number=number,
+    )
+    timings["property_cached"] = timeit.timeit(
+        lambda: [r.name_normalized for r in records for _ in range(10)],
+        number=number,
+    )
+
+    print(f"{len(names)} names, {number} rounds")
+    for label, seconds in timings.items():
+        baseline = "property_uncached" if "property" in label else "plain"
+        speedup = timings[baseline] / seconds
+        print(f"  {label:<18} {seconds * 1000:8.1f} ms  ({speedup:5.1f}x)")
+    return timings
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark of the targeted subtree parsing against parsing the full page
+
+Runs the parse functions of okpower, oekotest and verivox on the recorded
+pages (see `fixtures.py`), once as they are and once with every page parsed
+into a full tree with `html.parser` (the previous behaviour).
+For stromauskunft, extracting all rows with one lightweight extractor is
+compared with building a soup for every row.
+Compares the time and the peak memory and ensures both return the same
+results.
+
+    python benchmarks/bench_parse.py
+"""
+
+import contextlib
+import json
+import time
+import traceback
+import tracemalloc
+from typing import Any, Callable, Iterator
+
+import bs4
+import httpx
+
+from rowo_oekostrom_recherche.scraper import (
+    oekotest,
+    okpower,
+    parse,
+    stromauskunft,
+    verivox,
+)
+from rowo_oekostrom_recherche.scraper.models import Stromauskunft
+
+import fixtures
+
+SCRAPER_MODULES = (okpower, oekotest, verivox)
+VERIVOX_PAGES = 200
+
+
+@contextlib.contextmanager
+def full_tree(
+    content: bytes | str, strainer: bs4.SoupStrainer
+) -> Iterator[bs4.BeautifulSoup]:
+    yield bs4.BeautifulSoup(content, "html.parser")
+
+
+@contextlib.contextmanager
+def parsing_full_tree() -> Iterator[None]:
+    for module in SCRAPER_MODULES:
+        setattr(module, "parse_only", full_tree)
+    try:
+        yield
+    finally:
+        for module in SCRAPER_MODULES:
+            setattr(module, "parse_only", parse.parse_only)
+
+
+def measure(func: Callable[[], Any]) -> tuple[Any, float, int]:
+    """
+    Run `func` and return its result, the seconds and the peak memory in bytes
+
+    Memory is measured in a second run, as tracing slows down parsing a lot.
+    """
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def soup_per_row(row: int, elements: list[str | int]) -> Stromauskunft | None:
+    """
+    The previous conversion of a stromauskunft row, building a soup
+    """
+    data = elements[1]
+    assert isinstance(data, str)
+    try:
+        soup = bs4.BeautifulSoup(data, "html.parser")
+        links = soup.find_all("a")
+        name = links[0]["title"]
+        portal_url = stromauskunft.BASE_URL + links[0]["href"].lstrip("/")
+
+        street = soup.select(".carrier-street")[0].text
+        plz_city = soup.select(".carrier-city")[0].text
+        return Stromauskunft(
+            name=name,
+            street=street,
+            city=plz_city.partition(" ")[2],
+            plz=plz_city.partition(" ")[0],
+            portal_url=portal_url,
+        )
+    except Exception:
+        print(f"Failed checking row {row}")
+        traceback.print_exc()
+        return None
+
+
+def on_full_tree(func: Callable[[], Any]) -> Callable[[], Any]:
+    def run() -> Any:
+        with parsing_full_tree():
+            return func()
+
+    return run
+
+
+def cases(
+    pages: fixtures.Pages,
+) -> dict[str, tuple[Callable[[], Any], Callable[[], Any]]]:
+    """
+    Get the previous and the current implementation of every case
+    """
+    detail_urls = [url for url in pages if url.startswith(verivox.DOMAIN)][1:]
+
+    def verivox_details() -> list[Any]:
+        return [
+            verivox.parse_address(
+                httpx.Response(
+                    200, content=pages[url], request=httpx.Request("GET", url)
+                )
+            )
+            for url in detail_urls
+        ]
+
+    rows = json.loads(pages[stromauskunft.DATA_URL])["data"]
+    scrapers: dict[str, Callable[[], Any]] = {
+        "okpower": lambda: okpower.parse_page(pages[okpower.BASE_URL]),
+        "oekotest": lambda: oekotest.parse_page(pages[oekotest.BASE_URL]),
+        "verivox list": lambda: verivox.parse_carriers(pages[verivox.BASE_URL]),
+        f"verivox {len(detail_urls)} details": verivox_details,
+    }
+    return {
+        **{label: (on_full_tree(func), func) for label, func in scrapers.items()},
+        f"stromauskunft {len(rows)} rows": (
+            lambda: [soup_per_row(i, r) for i, r in enumerate(rows)],
+            lambda: stromauskunft.convert_all(rows),
+        ),
+    }
+
+
+def main() -> dict[str, dict[str, float]]:
+    pages = fixtures.recorded_pages(verivox_limit=VERIVOX_PAGES)
+    print(f"Parser: {parse.PARSER}")
+    print(
+        f"{'case':<26} {'before ms':>9} {'after ms':>9}"
+        f" {'before MiB':>10} {'after MiB':>9}"
+    )
+    results: dict[str, dict[str, float]] = {}
+    # the scrapers log every parsed entry
+    with contextlib.redirect_stdout(None):
+        measured = {}
+        for label, (reference, func) in cases(pages).items():
+            expected, full_seconds, full_peak = measure(reference)
+            result, seconds, peak = measure(func)
+            assert result == expected, label
+            measured[label] = (full_seconds, seconds, full_peak, peak)
+    for label, (full_seconds, seconds, full_peak, peak) in measured.items():
+        results[label] = {
+            "full_seconds": full_seconds,
+            "seconds": seconds,
+            "full_peak": full_peak,
+            "peak": peak,
+        }
+        print(
+            f"{label:<26} {full_seconds * 1000:9.1f} {seconds * 1000:9.1f} "
+            f"{full_peak / 2**20:10.1f} {peak / 2**20:9.1f}"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark of the scrapers against the local stand-in server
+
+Runs `scrape()` of every scraper end to end on the recorded pages (see
+`fixtures.py` and `server.py`), so fetching through the shared client,
+parsing and validating are measured without network access.
+The results must be the same as the scraped results in `scraped_data/`,
+apart from the error notes of records whose page could not be fetched when
+they were scraped.
+
+    python benchmarks/bench_scrapers.py
+"""
+
+import contextlib
+import json
+import time
+from typing import Any
+
+from rowo_oekostrom_recherche.scraper import base
+
+import fixtures
+import server
+
+
+def stored_results(source: str) -> list[dict[str, Any]]:
+    data = json.loads(base.DATA_DIR.joinpath(f"{source}.json").read_text())
+    return data["results"]
+
+
+def comparable(record: dict[str, Any]) -> dict[str, Any]:
+    if not (record["street"] or record["plz"] or record["city"]):
+        # failed to fetch, the error is not part of the recorded page
+        return {**record, "note": ""}
+    return record
+
+
+def main() -> dict[str, float]:
+    pages = fixtures.recorded_pages()
+    timings: dict[str, float] = {}
+    records: dict[str, int] = {}
+    with server.stand_in(pages):
+        for module in fixtures.SCRAPER_MODULES:
+            # the scrapers log every fetched page and print the errors of
+            # the pages failing on purpose
+            with contextlib.redirect_stdout(None), contextlib.redirect_stderr(None):
+                start = time.perf_counter()
+                data = module.scrape()
+                timings[module.SCRAPER] = time.perf_counter() - start
+            results = [comparable(r.model_dump(mode="json")) for r in data.results]
+            expected = [comparable(r) for r in stored_results(module.SCRAPER)]
+            assert results == expected, module.SCRAPER
+            records[module.SCRAPER] = len(results)
+
+    print(f"{'scraper':<15} {'records':>8} {'ms':>9}")
+    for scraper, seconds in timings.items():
+        print(f"{scraper:<15} {records[scraper]:>8} {seconds * 1000:9.1f}")
+    return timings
+
+
+if __name__ == "__main__":
+    main()
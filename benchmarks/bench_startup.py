@@ -0,0 +1,88 @@
+"""
+Benchmark of the startup of combine and the scrapers
+
+Every value is measured in a fresh interpreter:
+
+- the import time of `combine`, `scraper.manager` and a scraper module
+- the time until combine shows the first prompt, with an empty selection
+  file (so the first record needing a decision is asked for) and the
+  snapshots of `scraped_data` in place
+
+The heavy modules (httpx, bs4, pandas, numpy) imported by combine are
+listed, there should be none.
+
+    python benchmarks/bench_startup.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+HEAVY_MODULES = ("httpx", "bs4", "pandas", "numpy")
+IMPORTS = {
+    "import combine": "rowo_oekostrom_recherche.combine",
+    "import manager": "rowo_oekostrom_recherche.scraper.manager",
+    "import okpower": "rowo_oekostrom_recherche.scraper.okpower",
+}
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+# answers the first prompt by reporting the time and exiting, so nothing is
+# written by combine
+PROMPT_SCRIPT = """
+import builtins, json, os, tempfile, time
+from pathlib import Path
+start = time.perf_counter()
+from rowo_oekostrom_recherche import combine
+from rowo_oekostrom_recherche.selections import SelectionStore
+
+directory = tempfile.mkdtemp()
+combine.SelectionStore = lambda: SelectionStore(Path(directory) / "selections.csv")
+
+def first_prompt(prompt=""):
+    print(json.dumps({"seconds": time.perf_counter() - start}), flush=True)
+    os._exit(0)
+
+builtins.input = first_prompt
+combine.combine()
+"""
+
+
+def run(script: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(script)],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "ROWO_METRICS": "0"},
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> dict[str, float]:
+    timings: dict[str, float] = {}
+    for label, module in IMPORTS.items():
+        measured = run(IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES))
+        timings[label] = measured["seconds"]
+        if label == "import combine" and measured["heavy"]:
+            print(f"  combine imports {', '.join(measured['heavy'])}")
+    # the first run might write the snapshots
+    run(PROMPT_SCRIPT)
+    timings["first prompt"] = run(PROMPT_SCRIPT)["seconds"]
+    for label, seconds in timings.items():
+        print(f"  {label:<24} {seconds * 1000:9.1f} ms")
+    return timings
+
+
+if __name__ == "__main__":
+    main()
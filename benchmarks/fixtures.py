@@ -0,0 +1,237 @@
+"""
+Pages of the scraped portals for offline benchmarks
+
+`recorded_pages()` returns the pages recorded in `recorded/`, one compressed
+json file per scraper mapping the URLs to the page content.
+
+They are recorded with
+
+    python benchmarks/fixtures.py
+
+from the HTTP cache of the scrapers (`scraped_data/http_cache`). For pages
+never stored there, an equivalent page is rebuilt from the scraped results in
+`scraped_data/*.json`, using the markup the scrapers expect and the usual
+amount of page chrome around it.
+"""
+
+import html
+import json
+import lzma
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from rowo_oekostrom_recherche.scraper import (
+    base,
+    oekotest,
+    okpower,
+    stromauskunft,
+    verivox,
+)
+from rowo_oekostrom_recherche.scraper.http_cache import ResponseCache
+
+Pages = dict[str, bytes]
+
+RECORDED_DIR = Path(__file__).parent / "recorded"
+# the scrapers fetching pages from the portals
+SCRAPER_MODULES = (okpower, oekotest, stromauskunft, verivox)
+
+
+def _results(source: str) -> list[dict[str, Any]]:
+    data = json.loads(base.DATA_DIR.joinpath(f"{source}.json").read_text())
+    return data["results"]
+
+
+def _e(text: str) -> str:
+    return html.escape(text, quote=True)
+
+
+def _chrome(title: str, body: str) -> bytes:
+    """
+    Wrap `body` in head, navigation and footer like a portal page
+    """
+    nav = "".join(
+        f'<li class="nav-item"><a class="nav-link" href="/rubrik/{i}/">'
+        f"Rubrik {i}</a><ul>"
+        + "".join(
+            f'<li><a href="/rubrik/{i}/{j}/">Unterpunkt {j}</a></li>'
+            for j in range(8)
+        )
+        + "</ul></li>"
+        for i in range(40)
+    )
+    teaser = "".join(
+        f'<div class="teaser"><h3>Ratgeber {i}</h3><p>'
+        + "Lorem ipsum dolor sit amet, consetetur sadipscing elitr. " * 6
+        + f'</p><a class="more" href="/ratgeber/{i}/">mehr</a></div>'
+        for i in range(30)
+    )
+    script = "var config = {" + ",".join(f'"k{i}": {i}' for i in range(500)) + "};"
+    return (
+        "<!DOCTYPE html><html lang='de'><head><meta charset='utf-8'>"
+        f"<title>{_e(title)}</title>"
+        "<link rel='stylesheet' href='/static/main.css'>"
+        f"<script>{script}</script></head><body>"
+        f"<header><nav><ul class='nav'>{nav}</ul></nav></header>"
+        f"<main>{body}</main><aside>{teaser}</aside>"
+        "<footer><p>Impressum - Datenschutz - Kontakt</p></footer>"
+        "</body></html>"
+    ).encode()
+
+
+def okpower_page() -> bytes:
+    tables = []
+    for r in _results("okpower"):
+        rows = [
+            (
+                _e(r["name"]),
+                (
+                    f'<a href="{_e(r["tarif_url"].removeprefix(okpower.DOMAIN + "/"))}">'
+                    f'{_e(r["tarif"])}</a>'
+                    if r["tarif_url"]
+                    else _e(r["tarif"])
+                ),
+            ),
+            (_e(r["street"]), _e(r["cert_info"])),
+            (_e(f'{r["plz"]} {r["city"]}'), f'Tel. {_e(r["phone"])}'),
+            ("", f'Fax {_e(r["fax"])}'),
+            ("", _e(r["mail"])),
+            ("", f'<a href="{_e(r["homepage"])}">{_e(r["homepage"])}</a>'),
+        ]
+        tables.append(
+            '<div class="anbieter"><table>'
+            + "".join(f"<tr><td>{a}</td><td>{b}</td></tr>" for a, b in rows)
+            + "</table></div>"
+        )
+    return _chrome("Anbieter", f'<div id="anbieterliste">{"".join(tables)}</div>')
+
+
+def oekotest_page() -> bytes:
+    links = "".join(
+        f'<a class="product-link" data-grade="{_e(r["bewertung"])}" '
+        f'href="{_e(r["tarif_url"].removeprefix(oekotest.DOMAIN))}">'
+        f'<span class="product-distributor">{_e(r["name"])}</span>'
+        f'<span class="product-name">{_e(r["tarif"])}</span></a>'
+        for r in _results("oekotest")
+    )
+    return _chrome("Ökostrom Test", f'<div class="products">{links}</div>')
+
+
+def stromauskunft_data() -> bytes:
+    rows = [
+        [
+            i,
+            f'<a title="{_e(r["name"])}" '
+            f'href="/{_e(r["portal_url"].removeprefix(stromauskunft.BASE_URL))}">'
+            f'<img src="/logo/{i}.png"></a>'
+            f'<span class="carrier-street">{_e(r["street"])}</span>'
+            f'<span class="carrier-city">{_e(r["plz"])} {_e(r["city"])}</span>',
+            "",
+        ]
+        for i, r in enumerate(_results("stromauskunft"))
+    ]
+    return json.dumps({"data": rows}).encode()
+
+
+def verivox_pages(limit: int | None = None) -> Pages:
+    results = _results("verivox")[:limit]
+    entries = "".join(
+        f'<a class="carrier-list-entry" '
+        f'href="{_e(r["portal_url"].removeprefix(verivox.DOMAIN + "/"))}">'
+        f'{_e(r["name"])}</a>'
+        for r in results
+    )
+    pages = {verivox.BASE_URL: _chrome("Stromanbieter", entries)}
+    for r in results:
+        address = "<br>".join(
+            _e(line)
+            for line in (r["name"], *r["street"].split("\n"), f'{r["plz"]} {r["city"]}')
+            if line.strip()
+        )
+        pages[r["portal_url"]] = _chrome(
+            r["name"], f'<div class="carrier-address">{address}</div>'
+        )
+    return pages
+
+
+def synthetic_pages(verivox_limit: int | None = None) -> Pages:
+    return {
+        okpower.BASE_URL: okpower_page(),
+        oekotest.BASE_URL: oekotest_page(),
+        stromauskunft.DATA_URL: stromauskunft_data(),
+        **verivox_pages(verivox_limit),
+    }
+
+
+def captured_pages(verivox_limit: int | None = None) -> Pages:
+    """
+    Pages of the HTTP cache, falling back to rebuilt ones where nothing is cached
+    """
+    cache = ResponseCache()
+    pages = synthetic_pages(verivox_limit)
+    for url in pages:
+        cached = cache.load(url)
+        if cached is not None:
+            pages[url] = cached[1]
+    return pages
+
+
+def scraper_of(url: str) -> str:
+    host = httpx.URL(url).host
+    for module in SCRAPER_MODULES:
+        if httpx.URL(module.BASE_URL).host == host:
+            return module.SCRAPER
+    raise ValueError(f"No scraper for {url}")
+
+
+def recording(scraper: str) -> Path:
+    return RECORDED_DIR / f"{scraper}.json.xz"
+
+
+def record() -> None:
+    """
+    Store the captured pages of all scrapers in `RECORDED_DIR`
+    """
+    by_scraper: dict[str, dict[str, str]] = {}
+    for url, content in captured_pages().items():
+        by_scraper.setdefault(scraper_of(url), {})[url] = content.decode()
+    RECORDED_DIR.mkdir(exist_ok=True)
+    for scraper, pages in sorted(by_scraper.items()):
+        # xz compresses the page chrome repeated on every page a lot better
+        # than gzip
+        recording(scraper).write_bytes(
+            lzma.compress(json.dumps(pages, indent=0).encode())
+        )
+        print(f"{scraper}: {len(pages)} pages")
+
+
+def recorded_pages(verivox_limit: int | None = None) -> Pages:
+    """
+    Recorded pages of all scrapers, captured ones for scrapers not recorded
+
+    `verivox_limit` limits the number of verivox detail pages.
+    """
+    pages: Pages = {}
+    for module in SCRAPER_MODULES:
+        path = recording(module.SCRAPER)
+        if not path.exists():
+            print(f"No recorded pages for {module.SCRAPER}, using captured ones")
+            pages.update(
+                (url, content)
+                for url, content in captured_pages(verivox_limit).items()
+                if scraper_of(url) == module.SCRAPER
+            )
+            continue
+        recorded: dict[str, str] = json.loads(lzma.decompress(path.read_bytes()))
+        urls = list(recorded)
+        if module is verivox and verivox_limit is not None:
+            urls = [verivox.BASE_URL] + [
+                url for url in urls if url != verivox.BASE_URL
+            ][:verivox_limit]
+        pages.update((url, recorded[url].encode()) for url in urls)
+    return pages
+
+
+if __name__ == "__main__":
+    record()
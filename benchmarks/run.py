@@ -0,0 +1,113 @@
+"""
+Run the benchmarks and keep their results
+
+Every run appends one line to `results.jsonl` with the commit, the machine
+and all measured values. The values are compared with the last stored run
+of the same machine, values getting slower than `REGRESSION_FACTOR` are
+marked, so regressions between commits are visible.
+
+    python benchmarks/run.py [suite ...]
+
+Without suites, all are run. Nothing is stored with `--no-store`.
+"""
+
+import datetime
+import json
+import platform
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+import bench_combine
+import bench_normalize
+import bench_parse
+import bench_scrapers
+import bench_startup
+
+RESULTS_FILE = Path(__file__).parent / "results.jsonl"
+REGRESSION_FACTOR = 1.25
+
+SUITES: dict[str, Callable[[], dict[str, Any]]] = {
+    "normalize": bench_normalize.main,
+    "parse": bench_parse.main,
+    "scrapers": bench_scrapers.main,
+    "combine": bench_combine.main,
+    "startup": bench_startup.main,
+}
+
+
+def git(*args: str) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def flatten(values: dict[str, Any], prefix: str) -> dict[str, float]:
+    flat: dict[str, float] = {}
+    for key, value in values.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}/{key}"))
+        else:
+            flat[f"{prefix}/{key}"] = float(value)
+    return flat
+
+
+def previous_run(machine: str) -> dict[str, Any] | None:
+    if not RESULTS_FILE.exists():
+        return None
+    previous = None
+    for line in RESULTS_FILE.read_text().splitlines():
+        if line.strip():
+            run = json.loads(line)
+            if run["machine"] == machine:
+                previous = run
+    return previous
+
+
+def compare(results: dict[str, float], previous: dict[str, Any] | None) -> None:
+    if previous is None:
+        print("No previous run on this machine to compare with")
+        return
+    print(f"\nCompared with {previous['commit'][:10]} ({previous['date']})")
+    for key, value in results.items():
+        before = previous["results"].get(key)
+        if not before:
+            continue
+        factor = value / before
+        mark = "  <-- REGRESSION" if factor > REGRESSION_FACTOR else ""
+        print(f"  {key:<50} {before:12.4f} {value:12.4f} {factor:6.2f}x{mark}")
+
+
+def main(suites: list[str], store: bool = True) -> None:
+    results: dict[str, float] = {}
+    for suite in suites or SUITES:
+        print(f"### {suite}")
+        results.update(flatten(SUITES[suite](), suite))
+    machine = f"{platform.node()}|{platform.machine()}|{platform.python_version()}"
+    compare(results, previous_run(machine))
+    if not store:
+        return
+    run = {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": machine,
+        "suites": suites or list(SUITES),
+        "results": results,
+    }
+    with RESULTS_FILE.open("a") as f:
+        f.write(json.dumps(run) + "\n")
+    print(f"Stored results in {RESULTS_FILE.name}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main([a for a in args if a != "--no-store"], store="--no-store" not in args)
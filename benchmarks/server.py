@@ -0,0 +1,184 @@
+"""
+Local stand-in for the scraped portals
+
+`stand_in(pages)` serves the recorded pages (see `fixtures.py`) over HTTP on
+localhost and routes every request of the scrapers to it. The scrapers run
+unchanged, including the shared client with cache and request policy, but
+never touch the network.
+
+A portal URL is served below `/<scheme>/<host>/<path>`, e.g.
+`https://www.ok-power.de/x.html` as `http://127.0.0.1:<port>/https/www.ok-power.de/x.html`.
+"""
+
+import contextlib
+import http.server
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import httpx
+
+from rowo_oekostrom_recherche.scraper import http_cache
+from rowo_oekostrom_recherche.scraper.base import RequestPolicy
+
+import fixtures
+
+# no rate limit and no retries, every request is answered locally
+POLICY = RequestPolicy(rate=1_000_000.0, burst=1_000_000, retries=0, timeout=10.0)
+
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    server: "FixtureServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        scheme, _, rest = self.path.lstrip("/").partition("/")
+        body = self.server.pages.get(f"{scheme}://{rest}")
+        if body is None:
+            self.send_error(404)
+            return
+        is_json = body.lstrip()[:1] in (b"{", b"[")
+        self.send_response(200)
+        self.send_header(
+            "Content-Type",
+            "application/json" if is_json else "text/html; charset=utf-8",
+        )
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class FixtureServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, pages: fixtures.Pages) -> None:
+        super().__init__(("127.0.0.1", 0), FixtureHandler)
+        self.pages = pages
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+
+@contextlib.contextmanager
+def serving(pages: fixtures.Pages) -> Iterator[FixtureServer]:
+    server = FixtureServer(pages)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+class RedirectTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    Transport sending every request to the stand-in server
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.base_url = base_url
+        self.transport = transport
+        self.async_transport = async_transport
+
+    def _redirect(self, request: httpx.Request) -> httpx.Request:
+        url = request.url
+        return httpx.Request(
+            request.method,
+            f"{self.base_url}/{url.scheme}/{url.netloc.decode()}"
+            f"{url.raw_path.decode()}",
+            headers=request.headers,
+            stream=request.stream,
+            extensions=request.extensions,
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        assert self.transport is not None, "No sync transport configured"
+        return self.transport.handle_request(self._redirect(request))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        assert self.async_transport is not None, "No async transport configured"
+        return await self.async_transport.handle_async_request(
+            self._redirect(request)
+        )
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+
+    async def aclose(self) -> None:
+        if self.async_transport is not None:
+            await self.async_transport.aclose()
+
+
+@contextlib.contextmanager
+def stand_in(pages: fixtures.Pages) -> Iterator[FixtureServer]:
+    """
+    Serve `pages` and let the scrapers fetch from there
+
+    Responses are cached in a temporary directory, so the HTTP cache of the
+    real runs is neither used nor changed.
+    """
+    with serving(pages) as server, tempfile.TemporaryDirectory() as cache_dir:
+        cache = http_cache.ResponseCache(Path(cache_dir))
+        client = httpx.Client(
+            transport=http_cache.CachingTransport(
+                cache,
+                transport=http_cache.PolicyTransport(
+                    RedirectTransport(
+                        server.base_url, transport=httpx.HTTPTransport()
+                    ),
+                    POLICY,
+                ),
+            ),
+            timeout=POLICY.timeout,
+        )
+
+        def get_client() -> httpx.Client:
+            return client
+
+        def get_async_client(limits: httpx.Limits | None = None) -> httpx.AsyncClient:
+            return httpx.AsyncClient(
+                transport=http_cache.CachingTransport(
+                    cache,
+                    async_transport=http_cache.PolicyTransport(
+                        RedirectTransport(
+                            server.base_url,
+                            async_transport=httpx.AsyncHTTPTransport(
+                                limits=limits or httpx.Limits()
+                            ),
+                        ),
+                        POLICY,
+                    ),
+                ),
+                timeout=POLICY.timeout,
+            )
+
+        # the scrapers import the functions of `http_cache` directly
+        patched = {"get_client": get_client, "get_async_client": get_async_client}
+        originals = {
+            (module, name): getattr(module, name)
+            for module in fixtures.SCRAPER_MODULES
+            for name in patched
+            if hasattr(module, name)
+        }
+        for module, name in originals:
+            setattr(module, name, patched[name])
+        try:
+            yield server
+        finally:
+            for (module, name), original in originals.items():
+                setattr(module, name, original)
+            client.close()
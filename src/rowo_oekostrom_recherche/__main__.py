@@ -0,0 +1,5 @@
+import sys
+
+from rowo_oekostrom_recherche.cli import main
+
+sys.exit(main())
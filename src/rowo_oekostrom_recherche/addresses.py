@@ -0,0 +1,117 @@
+"""
+Address index to match records exactly before the fuzzy matching
+
+Most sources (okpower, stromauskunft, verivox) have the address of the
+provider. The index keys the targets by
+
+- PLZ and normalized street
+- normalized city and street (the PLZ of a city often differs between
+  the sources)
+
+A record is matched by a lookup if exactly one target has its address and
+the names are similar enough (`MIN_NAME_SCORE`). The last check keeps
+brands ("… - eine Marke der …") and companies sharing a building from
+being matched with each other. Lookups and hits are counted per source.
+New entries of the combined table are added while combining, so the
+records of the later sources find them, too.
+"""
+
+import re
+from collections import Counter
+from typing import Iterable
+
+from thefuzz import fuzz
+
+from rowo_oekostrom_recherche import metrics
+from rowo_oekostrom_recherche.records import Record
+
+# minimal `fuzz.ratio` of the normalized names of record and target
+MIN_NAME_SCORE = 85
+
+UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+STREET = re.compile(r"str(asse|\.)")
+PARENTHESES = re.compile(r"\(.*?\)")
+NOT_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+AddressKey = tuple[str, str]
+
+
+def normalize_street(street: str) -> str:
+    """
+    Street and number without spaces and punctuation, "str" for Straße
+
+    e.g. "Alexander-Fleming-Straße 2" and "Alexander Fleming Str.2" are
+    both "alexanderflemingstr2"
+    """
+    street = STREET.sub("str", street.lower().translate(UMLAUTS))
+    return NOT_ALPHANUMERIC.sub("", street)
+
+
+def normalize_city(city: str) -> str:
+    city = PARENTHESES.sub("", city.lower().translate(UMLAUTS))
+    return NOT_ALPHANUMERIC.sub("", city)
+
+
+def address_keys(record: Record) -> list[AddressKey]:
+    street = normalize_street(record.get("street", ""))
+    if not street:
+        return []
+    keys = []
+    if record.plz:
+        keys.append((record.plz, street))
+    city = normalize_city(record.get("city", ""))
+    if city:
+        keys.append((city, street))
+    return keys
+
+
+class AddressIndex:
+    def __init__(self, targets: Iterable[Record] = ()) -> None:
+        # targets by (PLZ, street) and (city, street), a PLZ never looks
+        # like a normalized city
+        self.by_address: dict[AddressKey, list[Record]] = {}
+        self.lookups: Counter[str] = Counter()
+        self.hits: Counter[str] = Counter()
+        for target in targets:
+            self.add(target)
+
+    def add(self, target: Record) -> None:
+        for key in address_keys(target):
+            found = self.by_address.setdefault(key, [])
+            if target not in found:
+                found.append(target)
+
+    def find(self, record: Record) -> Record | None:
+        """
+        The only target at the address of `record` with a similar name
+        """
+        for key in address_keys(record):
+            found = self.by_address.get(key, [])
+            if len(found) != 1:
+                # nobody or several providers at this address
+                continue
+            target = found[0]
+            score = fuzz.ratio(record.name_normalized, target.name_normalized)
+            if score >= MIN_NAME_SCORE:
+                return target
+        return None
+
+    def lookup(self, source: str, record: Record) -> Record | None:
+        """
+        `find`, counting the lookups and hits of `source`
+        """
+        if not address_keys(record):
+            return None
+        self.lookups[source] += 1
+        metrics.count("address_lookup", source=source)
+        target = self.find(record)
+        if target is not None:
+            self.hits[source] += 1
+            metrics.count("address_hit", source=source)
+        return target
+
+    def print_report(self) -> None:
+        print(f"{'source':<15} {'lookups':>8} {'hits':>8} {'rate':>6}")
+        for source, lookups in sorted(self.lookups.items()):
+            hits = self.hits[source]
+            print(f"{source:<15} {lookups:>8} {hits:>8} {hits / lookups:>6.0%}")
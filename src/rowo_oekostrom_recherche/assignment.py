@@ -0,0 +1,145 @@
+"""
+Global one-to-one assignment of the records of a source to the targets
+
+Matching the records one after another lets an early, weak match take a
+target that a later record matches a lot better. Instead, all records are
+assigned at once, maximizing the sum of the scores (Hungarian method with
+shortest augmenting paths on the sparse score graph). Every record may also
+stay unmatched.
+
+A pair of the assignment is only as certain as its closest competitor:
+another target the record could take or another record that could take the
+target (see `propose`).
+"""
+
+import heapq
+import itertools
+
+from pydantic import BaseModel
+
+# scores of the candidates by record and target
+Weights = dict[str, dict[str, int]]
+
+# the cost of a pair is MAX_SCORE - score, staying unmatched costs MAX_SCORE
+MAX_SCORE = 100
+
+
+class Proposal(BaseModel):
+    target: str
+    score: int
+    # best score of a competing pair, 0 if there is none
+    competing: int
+
+
+def assign(weights: Weights) -> dict[str, str]:
+    """
+    Optimal one-to-one assignment of the records to the targets
+
+    The records are added one after another. Every record takes the cheapest
+    alternating path to a free target (or to a record left unmatched), which
+    may move already assigned records to other targets. Potentials of the
+    records and targets keep the reduced costs non-negative, so the path is
+    found with Dijkstra only visiting the affected part of the graph.
+    """
+    row_potential: dict[str, int] = {}
+    col_potential: dict[str, int] = {}
+    owner: dict[str, str] = {}
+    assigned: dict[str, str | None] = {}
+    tie = itertools.count()
+    for record in weights:
+        dist: dict[str, int] = {}
+        # the record reaching a target on the path
+        path: dict[str, str] = {}
+        scanned: dict[str, int] = {}
+        scanned_rows: list[str] = []
+        heap: list[tuple[int, int, str]] = []
+        # cheapest record to leave unmatched and its distance
+        unmatch: tuple[int, str] | None = None
+        sink: str | None = None
+        row, min_val = record, 0
+        while True:
+            scanned_rows.append(row)
+            base = min_val - row_potential.get(row, 0)
+            for target, score in weights[row].items():
+                if target in scanned:
+                    continue
+                d = base + MAX_SCORE - score - col_potential.get(target, 0)
+                if d < dist.get(target, d + 1):
+                    dist[target] = d
+                    path[target] = row
+                    heapq.heappush(heap, (d, next(tie), target))
+            if unmatch is None or base + MAX_SCORE < unmatch[0]:
+                unmatch = (base + MAX_SCORE, row)
+            while heap and (heap[0][2] in scanned or heap[0][0] != dist[heap[0][2]]):
+                heapq.heappop(heap)
+            if not heap or heap[0][0] > unmatch[0]:
+                min_val = unmatch[0]
+                break
+            min_val, _, target = heapq.heappop(heap)
+            scanned[target] = min_val
+            if target not in owner:
+                sink = target
+                break
+            row = owner[target]
+
+        row_potential[record] = row_potential.get(record, 0) + min_val
+        for row in scanned_rows[1:]:
+            row_potential[row] += min_val - scanned[assigned[row]]  # type: ignore[index]
+        for target, d in scanned.items():
+            col_potential[target] = col_potential.get(target, 0) - (min_val - d)
+
+        if sink is None:
+            # the path ends with leaving a record unmatched
+            row = unmatch[1]
+            sink = assigned.get(row)
+            assigned[row] = None
+            if sink is not None:
+                del owner[sink]
+        while sink is not None:
+            row = path[sink]
+            previous = assigned.get(row)
+            assigned[row] = sink
+            owner[sink] = row
+            if row == record:
+                break
+            sink = previous
+    return {r: t for r, t in assigned.items() if t is not None}
+
+
+def propose(weights: Weights) -> dict[str, Proposal]:
+    """
+    Assign the records and rate every pair by its closest competitor
+
+    Competing are other targets of the record that are free or held with a
+    score not higher than the record's, and other records of the target that
+    are unmatched or would give up a pair not scoring higher.
+    """
+    assigned = assign(weights)
+    holder = {target: record for record, target in assigned.items()}
+    by_target: dict[str, list[str]] = {}
+    for record, targets in weights.items():
+        for target in targets:
+            by_target.setdefault(target, []).append(record)
+
+    def held_score(record: str) -> int:
+        return weights[record][assigned[record]] if record in assigned else 0
+
+    proposals: dict[str, Proposal] = {}
+    for record, target in assigned.items():
+        other_targets = [
+            score
+            for other, score in weights[record].items()
+            if other != target
+            and (other not in holder or held_score(holder[other]) <= score)
+        ]
+        other_records = [
+            weights[other][target]
+            for other in by_target[target]
+            if other != record and held_score(other) <= weights[other][target]
+        ]
+        proposals[record] = Proposal(
+            target=target,
+            score=weights[record][target],
+            competing=max(other_targets + other_records, default=0),
+        )
+    return proposals
@@ -0,0 +1,116 @@
+"""
+Blocking index to find fuzzy match candidates without a full scan
+
+Scoring a name against every target is O(sources × targets). The index
+only returns targets likely to reach the fuzzy score cutoff:
+
+- targets sharing a word with the query
+- targets with the same PLZ
+- targets sharing enough character trigrams (catches partial matches
+  like ``hochsauerlandenergie`` → ``hochsauerland``)
+- very short names, as the partial ratio matches them in nearly everything
+
+The blocking is approximate: a target only reaching the cutoff by a partial
+match of a few characters (``gemeindestrom wadgassen`` → ``menden``) is not
+returned. Short queries and queries without any blocked target fall back
+to all targets, so a plausible match is never missed for lack of candidates.
+"""
+
+from collections import Counter
+from typing import Iterable
+
+from thefuzz import utils
+
+from rowo_oekostrom_recherche.scraper.base import NameNormal
+
+# minimal number of shared trigrams
+MIN_SHARED_GRAMS = 3
+# minimal share of trigrams of the shorter name that must match
+MIN_SHARED_RATIO = 0.5
+# names up to this length are always candidates
+SHORT_NAME = 5
+
+
+def trigrams(text: str) -> set[str]:
+    text = f" {text} "
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def split_key(key: str) -> tuple[str, list[str]]:
+    """
+    Split the key in PLZ (might be empty) and processed words
+
+    The processing is the same the fuzzy scorer uses.
+    """
+    words = utils.full_process(key).split()
+    plz = ""
+    if words and words[0].isdigit() and len(words[0]) == 5:
+        plz = words.pop(0)
+    return plz, words
+
+
+class CandidateIndex:
+    def __init__(self, keys: Iterable[NameNormal] = ()) -> None:
+        self.by_word: dict[str, set[NameNormal]] = {}
+        self.by_plz: dict[str, set[NameNormal]] = {}
+        self.by_gram: dict[str, set[NameNormal]] = {}
+        self.gram_count: dict[NameNormal, int] = {}
+        self.short: set[NameNormal] = set()
+        # keys in insertion order, used to find keys added after a snapshot
+        self.keys: list[NameNormal] = []
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return len(self.gram_count)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.gram_count
+
+    def add(self, key: NameNormal) -> None:
+        if key in self.gram_count:
+            return
+        plz, words = split_key(key)
+        name = " ".join(words)
+        grams = trigrams(name)
+        self.gram_count[key] = len(grams)
+        self.keys.append(key)
+        if plz:
+            self.by_plz.setdefault(plz, set()).add(key)
+        for word in words:
+            self.by_word.setdefault(word, set()).add(key)
+        for gram in grams:
+            self.by_gram.setdefault(gram, set()).add(key)
+        if len(name) <= SHORT_NAME:
+            self.short.add(key)
+
+    @property
+    def generation(self) -> int:
+        return len(self.keys)
+
+    def added_since(self, generation: int) -> list[NameNormal]:
+        return self.keys[generation:]
+
+    def candidates(self, query: NameNormal) -> set[NameNormal]:
+        plz, words = split_key(query)
+        name = " ".join(words)
+        if len(name) <= SHORT_NAME:
+            return set(self.gram_count)
+        result: set[NameNormal] = set()
+        if plz:
+            result |= self.by_plz.get(plz, set())
+        for word in words:
+            result |= self.by_word.get(word, set())
+        grams = trigrams(name)
+        shared: Counter[NameNormal] = Counter()
+        for gram in grams:
+            shared.update(self.by_gram.get(gram, ()))
+        result.update(
+            key
+            for key, count in shared.items()
+            if count >= MIN_SHARED_GRAMS
+            and count >= MIN_SHARED_RATIO * min(len(grams), self.gram_count[key])
+        )
+        if not result:
+            return set(self.gram_count)
+        return result | self.short
@@ -0,0 +1,191 @@
+"""
+Command line interface of all stages
+
+    rowo-oekostrom scrape  [--jobs N] [--only/--skip SOURCE ...] [--offline]
+    rowo-oekostrom combine [--jobs N] [--only/--skip SOURCE ...] [--incremental]
+                           [--batch]
+    rowo-oekostrom export
+    rowo-oekostrom join    [--output PATH]
+
+Every stage takes `--profile [DIR]` and writes its cProfile stats to DIR
+(default `scraped_data/profiles`): `combine.prof`, `export.prof`,
+`join.prof` and one `scrape-<source>.prof` per scraper, as the scrapers run
+in their own processes. Only scrape and combine choose sources. The modules
+of a stage are only imported when it is run.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Sequence
+
+from rowo_oekostrom_recherche import profiling
+from rowo_oekostrom_recherche.scraper.registry import SCRAPERS
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {number}")
+    return number
+
+
+def selected_sources(args: argparse.Namespace, sources: Sequence[str]) -> list[str]:
+    """
+    The sources chosen by `--only` and `--skip`, in the order of `sources`
+    """
+    only = set(args.only or sources)
+    return [s for s in sources if s in only and s not in set(args.skip or ())]
+
+
+def profile_path(args: argparse.Namespace, name: str) -> Path | None:
+    return args.profile / f"{name}.prof" if args.profile else None
+
+
+def run_scrape(args: argparse.Namespace) -> int:
+    from rowo_oekostrom_recherche.scraper import manager
+
+    sources = selected_sources(args, list(SCRAPERS))
+    if not sources:
+        print("No sources selected")
+        return 2
+    if args.offline:
+        # the scrapers run in their own processes
+        os.environ["ROWO_OFFLINE"] = "1"
+    reports = manager.run_all(sources, jobs=args.jobs, profile_dir=args.profile)
+    if args.profile:
+        for report in reports:
+            path = profile_path(args, f"scrape-{report.source}")
+            if path and path.exists():
+                profiling.print_summary(path)
+    return 0 if all(report.ok for report in reports) else 1
+
+
+def run_combine(args: argparse.Namespace) -> int:
+    from rowo_oekostrom_recherche.combine import TARGET, Source, combine
+
+    all_sources = [s for s in SCRAPERS if s != TARGET]
+    sources = selected_sources(args, all_sources)
+    if not sources:
+        print("No sources selected")
+        return 2
+    path = profile_path(args, "combine")
+    with profiling.profile(path):
+        combine(
+            jobs=args.jobs,
+            sources=None if sources == all_sources else map(Source, sources),
+            incremental_run=args.incremental,
+            batch=args.batch,
+        )
+    if path:
+        profiling.print_summary(path)
+    return 0
+
+
+def run_export(args: argparse.Namespace) -> int:
+    from rowo_oekostrom_recherche.export import export
+
+    path = profile_path(args, "export")
+    with profiling.profile(path):
+        export()
+    if path:
+        profiling.print_summary(path)
+    return 0
+
+
+def run_join(args: argparse.Namespace) -> int:
+    from rowo_oekostrom_recherche import join
+
+    path = profile_path(args, "join")
+    with profiling.profile(path):
+        join.build_full_list(args.output or join.FULL_LIST_FILE)
+    if path:
+        profiling.print_summary(path)
+    return 0
+
+
+def parser() -> argparse.ArgumentParser:
+    # options of every stage
+    profiled = argparse.ArgumentParser(add_help=False)
+    profiled.add_argument(
+        "--profile",
+        nargs="?",
+        const=profiling.PROFILE_DIR,
+        type=Path,
+        metavar="DIR",
+        help=f"write cProfile stats to DIR (default {profiling.PROFILE_DIR})",
+    )
+    # options of the stages running per source
+    parallel = argparse.ArgumentParser(add_help=False)
+    parallel.add_argument(
+        "--jobs",
+        "-j",
+        type=positive_int,
+        metavar="N",
+        help="number of processes, default one per source or cpu",
+    )
+    selection = parallel.add_mutually_exclusive_group()
+    selection.add_argument(
+        "--only", nargs="+", choices=SCRAPERS, metavar="SOURCE", help="only these"
+    )
+    selection.add_argument(
+        "--skip", nargs="+", choices=SCRAPERS, metavar="SOURCE", help="all but these"
+    )
+
+    result = argparse.ArgumentParser(
+        prog="rowo-oekostrom",
+        description="Scrape, combine, export and join the green electricity providers",
+    )
+    stages = result.add_subparsers(dest="stage", required=True)
+
+    scrape = stages.add_parser(
+        "scrape", parents=[profiled, parallel], help="run the scrapers"
+    )
+    scrape.add_argument(
+        "--offline",
+        action="store_true",
+        help="only use the cached pages, no network access",
+    )
+    scrape.set_defaults(run=run_scrape)
+
+    combine = stages.add_parser(
+        "combine", parents=[profiled, parallel], help="combine the scraped sources"
+    )
+    combine.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only match the records changed since the last run",
+    )
+    combine.add_argument(
+        "--batch",
+        action="store_true",
+        help="never ask, write undecided records to the review queue",
+    )
+    combine.set_defaults(run=run_combine)
+
+    export = stages.add_parser(
+        "export", parents=[profiled], help="export the combined data to docs"
+    )
+    export.set_defaults(run=run_export)
+
+    join = stages.add_parser(
+        "join", parents=[profiled], help="join the source lists to the full list"
+    )
+    join.add_argument(
+        "--output",
+        type=Path,
+        metavar="PATH",
+        help="csv file written, default liste-komplett.csv",
+    )
+    join.set_defaults(run=run_join)
+    return result
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
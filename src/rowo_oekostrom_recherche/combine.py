@@ -1,34 +1,46 @@
-from typing import NewType, cast
+from pathlib import Path
+from typing import Iterable, NewType, cast
 import sys
-from rowo_oekostrom_recherche.scraper import (
-    base,
-    okpower,
-    oekotest,
-    rowo_2019,
-    stromauskunft,
-    verivox,
-)
+from rowo_oekostrom_recherche.scraper import base, models, registry
 import json
-from thefuzz import process
-from pydantic import Field, ValidationError
+from rowo_oekostrom_recherche import (
+    assignment,
+    incremental,
+    metrics,
+    snapshots,
+    tables,
+)
+from rowo_oekostrom_recherche.records import Record, Target, compact
+from rowo_oekostrom_recherche.addresses import AddressIndex
+from rowo_oekostrom_recherche.candidates import CandidateIndex
+from rowo_oekostrom_recherche.scoring import CandidateScores
+from rowo_oekostrom_recherche.review import (
+    ReviewCandidate,
+    ReviewItem,
+    REVIEW_FILE,
+    ReviewQueue,
+    input_selection,
+    save_queue,
+)
+from rowo_oekostrom_recherche.selections import SelectionStore
+from pydantic import BaseModel, Field, ValidationError
 from typing_extensions import TypedDict, Literal
 
 from rowo_oekostrom_recherche.scraper.base import NameNormal
 
 Source = NewType("source", str)
 
-SELECTION_FILE = base.DATA_DIR / "combine_selections.csv"
 TARGET = Source("rowo2019")
 
 
 class SourceData(TypedDict, total=False):
-    oekotest: oekotest.Oekotest
-    okpower: okpower.OkPower
-    stromauskunft: stromauskunft.Stromauskunft
-    verivox: verivox.VerivoxBase
+    oekotest: models.Oekotest
+    okpower: models.OkPower
+    stromauskunft: models.Stromauskunft
+    verivox: models.VerivoxBase
 
 
-class Combined(rowo_2019.RoWo):
+class Combined(models.RoWo):
     rowo2019: bool = True
     sources: SourceData = Field(default_factory=SourceData)
 
@@ -41,13 +53,11 @@ class Result(TypedDict):
     verivox: str
 
 
-class LoadedSourceData(SourceData):
-    rowo_2019: Combined
-
-
+# models of the sources combined with the target
 SOURCE_TYPES: dict[Source, type[base.AnbieterBase]] = {
-    Source(k): cast(type[base.AnbieterBase], v)
-    for k, v in LoadedSourceData.__annotations__.items()
+    Source(source): registry.model(source)
+    for source in registry.MODELS
+    if source != TARGET
 }
 
 
@@ -74,74 +84,102 @@ def to_keydict(
     return results
 
 
-def load_data() -> dict[Source, dict[NameNormal, base.AnbieterBase]]:
-    loaded_data: dict[Source, dict[NameNormal, base.AnbieterBase]] = {}
-    for source_file in base.DATA_DIR.glob("*.json"):
-        if source_file.name == "combined.json":
-            continue
-
-        source = Source(source_file.name.removesuffix(".json"))
-        target_type: type[base.AnbieterBase]
-        if source == TARGET:
-            target_type = Combined
-        else:
-            target_type = SOURCE_TYPES[source]
+def load_source(source: Source, source_file: Path) -> dict[NameNormal, Record]:
+    """
+    Load the records of `source` in their compact form used for matching
+    """
+    target_type: type[base.AnbieterBase]
+    if source == TARGET:
+        target_type = Combined
+    else:
+        target_type = SOURCE_TYPES[source]
+    with metrics.span("load", source=source):
         try:
-            scrape_results = base.ScrapeResults[target_type].model_validate_json(
-                source_file.read_text()
-            )
+            scrape_results = snapshots.load_results(source_file, target_type)
         except ValidationError as e:
             print(f"Could not read {source_file.name}: {e}")
             sys.exit(1)
-        loaded_data[source] = to_keydict(scrape_results)
+        return compact(to_keydict(scrape_results), target=source == TARGET)
+
+
+def load_data() -> dict[Source, dict[NameNormal, Record]]:
+    """
+    Get the data of all scraped sources and the target
+    """
+    sources_data: dict[Source, dict[NameNormal, Record]] = {}
+    for source_file in sorted(base.DATA_DIR.glob("*.json")):
+        source = Source(source_file.name.removesuffix(".json"))
+        if source != TARGET and source not in SOURCE_TYPES:
+            # e.g. combined.json
+            continue
+        sources_data[source] = load_source(source, source_file)
+    return sources_data
 
-    return loaded_data
 
+def carried_choices(
+    sources: Iterable[Source],
+) -> dict[Source, dict[str, str | None]]:
+    """
+    The combination of the records of `sources` in the last `combined.json`
 
-def load_selections() -> dict[tuple[Source, str], str | None]:
+    By record name the full name of the entry it belongs to, `None` if the
+    record was added as new entry. A new entry is created by the first
+    source (in the order combine runs them) having a name in its row.
     """
-    Load selections that have been already done
+    choices: dict[Source, dict[str, str | None]] = {s: {} for s in sources}
+    combined_file = base.DATA_DIR / "combined.json"
+    if not choices or not combined_file.exists():
+        return choices
+    # the rows of `Result`, by source name
+    rows: list[dict[str, str]] = json.loads(combined_file.read_text())
+    for row in rows:
+        creator = next((s for s in sorted(SOURCE_TYPES) if row.get(s)), None)
+        entry = row["rowo2019"] or (row[creator] if creator else "")
+        for source in choices:
+            name = row.get(source)
+            if name:
+                new = not row["rowo2019"] and source == creator
+                choices[source][name] = None if new else entry
+    return choices
+
+
+class AutoAccept(BaseModel):
+    """
+    Thresholds for accepting the best candidate without asking
     """
-    selections: dict[tuple[Source, str], str | None] = {}
-    if SELECTION_FILE.exists():
-        for line in SELECTION_FILE.read_text().splitlines(keepends=False):
-            choice: str | None
-            source, anbieter, choice = line.split(";")
-            if choice == "":
-                choice = None
-            selections[(source, anbieter)] = choice
-    return selections
-
-
-def input_selection(choices: list[NameNormal]) -> NameNormal | None | Literal[-1]:
-    while True:
-        try:
-            result = input("> ").lower()
-            if result == "" and len(choices) == 1:
-                return choices[0]
-            if result == "x":
-                return None
-            if result == "s":
-                return -1
-            if result == "q":
-                print("Selected to exit")
-                raise KeyboardInterrupt()
-            return choices[int(result) - 1]
-        except (ValueError, IndexError):
-            print(
-                "Invalid input. Try again. Input must be number between 1 and 4 or x or q."
-            )
+
+    # minimal score of the best candidate
+    score: int = 95
+    # maximal score of the second best candidate
+    second_score: int = 90
 
 
 def extract_combination(
     source: Source,
-    data_source: base.AnbieterBase,
+    data_source: Record,
     check_for: NameNormal,
-    check_against: dict[NameNormal, Combined],
-    full_names_to_val: dict[str, Combined],
+    check_against: dict[NameNormal, Target],
+    scores: CandidateScores,
+    full_names_to_val: dict[str, Target],
     taken_choices: set[NameNormal],
-) -> Combined | None | Literal[-1]:
-    selections = load_selections()
+    selections: SelectionStore,
+    thresholds: AutoAccept = AutoAccept(),
+    review_queue: ReviewQueue | None = None,
+    proposal: assignment.Proposal | None = None,
+    address_hit: Target | None = None,
+) -> Target | None | Literal[-1]:
+    """
+    Find the entry the record `data_source` belongs to
+
+    Returns `None` if it should be added as new entry and -1 if skipped.
+    The `address_hit` of the address index is taken unless it was chosen
+    for another record of the source already.
+    The `proposal` of the global assignment is accepted if it is certain
+    enough (see `AutoAccept`), otherwise it is only suggested. Without a
+    proposal the best candidate is accepted if it is certain enough.
+    If a `review_queue` is given, undecided records are added to it and
+    skipped instead of asking.
+    """
     if (source, data_source.name) in selections:
         pre_result = selections[(source, data_source.name)]
         if pre_result == "-1":
@@ -149,9 +187,11 @@ def extract_combination(
         if pre_result is None:
             return None
         return full_names_to_val[pre_result]
-    candidates = process.extractBests(
-        check_for, set(check_against.keys()), limit=20, score_cutoff=75
-    )
+    if address_hit is not None and address_hit.name_normalized not in taken_choices:
+        print(f" -> Selected  {address_hit} (Adresse)")
+        print(f"    ↪    for  {data_source}\n")
+        return address_hit
+    candidates = scores.get(check_for)
     if len(candidates) == 0:
         print(f" -> Selected  *NOTHING* (neuer Anbieter)")
         print(f"    ↪    for  {data_source}\n")
@@ -167,8 +207,17 @@ def extract_combination(
     ):
         select_best_choice = True
     elif (
-        candidates[0][1] > 95
-        and (len(candidates) == 1 or candidates[1][1] <= 90)
+        proposal is not None
+        and proposal.score > thresholds.score
+        and proposal.competing <= thresholds.second_score
+        and full_names_to_val[proposal.target].name_normalized not in taken_choices
+    ):
+        best_choice = full_names_to_val[proposal.target]
+        select_best_choice = True
+    elif (
+        proposal is None
+        and candidates[0][1] > thresholds.score
+        and (len(candidates) == 1 or candidates[1][1] <= thresholds.second_score)
         and candidates[0][0] not in taken_choices
     ):
         select_best_choice = True
@@ -177,9 +226,31 @@ def extract_combination(
         print(f" -> Selected  {best_choice}")
         print(f"    ↪    for  {data_source}\n")
         return best_choice
+    if review_queue is not None:
+        review_queue.add(
+            ReviewItem(
+                source=source,
+                anbieter=data_source.name,
+                description=str(data_source),
+                candidates=[
+                    ReviewCandidate(
+                        name=check_against[key].name,
+                        score=score,
+                        taken=key in taken_choices,
+                        description=str(check_against[key]),
+                        suggested=suggested(check_against[key], proposal),
+                    )
+                    for key, score in candidates
+                ],
+            )
+        )
+        print(f" -> Deferred  {data_source}\n")
+        return -1
     print(f"Looking for match: {data_source}")
     for i, candidate in enumerate(candidates, start=1):
         dup = "!taken already!" if candidate[0] in taken_choices else ""
+        if suggested(check_against[candidate[0]], proposal):
+            dup = f"(suggested) {dup}"
         indent = " " * 5
         print(
             f" ({i:>2}) [{candidate[1]:>3} %] {dup}{indent}{check_against[candidate[0]]}"
@@ -187,15 +258,18 @@ def extract_combination(
     print(" (x) Add as new entry (q to quit, s to skip)")
     selection = input_selection([candidate[0] for candidate in candidates])
     if selection == -1 or selection is None:
-        with SELECTION_FILE.open("a") as f:
-            f.write(f"{source};{data_source.name};{selection or ''}\n")
+        choice = "-1" if selection == -1 else None
+        selections.add(source, data_source.name, choice)
         return selection
     result = check_against[selection]
-    with SELECTION_FILE.open("a") as f:
-        f.write(f"{source};{data_source.name};{result.name}\n")
+    selections.add(source, data_source.name, result.name)
     return result
 
 
+def suggested(candidate: Target, proposal: assignment.Proposal | None) -> bool:
+    return proposal is not None and candidate.name == proposal.target
+
+
 def get_dupes(lst: list[str]) -> list[str]:
     """
     Get all duplicated items
@@ -206,98 +280,273 @@ def get_dupes(lst: list[str]) -> list[str]:
     return [x for x in lst if x and x in seen or seen.add(x)]
 
 
-def combine() -> None:
+def match_key(
+    anbieter_name: NameNormal, source_data: Record
+) -> tuple[NameNormal, bool]:
+    """
+    Get the name to match for and whether it contains the PLZ
+    """
+    if source_data.plz:
+        return NameNormal(f"{source_data.plz} {anbieter_name}"), True
+    return anbieter_name, False
+
+
+def reusable(
+    previous: incremental.RecordState, full_names_to_val: dict[str, Target]
+) -> bool:
+    """
+    Whether the decision of the last run can be used again
+    """
+    return previous.choice is None or previous.choice in full_names_to_val
+
+
+def undecided(
+    source: Source,
+    record: Record,
+    selections: SelectionStore,
+    previous_state: incremental.CombineState,
+) -> bool:
+    """
+    Whether the record is neither selected nor unchanged since the last run
+    """
+    return (source, record.name) not in selections and not previous_state.get(
+        source, record
+    )
+
+
+def assign_source(
+    source: Source,
+    anbieter_dict: dict[NameNormal, Record],
+    targets: dict[bool, tuple[dict[NameNormal, Target], CandidateScores]],
+    full_names_to_val: dict[str, Target],
+    selections: SelectionStore,
+    previous_state: incremental.CombineState,
+    address_hits: dict[NameNormal, Target],
+) -> dict[NameNormal, assignment.Proposal]:
+    """
+    Assign all undecided records of `source` to the targets at once
+
+    Targets already chosen for a decided record of the source (or found by
+    its address) are left out.
+    """
+    decided: set[str | None] = set()
+    weights: assignment.Weights = {}
+    for anbieter_name, source_data in anbieter_dict.items():
+        if (source, source_data.name) in selections:
+            decided.add(selections[(source, source_data.name)])
+            continue
+        previous = previous_state.get(source, source_data)
+        if previous and reusable(previous, full_names_to_val):
+            decided.add(previous.choice)
+            continue
+        if anbieter_name in address_hits:
+            decided.add(address_hits[anbieter_name].name)
+            continue
+        check_for, with_plz = match_key(anbieter_name, source_data)
+        check_against, scores = targets[with_plz]
+        weights[anbieter_name] = {
+            check_against[key].name: score for key, score in scores.get(check_for)
+        }
+    for candidates in weights.values():
+        for name in candidates.keys() & decided:
+            del candidates[name]
+    return {
+        NameNormal(record): proposal
+        for record, proposal in assignment.propose(weights).items()
+    }
+
+
+def combine(
+    jobs: int | None = None,
+    sources: Iterable[Source] | None = None,
+    incremental_run: bool = False,
+    batch: bool = False,
+    thresholds: AutoAccept = AutoAccept(),
+) -> None:
+    """
+    Combine the scraped sources with the target
+
+    :param jobs: number of processes used for scoring
+    :param sources: only match the records of these sources (default all),
+                    the records of the others keep their combination of the
+                    last written `combined.json`
+    :param incremental_run: only match records that changed since the last
+                            run, reuse the result of the last run otherwise
+    :param batch: never ask, write undecided records to the review queue
+    :param thresholds: when to accept the best candidate without asking
+    """
     sources_data = load_data()
-    target_data = cast(dict[NameNormal, Combined], sources_data[TARGET])
-    target_data_plz: dict[NameNormal, Combined] = {
+    carried = carried_choices(
+        []
+        if sources is None
+        else sorted(set(sources_data) - {TARGET} - set(sources))
+    )
+    target_data = cast(dict[NameNormal, Target], sources_data[TARGET])
+    target_data_plz: dict[NameNormal, Target] = {
         v.name_normalized_plz: v for v in target_data.values()
     }
-    full_names_to_val: dict[str, Combined] = {
+    full_names_to_val: dict[str, Target] = {
         v.name: v for v in target_data_plz.values()
     }
+    target_index = CandidateIndex(target_data)
+    target_index_plz = CandidateIndex(target_data_plz)
+    target_scores = CandidateScores(target_index)
+    target_scores_plz = CandidateScores(target_index_plz)
+    address_index = AddressIndex(target_data.values())
+    targets = {
+        False: (target_data, target_scores),
+        True: (target_data_plz, target_scores_plz),
+    }
+
+    target_hash = incremental.records_hash(target_data.values())
+    stored_state = incremental.load_state()
+    if stored_state.target_hash != target_hash:
+        if incremental_run:
+            print("Target data changed, matching everything again")
+        stored_state = incremental.CombineState()
+    previous_state = stored_state if incremental_run else incremental.CombineState()
+    state = incremental.CombineState(target_hash=target_hash)
+
+    # score everything not found by address upfront, so the review is never
+    # waiting for it (a record not found later on is scored when needed)
+    selections = SelectionStore()
+    for source, anbieter_dict in sources_data.items():
+        if source == TARGET or source in carried:
+            continue
+        queries: dict[bool, list[NameNormal]] = {False: [], True: []}
+        for anbieter_name, source_data in anbieter_dict.items():
+            if undecided(source, source_data, selections, previous_state) and (
+                address_index.find(source_data) is None
+            ):
+                check_for, with_plz = match_key(anbieter_name, source_data)
+                queries[with_plz].append(check_for)
+        target_scores.precompute(queries[False], jobs=jobs, source=source)
+        target_scores_plz.precompute(queries[True], jobs=jobs, source=source)
+    review_queue = ReviewQueue() if batch else None
     found: int = 0
     skipped: int = 0
     added: int = 0
+    reused: int = 0
     loaded_names: dict[Source, list[str]] = {}
+    # records of carried sources missing in the last combined.json
+    left_out: set[tuple[Source, str]] = set()
     try:
         for source, anbieter_dict in sorted(sources_data.items()):
             if source == TARGET:
                 continue
             print("#" * 120)
-            print(f"# Finding connection for {source}")
+            if source in carried:
+                print(f"# Keeping the connections of the last run for {source}")
+            else:
+                print(f"# Finding connection for {source}")
             print("#" * 120)
             taken_choices: set[NameNormal] = set()
             loaded_names[source] = []
-            for anbieter_name, source_data in anbieter_dict.items():
-                loaded_names[source].append(source_data.name)
-                check_for = anbieter_name
-                check_against = target_data
-                if source_data.plz:
-                    check_for = NameNormal(f"{source_data.plz} {anbieter_name}")
-                    check_against = target_data_plz
-                selection = extract_combination(
+            # looked up now to find the new entries of the sources before
+            address_hits: dict[NameNormal, Target] = {}
+            if source not in carried:
+                for anbieter_name, source_data in anbieter_dict.items():
+                    if undecided(source, source_data, selections, previous_state):
+                        hit = address_index.lookup(source, source_data)
+                        if hit is not None:
+                            address_hits[anbieter_name] = cast(Target, hit)
+            with metrics.span("assign", source=source):
+                proposals = {} if source in carried else assign_source(
                     source=source,
-                    data_source=source_data,
-                    check_for=check_for,
-                    check_against=check_against,
+                    anbieter_dict=anbieter_dict,
+                    targets=targets,
                     full_names_to_val=full_names_to_val,
-                    taken_choices=taken_choices,
+                    selections=selections,
+                    previous_state=previous_state,
+                    address_hits=address_hits,
                 )
-                if selection == -1:
-                    # skipping entry
-                    skipped += 1
-                    continue
-                elif selection:
-                    # found match
-                    found += 1
-                    taken_choices.add(selection.name_normalized)
-                    selection.sources[source] = source_data
-                else:
-                    # add new entry as it was missing in original data
-                    added += 1
-                    new_obj = Combined.model_validate(
-                        {
-                            **source_data.model_dump(),
-                            "rowo2019": False,
-                            "sources": {source: source_data},
-                        },
-                        strict=False,
+            with metrics.span("match", source=source):
+                for anbieter_name, source_data in anbieter_dict.items():
+                    loaded_names[source].append(source_data.name)
+                    check_for, with_plz = match_key(anbieter_name, source_data)
+                    check_against, scores = targets[with_plz]
+                    selection: Target | None | Literal[-1]
+                    previous = previous_state.get(source, source_data)
+                    if source in carried:
+                        if source_data.name not in carried[source]:
+                            # left for a run combining this source
+                            left_out.add((source, source_data.name))
+                            continue
+                        choice = carried[source][source_data.name]
+                        reused += 1
+                        metrics.count("carried")
+                        # an entry gone since the last run becomes a new one
+                        selection = full_names_to_val.get(choice) if choice else None
+                    elif previous and reusable(previous, full_names_to_val):
+                        # unchanged since the last run
+                        reused += 1
+                        metrics.count("reused")
+                        selection = (
+                            full_names_to_val[previous.choice]
+                            if previous.choice
+                            else None
+                        )
+                    else:
+                        selection = extract_combination(
+                            source=source,
+                            data_source=source_data,
+                            check_for=check_for,
+                            check_against=check_against,
+                            scores=scores,
+                            full_names_to_val=full_names_to_val,
+                            taken_choices=taken_choices,
+                            selections=selections,
+                            thresholds=thresholds,
+                            review_queue=review_queue,
+                            proposal=proposals.get(anbieter_name),
+                            address_hit=address_hits.get(anbieter_name),
+                        )
+                    if selection == -1:
+                        # skipping entry
+                        skipped += 1
+                        metrics.count("skipped")
+                        continue
+                    state.add(
+                        source, source_data, selection.name if selection else None
                     )
-                    target_data[anbieter_name] = new_obj
-                    target_data_plz[new_obj.name_normalized_plz] = new_obj
-                    full_names_to_val[new_obj.name] = new_obj
+                    if selection:
+                        # found match
+                        found += 1
+                        metrics.count("matched")
+                        taken_choices.add(selection.name_normalized)
+                        selection.sources[source] = source_data.name
+                    else:
+                        # add new entry as it was missing in original data
+                        added += 1
+                        metrics.count("added")
+                        new_obj = Target.from_record(source_data, Combined, source)
+                        target_data[anbieter_name] = new_obj
+                        target_data_plz[new_obj.name_normalized_plz] = new_obj
+                        target_index.add(anbieter_name)
+                        target_index_plz.add(new_obj.name_normalized_plz)
+                        full_names_to_val[new_obj.name] = new_obj
+                        address_index.add(new_obj)
     except KeyboardInterrupt:
-        print(f"{found=}, {skipped=}, {added=}, exiting")
+        print(f"{found=}, {skipped=}, {added=}, {reused=}, exiting")
     else:
-        print(f"{found=}, {skipped=}, {added=}")
+        print(f"{found=}, {skipped=}, {added=}, {reused=}")
+    print("Found by address:")
+    address_index.print_report()
+    if review_queue is not None:
+        save_queue(review_queue)
+        print(f"{len(review_queue.items)} records to review in {REVIEW_FILE.name}")
 
     results: list[Result] = []
 
-    combined: Combined
+    # only the names of the combined records are written
     for combined in target_data.values():
         results.append(
             {
                 "rowo2019": combined.name if combined.rowo2019 else "",
-                "oekotest": (
-                    combined.sources["oekotest"].name
-                    if "oekotest" in combined.sources
-                    else ""
-                ),
-                "okpower": (
-                    combined.sources["okpower"].name
-                    if "okpower" in combined.sources
-                    else ""
-                ),
-                "stromauskunft": (
-                    combined.sources["stromauskunft"].name
-                    if "stromauskunft" in combined.sources
-                    else ""
-                ),
-                "verivox": (
-                    combined.sources["verivox"].name
-                    if "verivox" in combined.sources
-                    else ""
-                ),
+                "oekotest": combined.sources.get("oekotest", ""),
+                "okpower": combined.sources.get("okpower", ""),
+                "stromauskunft": combined.sources.get("stromauskunft", ""),
+                "verivox": combined.sources.get("verivox", ""),
             }
         )
 
@@ -317,11 +566,15 @@ def combine() -> None:
         if len(anbieters) != len(set(anbieters) - {""}):
             raise ValueError(f"Duplicates in {source}: {get_dupes(anbieters)}")
 
-    # everything combined
+    # everything combined (or waiting for review)
+    deferred = review_queue.keys() if review_queue is not None else set()
     missing_sources = ""
     for source, anbieters in loaded_names.items():
-        anbieter_combined = transposed[source]
-        missing = set(anbieters) - set(anbieter_combined)
+        anbieter_combined = transposed.get(source, [])
+        missing = {
+            a for a in set(anbieters) - set(anbieter_combined)
+            if (source, a) not in deferred and (source, a) not in left_out
+        }
         if missing:
 
             missing_sources += f'{source}: {", ".join(sorted(missing))}\n'
@@ -329,9 +582,22 @@ def combine() -> None:
     if missing_sources:
         raise ValueError(missing_sources)
 
-    with base.DATA_DIR.joinpath("combined.json").open("w") as f:
-        json.dump(results, f, indent=2, sort_keys=True, ensure_ascii=False)
+    with metrics.span("write", source="combined"):
+        with base.DATA_DIR.joinpath("combined.json").open("w") as f:
+            json.dump(results, f, indent=2, sort_keys=True, ensure_ascii=False)
+        tables.save_rows(
+            base.DATA_DIR / "combined.jsonl", results, list(Result.__annotations__)
+        )
+        # keep the state of sources not combined in this run
+        for stored_source, records in stored_state.sources.items():
+            state.sources.setdefault(stored_source, records)
+        incremental.save_state(state)
+    metrics.print_summary()
+    metrics.emit_summary()
 
 
 if __name__ == "__main__":
-    combine()
+    combine(
+        incremental_run="--incremental" in sys.argv[1:],
+        batch="--batch" in sys.argv[1:],
+    )
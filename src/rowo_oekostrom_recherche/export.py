@@ -0,0 +1,199 @@
+"""
+Export of the combined data for docs/datenquellen
+
+Everything the page shows is computed here, the page only loads and draws:
+
+- `anbieter/<n>.json`: the providers in pages of `PAGE_SIZE`, sorted by
+  name, `anbieter/index.json` has the number of pages
+- `statistik/quellen.json`: number of providers per source
+- `statistik/kombinationen.json`: number of providers per combination of
+  sources, the largest first
+- `statistik/plz.json`: number of providers per postal zone and region (the
+  first one and two digits of the PLZ)
+- `data.json`: the number of incoming links and providers of every node of
+  the graph
+
+Files are only written if their content changed. The search index is built
+as well, see `search_index`.
+
+    python -m rowo_oekostrom_recherche.export
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+from typing_extensions import TypedDict
+
+from rowo_oekostrom_recherche import metrics, search_index
+from rowo_oekostrom_recherche.combine import Result
+from rowo_oekostrom_recherche.scraper.base import DATA_DIR
+
+EXPORT_DIR = search_index.SEARCH_DIR.parent
+GRAPH_FILE = EXPORT_DIR / "data.json"
+PAGE_SIZE = 100
+
+
+class Provider(TypedDict):
+    Firmenname: str
+    URL: str
+    Stadt: str
+    PLZ: str
+    Adresse: str
+    Telefon: str
+    Quellen: dict[str, str]
+
+
+class Combination(TypedDict):
+    sources: list[str]
+    count: int
+
+
+class PlzCounts(TypedDict):
+    # "" for providers without PLZ
+    zones: dict[str, int]
+    regions: dict[str, int]
+
+
+def load_rows() -> list[Result]:
+    return json.loads(DATA_DIR.joinpath("combined.json").read_text())
+
+
+def to_providers(rows: Iterable[Result]) -> list[Provider]:
+    records = search_index.load_records()
+    providers: list[Provider] = []
+    for row in rows:
+        document = search_index.to_document(row, records)
+        providers.append(
+            {
+                "Firmenname": document["Firmenname"],
+                "URL": document["URL"],
+                "Stadt": document["Stadt"],
+                "PLZ": document["PLZ"],
+                "Adresse": document["Adresse"],
+                "Telefon": document["Telefon"],
+                "Quellen": document["Quellen"],
+            }
+        )
+    providers.sort(key=lambda p: (p["Firmenname"].casefold(), p["Firmenname"]))
+    return providers
+
+
+def count_sources(rows: Iterable[Result]) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for row in rows:
+        for source, name in row.items():
+            if name:
+                counts[source] = counts.get(source, 0) + 1
+    return dict(sorted(counts.items()))
+
+
+def count_combinations(rows: Iterable[Result]) -> list[Combination]:
+    counts: dict[tuple[str, ...], int] = {}
+    for row in rows:
+        key = tuple(sorted(source for source, name in row.items() if name))
+        counts[key] = counts.get(key, 0) + 1
+    return [
+        {"sources": list(sources), "count": n}
+        for sources, n in sorted(counts.items(), key=lambda i: (-i[1], i[0]))
+    ]
+
+
+def count_plz(providers: Iterable[Provider]) -> PlzCounts:
+    zones: dict[str, int] = {}
+    regions: dict[str, int] = {}
+    for provider in providers:
+        plz = provider["PLZ"].strip()
+        if not plz[:2].isdigit():
+            plz = ""
+        zones[plz[:1]] = zones.get(plz[:1], 0) + 1
+        regions[plz[:2]] = regions.get(plz[:2], 0) + 1
+    return {
+        "zones": dict(sorted(zones.items())),
+        "regions": dict(sorted(regions.items())),
+    }
+
+
+def update_graph(graph: dict[str, Any], sources: dict[str, int]) -> dict[str, Any]:
+    """
+    Add the number of incoming links and providers to the nodes of the graph
+    """
+    incoming: dict[str, int] = {}
+    for link in graph["links"]:
+        incoming[link["target"]] = incoming.get(link["target"], 0) + 1
+    for node in graph["nodes"]:
+        node["links"] = incoming.get(node["id"], 0)
+        if node["id"] in sources:
+            node["providers"] = sources[node["id"]]
+    return graph
+
+
+def dump_graph(graph: dict[str, Any]) -> str:
+    """
+    Like the hand written `data.json`: one object per line
+    """
+    parts = []
+    for key, items in graph.items():
+        lines = ",\n".join(f"    {json.dumps(i, ensure_ascii=False)}" for i in items)
+        parts.append(f'  "{key}": [\n{lines}\n  ]')
+    return "{\n" + ",\n".join(parts) + "\n}\n"
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    if path.exists() and path.read_text() == content:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    search_index.write_atomic(path, content.encode())
+    return True
+
+
+def write_json(path: Path, data: Any) -> bool:
+    return write_if_changed(
+        path, json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    )
+
+
+def write_pages(providers: Sequence[Provider]) -> int:
+    """
+    Write the providers in pages, returns the number of written files
+    """
+    directory = EXPORT_DIR / "anbieter"
+    pages = max(1, -(-len(providers) // PAGE_SIZE))
+    written = int(
+        write_json(
+            directory / "index.json",
+            {"pages": pages, "page_size": PAGE_SIZE, "providers": len(providers)},
+        )
+    )
+    for page in range(pages):
+        chunk = providers[page * PAGE_SIZE : (page + 1) * PAGE_SIZE]
+        written += write_json(directory / f"{page + 1}.json", chunk)
+    for outdated in directory.glob("*.json"):
+        if outdated.stem.isdigit() and int(outdated.stem) > pages:
+            outdated.unlink()
+    return written
+
+
+def export() -> None:
+    """
+    Write the pages, the statistics and the search index of docs/datenquellen
+    """
+    rows = load_rows()
+    with metrics.span("export", source="export"):
+        providers = to_providers(rows)
+        sources = count_sources(rows)
+        written = write_pages(providers)
+        statistics = EXPORT_DIR / "statistik"
+        written += write_json(statistics / "quellen.json", sources)
+        written += write_json(
+            statistics / "kombinationen.json", count_combinations(rows)
+        )
+        written += write_json(statistics / "plz.json", count_plz(providers))
+        graph = update_graph(json.loads(GRAPH_FILE.read_text()), sources)
+        written += write_if_changed(GRAPH_FILE, dump_graph(graph))
+    print(f"{len(providers)} providers exported, {written} files written")
+    search_index.build_index()
+
+
+if __name__ == "__main__":
+    export()
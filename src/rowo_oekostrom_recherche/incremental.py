@@ -0,0 +1,71 @@
+"""
+State of the last combine run, used to only re-match changed records
+
+For every combined source record the hash of its content and the name of
+the entry it was combined with is stored in `STATE_FILE`. An incremental
+run reuses this decision for every record whose hash did not change, as
+long as the target data did not change either.
+"""
+
+import hashlib
+from typing import Iterable
+
+from pydantic import BaseModel, Field
+
+from rowo_oekostrom_recherche.records import Record
+from rowo_oekostrom_recherche.scraper.base import DATA_DIR
+
+STATE_FILE = DATA_DIR / "combine_state.json"
+
+
+def record_hash(record: Record) -> str:
+    # the hash of the pydantic model, so stored states stay valid, computed
+    # once per record as a run looks up and stores every record
+    if record.content_hash is None:
+        content = record.to_model().model_dump_json().encode()
+        record.content_hash = hashlib.sha256(content).hexdigest()
+    return record.content_hash
+
+
+def records_hash(records: Iterable[Record]) -> str:
+    digest = hashlib.sha256()
+    for record in records:
+        digest.update(record_hash(record).encode())
+    return digest.hexdigest()
+
+
+class RecordState(BaseModel):
+    hash: str
+    # name of the combined entry, None if the record was added as new entry
+    choice: str | None
+
+
+class CombineState(BaseModel):
+    target_hash: str = ""
+    sources: dict[str, dict[str, RecordState]] = Field(default_factory=dict)
+
+    def get(self, source: str, record: Record) -> RecordState | None:
+        """
+        Get the previous decision if the record did not change since
+        """
+        state = self.sources.get(source, {}).get(record.name)
+        if state is None or state.hash != record_hash(record):
+            return None
+        return state
+
+    def add(self, source: str, record: Record, choice: str | None) -> None:
+        self.sources.setdefault(source, {})[record.name] = RecordState(
+            hash=record_hash(record), choice=choice
+        )
+
+
+def load_state() -> CombineState:
+    if not STATE_FILE.exists():
+        return CombineState()
+    return CombineState.model_validate_json(STATE_FILE.read_text())
+
+
+def save_state(state: CombineState) -> None:
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(state.model_dump_json(indent=2))
+    tmp.replace(STATE_FILE)
@@ -0,0 +1,251 @@
+"""
+Outer join of provider lists on their normalized names
+
+Replaces the chained `pd.merge(on="Firmenname", how="outer")` of the
+notebooks, which only matched exactly equal names:
+
+- `normalize_column` applies `normalize_name` to a whole column, every
+  distinct name is normalized once and mapped onto the column
+- `outer_join` joins any number of tables in one pass on the normalized
+  name. Every table gets a flag column (its label) telling whether the
+  provider is in it. Columns found in several tables are combined, the
+  value of the first table having one wins, as does its `Firmenname`
+  (flag columns of joined tables are combined with "or", also when read
+  from csv as True or empty). Names occurring more than once in a table
+  are joined in order of occurrence, so no row is lost or multiplied.
+
+`build_full_list` rebuilds the complete list (`liste-komplett.csv`) from
+the cleaned source lists in `FULL_LIST_SOURCES`, with all columns of the
+list of 2019-08-27 and the criterion A set as in `liste-komplett.ipynb`:
+
+    rowo-oekostrom join [--output PATH]
+
+Needs pandas (`pip install -e .[join]`), it is imported by this module
+only.
+"""
+
+from pathlib import Path
+from typing import Mapping, Sequence
+
+import pandas as pd
+from pydantic import BaseModel
+
+from rowo_oekostrom_recherche import log, metrics
+from rowo_oekostrom_recherche.scraper.base import DATA_DIR, normalize_name
+
+BASEDIR = DATA_DIR.parent
+FULL_LIST_FILE = BASEDIR / "liste-komplett.csv"
+# column joined on
+NAME_COLUMN = "Firmenname"
+KEY_COLUMN = "name_normalized"
+OCCURRENCE = "occurrence"
+# index written by `DataFrame.to_csv`
+INDEX_COLUMN = "Unnamed: 0"
+FLAG_VALUES = (True, False, "True", "False")
+# providers of the Lichtblick or RoWo list with less renewable energy
+# meet the RoWo criterion A
+RENEWABLE_COLUMN = "Erneuerbare Energien 2"
+ALL_RENEWABLE = "100.00%"
+
+
+class JoinSource(BaseModel):
+    # also the name of the flag column
+    label: str
+    path: Path
+    name_column: str = NAME_COLUMN
+    # columns taken over besides the name, None for all
+    columns: tuple[str, ...] | None = ()
+    # new names of the columns taken over
+    renames: dict[str, str] = {}
+
+
+FULL_LIST_SOURCES = (
+    JoinSource(
+        label="Lichtblick Liste",
+        path=Path("lichtblick/Lichtblick_Atromanbieter_Tabelle-clean.csv"),
+        name_column="Anbieter",
+        columns=None,
+    ),
+    JoinSource(
+        label="RoWo Liste",
+        path=Path("lichtblick/RoWo-Arbeitsdok-2019-19-08-clean.csv"),
+        name_column="Stromanbieter",
+        columns=None,
+    ),
+    JoinSource(
+        label="Grüner Strom",
+        path=Path("cleaned_data/gruenstrom-cleaned-2019-07-30.csv"),
+        name_column="Anbieter",
+        columns=("Verfügbarkeit", "Telefon", "Website"),
+    ),
+    JoinSource(
+        label="OK Power",
+        path=Path("cleaned_data/okpower-cleaned-2019-07-30.csv"),
+        name_column="Anbieter",
+        columns=("Adresse", "Telefon", "Website"),
+    ),
+    JoinSource(
+        label="Stromauskunft",
+        path=Path("cleaned_data/Stromauskunftde-oekostrom-cleaned-2019-08-08.csv"),
+        name_column="Stromanbieter",
+        columns=("Adresse 1", "PLZ", "Stadt"),
+        # the RoWo list has an address, too
+        renames={
+            "Adresse 1": "Firmenanschrift",
+            "PLZ": "Firmen-PLZ",
+            "Stadt": "Firmenort",
+        },
+    ),
+    JoinSource(
+        label="Verivox",
+        path=Path("cleaned_data/verivox-alle-anbieter-cleaned-2019-08-19.csv"),
+        name_column="name",
+    ),
+    JoinSource(
+        label="Ökotest",
+        path=Path("cleaned_data/oekotest-strom-cleaned-2019-08-19.csv"),
+        name_column="Anbieter",
+    ),
+    JoinSource(
+        label="EcoTopTen",
+        path=Path("cleaned_data/ecotopten_oekostrom_cleaned-2019-08-19.csv"),
+        name_column="Hersteller",
+    ),
+    JoinSource(
+        label="Utopia",
+        path=Path("cleaned_data/utopia-bestenliste-cleaned-2019-08-19.csv"),
+        name_column="Name",
+    ),
+    JoinSource(
+        label="Stromauskunft echter Oekostrom",
+        path=Path(
+            "cleaned_data/stromauskunftde-reine-oekostrom-cleaned-2019-08-06.csv"
+        ),
+        name_column="Anbieter",
+    ),
+)
+
+
+def normalize_column(names: pd.Series) -> pd.Series:
+    """
+    The normalized names of a column, "" for missing names
+    """
+    names = names.fillna("").astype(str).str.strip()
+    normalized = {name: normalize_name(name) if name else "" for name in names.unique()}
+    return names.map(normalized)
+
+
+def as_flags(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flag columns of a joined table read from csv (True or empty) as bool
+    """
+    flags = {}
+    for column, values in frame.items():
+        if values.dtype != object:
+            continue
+        present = values.dropna()
+        if len(present) and present.isin(FLAG_VALUES).all():
+            flags[column] = values.isin((True, "True"))
+    return frame.assign(**flags) if flags else frame
+
+
+def keyed(frame: pd.DataFrame, label: str, on: str) -> pd.DataFrame:
+    """
+    The rows of `frame` having a name, indexed by normalized name and
+    occurrence of the name
+    """
+    key = normalize_column(frame[on])
+    has_name = key != ""
+    if not has_name.all():
+        metrics.count("no_name", int((~has_name).sum()), source=label)
+    key = key[has_name]
+    index = pd.MultiIndex.from_arrays(
+        [key, key.groupby(key).cumcount()], names=[KEY_COLUMN, OCCURRENCE]
+    )
+    # the flag and key of a table joined before are set again
+    frame = frame.loc[has_name].drop(
+        columns=[label, KEY_COLUMN, INDEX_COLUMN], errors="ignore"
+    )
+    return as_flags(frame).set_axis(index)
+
+
+def outer_join(
+    frames: Mapping[str, pd.DataFrame], on: str = NAME_COLUMN
+) -> pd.DataFrame:
+    """
+    Join the frames by label on the normalized names of their column `on`
+    """
+    with metrics.span("join", sources=len(frames)):
+        parts = {}
+        for label, frame in frames.items():
+            with metrics.span("normalize", source=label):
+                parts[label] = keyed(frame, label, on)
+        joined = pd.concat(parts, axis=1, join="outer", sort=False)
+
+        def first(column: str) -> pd.Series:
+            values = joined.xs(column, axis=1, level=1)
+            if all(parts[label][column].dtype == bool for label in values.columns):
+                # flags of tables joined before
+                return values.eq(True).any(axis=1)
+            result = values.iloc[:, 0]
+            for i in range(1, values.shape[1]):
+                result = result.where(result.notna(), values.iloc[:, i])
+            return result
+
+        columns: dict[str, pd.Series] = {on: first(on)}
+        for label in parts:
+            columns[label] = joined[(label, on)].notna()
+        for column in dict.fromkeys(c for part in parts.values() for c in part):
+            if column != on:
+                columns[column] = first(column)
+        result = pd.DataFrame(columns, index=joined.index)
+        result.insert(1, KEY_COLUMN, result.index.get_level_values(KEY_COLUMN))
+    metrics.count("joined", len(result))
+    return result.reset_index(drop=True)
+
+
+def read_source(source: JoinSource, basedir: Path = BASEDIR) -> pd.DataFrame:
+    """
+    The name (as `NAME_COLUMN`) and the columns of a source list, as strings
+    """
+    frame = pd.read_csv(basedir / source.path, dtype=str)
+    if source.columns is not None:
+        frame = frame[[source.name_column, *source.columns]]
+    return frame.rename(columns={**source.renames, source.name_column: NAME_COLUMN})
+
+
+def mark_criterion_a(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Set the RoWo criterion A for the providers of the Lichtblick or RoWo
+    list not having only renewable energy
+    """
+    listed = frame["Lichtblick Liste"] | frame["RoWo Liste"]
+    less = listed & (frame[RENEWABLE_COLUMN] != ALL_RENEWABLE)
+    frame.loc[less, "RoWo-Kriterien"] = "A"
+    frame.loc[less, "A"] = "x"
+    frame.loc[less, "RoWo Liste"] = True
+    metrics.count("criterion_a", int(less.sum()))
+    return frame
+
+
+def build_full_list(
+    output: Path = FULL_LIST_FILE,
+    sources: Sequence[JoinSource] = FULL_LIST_SOURCES,
+) -> pd.DataFrame:
+    """
+    Join all source lists and write the result as csv to `output`
+    """
+    with metrics.span("read"):
+        frames = {source.label: read_source(source) for source in sources}
+    result = mark_criterion_a(outer_join(frames))
+    with metrics.span("write"):
+        tmp = output.with_suffix(".csv.tmp")
+        result.to_csv(tmp, index=False)
+        tmp.replace(output)
+    log.info("Wrote full list", file=output.name, rows=str(len(result)))
+    return result
+
+
+if __name__ == "__main__":
+    build_full_list()
+    metrics.print_summary()
@@ -1,5 +1,9 @@
+from rowo_oekostrom_recherche import metrics
+
+
 def info(msg: str, **kwargs: str) -> None:
     to_log = msg
     for key, value in kwargs.items():
         to_log = f'{to_log} {key}={value}'
-    print(f"INFO: {to_log}")
\ No newline at end of file
+    print(f"INFO: {to_log}")
+    metrics.emit("log", msg, **kwargs)
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""
+Build serialized lunr 2.3.8 indices without node
+
+The output of `Builder.build` is the json `lunr.Index.load` expects in the
+browser, identical to an index built with `lunr()` and the default pipeline
+(trimmer, stop word filter, stemmer) and `Index.toJSON`.
+"""
+
+import math
+import re
+from typing import Any, Iterable, Mapping
+
+VERSION = "2.3.8"
+
+SEPARATOR = re.compile(r"[\s\-]+")
+# javascript regular expressions are ascii only
+LEADING = re.compile(r"^\W+", re.ASCII)
+TRAILING = re.compile(r"\W+$", re.ASCII)
+
+STOP_WORDS = frozenset(
+    """
+    a able about across after all almost also am among an and any are as at
+    be because been but by can cannot could dear did do does either else ever
+    every for from get got had has have he her hers him his how however i if
+    in into is it its just least let like likely may me might most must my
+    neither no nor not of off often on only or other our own rather said say
+    says she should since so some than that the their them then there these
+    they this tis to too twas us wants was we were what when where which while
+    who whom why will with would yet you your
+    """.split()
+)
+
+# bm25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(value: Any) -> list[str]:
+    if value is None:
+        return []
+    return [token for token in SEPARATOR.split(str(value).lower()) if token]
+
+
+def trim(token: str) -> str:
+    return TRAILING.sub("", LEADING.sub("", token, count=1), count=1)
+
+
+STEP2 = {
+    "ational": "ate", "tional": "tion", "enci": "ence", "anci": "ance",
+    "izer": "ize", "bli": "ble", "alli": "al", "entli": "ent", "eli": "e",
+    "ousli": "ous", "ization": "ize", "ation": "ate", "ator": "ate",
+    "alism": "al", "iveness": "ive", "fulness": "ful", "ousness": "ous",
+    "aliti": "al", "iviti": "ive", "biliti": "ble", "logi": "log",
+}  # fmt: skip
+STEP3 = {
+    "icate": "ic", "ative": "", "alize": "al", "iciti": "ic", "ical": "ic",
+    "ful": "", "ness": "",
+}  # fmt: skip
+
+_c = "[^aeiou]"
+_v = "[aeiouy]"
+_C = _c + "[^aeiouy]*"
+_V = _v + "[aeiou]*"
+MGR0 = re.compile(f"^({_C})?{_V}{_C}")
+MEQ1 = re.compile(f"^({_C})?{_V}{_C}({_V})?$")
+MGR1 = re.compile(f"^({_C})?{_V}{_C}{_V}{_C}")
+S_V = re.compile(f"^({_C})?{_v}")
+RE_1A = re.compile(r"^(.+?)(ss|i)es$")
+RE2_1A = re.compile(r"^(.+?)([^s])s$")
+RE_1B = re.compile(r"^(.+?)eed$")
+RE2_1B = re.compile(r"^(.+?)(ed|ing)$")
+RE2_1B_2 = re.compile(r"(at|bl|iz)$")
+RE3_1B_2 = re.compile(r"([^aeiouylsz])\1$")
+RE4_1B_2 = re.compile(f"^{_C}{_v}[^aeiouwxy]$")
+RE_1C = re.compile(r"^(.+?[^aeiou])y$")
+RE_2 = re.compile(f"^(.+?)({'|'.join(STEP2)})$")
+RE_3 = re.compile(f"^(.+?)({'|'.join(STEP3)})$")
+RE_4 = re.compile(
+    r"^(.+?)(al|ance|ence|er|ic|able|ible|ant|ement|ment|ent|ou|ism|ate|iti|ous"
+    r"|ive|ize)$"
+)
+RE2_4 = re.compile(r"^(.+?)(s|t)(ion)$")
+RE_5 = re.compile(r"^(.+?)e$")
+RE3_5 = re.compile(f"^{_C}{_v}[^aeiouwxy]$")
+
+
+def stem(w: str) -> str:
+    """
+    Porter stemmer, a port of `lunr.stemmer` including its quirks
+    """
+    if len(w) < 3:
+        return w
+    first = w[0]
+    if first == "y":
+        w = "Y" + w[1:]
+
+    if m := RE_1A.search(w) or RE2_1A.search(w):
+        w = m[1] + m[2]
+
+    if m := RE_1B.search(w):
+        if MGR0.search(m[1]):
+            w = w[:-1]
+    elif m := RE2_1B.search(w):
+        if S_V.search(m[1]):
+            w = m[1]
+            if RE2_1B_2.search(w):
+                w += "e"
+            elif RE3_1B_2.search(w):
+                w = w[:-1]
+            elif RE4_1B_2.search(w):
+                w += "e"
+
+    if m := RE_1C.search(w):
+        w = m[1] + "i"
+
+    if (m := RE_2.search(w)) and MGR0.search(m[1]):
+        w = m[1] + STEP2[m[2]]
+
+    if (m := RE_3.search(w)) and MGR0.search(m[1]):
+        w = m[1] + STEP3[m[2]]
+
+    if m := RE_4.search(w):
+        if MGR1.search(m[1]):
+            w = m[1]
+    elif m := RE2_4.search(w):
+        if MGR1.search(m[1] + m[2]):
+            w = m[1] + m[2]
+
+    if m := RE_5.search(w):
+        if MGR1.search(m[1]) or (MEQ1.search(m[1]) and not RE3_5.search(m[1])):
+            w = m[1]
+
+    if w.endswith("ll") and MGR1.search(w):
+        w = w[:-1]
+
+    if first == "y":
+        w = "y" + w[1:]
+    return w
+
+
+def terms(value: Any) -> list[str]:
+    """
+    Tokens of a field after the pipeline of the index builder
+    """
+    result = []
+    for token in tokenize(value):
+        token = trim(token)
+        if token in STOP_WORDS:
+            continue
+        result.append(stem(token))
+    return result
+
+
+def js_round(value: float) -> float | int:
+    # Math.round(score * 1000) / 1000, integers are written without fraction
+    rounded = math.floor(value * 1000 + 0.5) / 1000
+    return int(rounded) if rounded.is_integer() else rounded
+
+
+def js_sort_key(term: str) -> bytes:
+    # Array.prototype.sort compares utf-16 code units
+    return term.encode("utf-16-be")
+
+
+class Builder:
+    """
+    Collects the documents of an index, like `lunr.Builder`
+    """
+
+    def __init__(self, ref: str, fields: Iterable[str]) -> None:
+        self.ref = ref
+        self.fields = list(fields)
+        self.inverted_index: dict[str, dict[str, Any]] = {}
+        self.field_terms: dict[tuple[str, str], dict[str, int]] = {}
+        self.document_count = 0
+
+    def add(self, document: Mapping[str, Any]) -> None:
+        doc_ref = str(document[self.ref])
+        self.document_count += 1
+        for field in self.fields:
+            frequencies: dict[str, int] = {}
+            self.field_terms[(field, doc_ref)] = frequencies
+            for term in terms(document.get(field)):
+                frequencies[term] = frequencies.get(term, 0) + 1
+                posting = self.inverted_index.get(term)
+                if posting is None:
+                    posting = {"_index": len(self.inverted_index)}
+                    posting.update((f, {}) for f in self.fields)
+                    self.inverted_index[term] = posting
+                posting[field].setdefault(doc_ref, {})
+
+    def idf(self, term: str) -> float:
+        posting = self.inverted_index[term]
+        with_term = sum(len(posting[field]) for field in self.fields)
+        x = (self.document_count - with_term + 0.5) / (with_term + 0.5)
+        return math.log(1 + abs(x))
+
+    def build(self) -> dict[str, Any]:
+        """
+        The serialized index, as returned by `lunr.Index.toJSON`
+        """
+        lengths: dict[str, list[int]] = {field: [] for field in self.fields}
+        for (field, _), frequencies in self.field_terms.items():
+            lengths[field].append(sum(frequencies.values()))
+        average = {
+            field: sum(values) / len(values) if values else 0.0
+            for field, values in lengths.items()
+        }
+
+        idf_cache: dict[str, float] = {}
+        field_vectors = []
+        for (field, doc_ref), frequencies in self.field_terms.items():
+            length = sum(frequencies.values())
+            elements = []
+            for term, tf in frequencies.items():
+                if term not in idf_cache:
+                    idf_cache[term] = self.idf(term)
+                score = (
+                    idf_cache[term]
+                    * ((K1 + 1) * tf)
+                    / (K1 * (1 - B + B * (length / average[field])) + tf)
+                )
+                elements.append((self.inverted_index[term]["_index"], score))
+            vector: list[float | int] = []
+            for index, score in sorted(elements):
+                vector += [index, js_round(score)]
+            field_vectors.append([f"{field}/{doc_ref}", vector])
+
+        return {
+            "version": VERSION,
+            "fields": self.fields,
+            "fieldVectors": field_vectors,
+            "invertedIndex": [
+                [term, self.inverted_index[term]]
+                for term in sorted(self.inverted_index, key=js_sort_key)
+            ],
+            "pipeline": ["stemmer"],
+        }
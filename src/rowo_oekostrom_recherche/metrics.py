@@ -0,0 +1,216 @@
+"""
+Structured metrics of the scrape and combine runs
+
+- `span(name)` times a step (fetch, parse, validate, match, write, ...) and
+  adds its duration to the latency histogram of the step
+- `count(name)` increments a counter (ok, failed, retried, cache_hit, ...)
+
+Both are kept per source. A span given a `source` sets it for everything
+nested, including the asyncio tasks started within.
+
+Every span and every `log.info` message is also written as one json line to
+`METRICS_FILE`, next to the human readable output. `ROWO_METRICS` sets
+another file, `ROWO_METRICS=0` disables writing.
+"""
+
+import bisect
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from pydantic import BaseModel, Field
+
+from rowo_oekostrom_recherche.scraper.base import DATA_DIR
+
+METRICS_FILE = DATA_DIR / "metrics.jsonl"
+
+# upper bounds of the histogram buckets in seconds, the last bucket is open
+BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)  # fmt: skip
+
+
+def _sink_from_env() -> Path | None:
+    value = os.environ.get("ROWO_METRICS")
+    if value is None:
+        return METRICS_FILE
+    if value in ("", "0"):
+        return None
+    return Path(value)
+
+
+_source: contextvars.ContextVar[str] = contextvars.ContextVar("source", default="")
+_lock = threading.Lock()
+_sink: Path | None = _sink_from_env()
+# the open sink with the process it was opened in
+_sink_fd: tuple[int, int] | None = None
+
+
+class Histogram(BaseModel):
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    buckets: list[int] = Field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bound of the bucket containing the quantile `q`
+        """
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip((*BUCKETS, self.max), self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def merge(self, other: "Histogram") -> None:
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+
+class Snapshot(BaseModel):
+    # by source and name
+    counters: dict[str, dict[str, int]] = Field(default_factory=dict)
+    histograms: dict[str, dict[str, Histogram]] = Field(default_factory=dict)
+
+    def merge(self, other: "Snapshot") -> None:
+        for source, counters in other.counters.items():
+            own = self.counters.setdefault(source, {})
+            for name, value in counters.items():
+                own[name] = own.get(name, 0) + value
+        for source, histograms in other.histograms.items():
+            own_histograms = self.histograms.setdefault(source, {})
+            for name, histogram in histograms.items():
+                own_histograms.setdefault(name, Histogram()).merge(histogram)
+
+
+_metrics = Snapshot()
+
+
+def set_sink(path: Path | None) -> None:
+    global _sink
+    with _lock:
+        _close_sink()
+        _sink = path
+
+
+def _close_sink() -> None:
+    global _sink_fd
+    if _sink_fd is not None and _sink_fd[0] == os.getpid():
+        os.close(_sink_fd[1])
+    _sink_fd = None
+
+
+def emit(kind: str, name: str, /, **fields: Any) -> None:
+    """
+    Write an event to the sink
+    """
+    global _sink_fd
+    if _sink is None:
+        return
+    line = json.dumps(
+        {
+            "ts": round(time.time(), 6),
+            "pid": os.getpid(),
+            "type": kind,
+            "name": name,
+            "source": _source.get(),
+            **fields,
+        },
+        default=str,
+        ensure_ascii=False,
+    )
+    with _lock:
+        if _sink_fd is None or _sink_fd[0] != os.getpid():
+            # e.g. in a forked worker process
+            _sink.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(_sink, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            _sink_fd = (os.getpid(), fd)
+        # a single write in append mode, so the lines of parallel processes
+        # do not mix
+        os.write(_sink_fd[1], f"{line}\n".encode())
+
+
+def current_source() -> str:
+    return _source.get()
+
+
+def count(name: str, n: int = 1, source: str | None = None) -> None:
+    with _lock:
+        counters = _metrics.counters.setdefault(source or _source.get(), {})
+        counters[name] = counters.get(name, 0) + n
+
+
+def observe(name: str, seconds: float, source: str | None = None) -> None:
+    with _lock:
+        histograms = _metrics.histograms.setdefault(source or _source.get(), {})
+        histograms.setdefault(name, Histogram()).observe(seconds)
+
+
+@contextlib.contextmanager
+def span(name: str, /, source: str | None = None, **fields: Any) -> Iterator[None]:
+    """
+    Time the enclosed step, can be used as decorator as well
+    """
+    token = _source.set(source) if source is not None else None
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        observe(name, seconds)
+        emit("span", name, seconds=round(seconds, 6), ok=ok, **fields)
+        if token is not None:
+            _source.reset(token)
+
+
+def snapshot() -> Snapshot:
+    with _lock:
+        return _metrics.model_copy(deep=True)
+
+
+def reset() -> None:
+    global _metrics
+    with _lock:
+        _metrics = Snapshot()
+
+
+def emit_summary(summary: Snapshot | None = None) -> None:
+    emit("summary", "metrics", **(summary or snapshot()).model_dump())
+
+
+def print_summary(summary: Snapshot | None = None) -> None:
+    summary = summary or snapshot()
+    print(
+        f"{'source':<15} {'step':<12} {'count':>7} {'total s':>9}"
+        f" {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}"
+    )
+    for source, histograms in sorted(summary.histograms.items()):
+        for name, h in sorted(histograms.items()):
+            print(
+                f"{source or '-':<15} {name:<12} {h.count:>7} {h.total:>9.2f}"
+                f" {h.quantile(0.5) * 1000:>8.1f} {h.quantile(0.95) * 1000:>8.1f}"
+                f" {h.max * 1000:>8.1f}"
+            )
+    for source, counters in sorted(summary.counters.items()):
+        values = " ".join(f"{k}={v}" for k, v in sorted(counters.items()))
+        print(f"{source or '-':<15} {values}")
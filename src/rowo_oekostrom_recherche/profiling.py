@@ -0,0 +1,44 @@
+"""
+cProfile dumps of the stages
+
+`profile(path)` profiles the code run in the block and writes the stats to
+`path`, to be read with `pstats` (`python -m pstats <path>`) or e.g.
+snakeviz. Without a path nothing is profiled.
+"""
+
+import contextlib
+import cProfile
+import pstats
+from pathlib import Path
+from typing import Iterator
+
+from rowo_oekostrom_recherche import log
+from rowo_oekostrom_recherche.scraper.base import DATA_DIR
+
+PROFILE_DIR = DATA_DIR / "profiles"
+# functions listed in the printed summary of a profile
+SUMMARY_LINES = 15
+
+
+@contextlib.contextmanager
+def profile(path: Path | None) -> Iterator[None]:
+    if path is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path)
+        log.info("Wrote profile", file=str(path))
+
+
+def print_summary(path: Path, lines: int = SUMMARY_LINES) -> None:
+    """
+    Print the functions of the profile `path` taking the most time
+    """
+    print(f"Profile {path}")
+    pstats.Stats(str(path)).sort_stats("cumulative").print_stats(lines)
@@ -0,0 +1,137 @@
+"""
+Compact records for the matching phase of combine
+
+A pydantic model instance keeps a `__dict__`, the set of its fields set and
+the cached normalized names, while most of its string fields are empty.
+While matching only the name and the PLZ are needed. `Record` keeps all
+values of a model in one tuple with the strings interned (the many empty
+strings, cities and labels are stored once) and is converted back to the
+pydantic model only where one is needed: printing and hashing (once).
+
+`Target` is a record of the combined table. It keeps the names of the
+records combined with it instead of the records themselves, as only the
+names end up in `combined.json`.
+"""
+
+import functools
+import sys
+from typing import Any, cast
+
+from rowo_oekostrom_recherche.scraper.base import (
+    AnbieterBase,
+    NameNormal,
+    normalize_name,
+)
+
+# fields of the combined model not stored in the values of a target
+TARGET_FIELDS = ("rowo2019", "sources")
+
+
+@functools.cache
+def fields_of(model: type[AnbieterBase]) -> tuple[str, ...]:
+    return tuple(f for f in model.model_fields if f not in TARGET_FIELDS)
+
+
+@functools.cache
+def positions(model: type[AnbieterBase]) -> dict[str, int]:
+    return {field: i for i, field in enumerate(fields_of(model))}
+
+
+class Record:
+    __slots__ = ("model", "values", "name_normalized", "content_hash")
+
+    def __init__(self, model: type[AnbieterBase], values: tuple[Any, ...]) -> None:
+        self.model = model
+        self.values = values
+        self.name_normalized = normalize_name(self.name)
+        # set by the first `incremental.record_hash`
+        self.content_hash: str | None = None
+
+    @classmethod
+    def from_model(cls, obj: AnbieterBase) -> "Record":
+        model = type(obj)
+        values = [obj.__dict__[f] for f in fields_of(model)]
+        return cls(
+            model, tuple([sys.intern(v) if type(v) is str else v for v in values])
+        )
+
+    def get(self, field: str, default: Any = None) -> Any:
+        i = positions(self.model).get(field)
+        return default if i is None else self.values[i]
+
+    @property
+    def name(self) -> str:
+        return self.values[positions(self.model)["name"]]
+
+    @property
+    def plz(self) -> str:
+        return self.values[positions(self.model)["plz"]]
+
+    @property
+    def name_normalized_plz(self) -> NameNormal:
+        return NameNormal(f"{self.plz} {self.name_normalized}")
+
+    def to_model(self) -> AnbieterBase:
+        return self.model.model_construct(
+            **dict(zip(fields_of(self.model), self.values))
+        )
+
+    def __str__(self) -> str:
+        return str(self.to_model())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.model.__name__}, {self.name!r})"
+
+
+class Target(Record):
+    __slots__ = ("rowo2019", "sources")
+
+    def __init__(
+        self,
+        model: type[AnbieterBase],
+        values: tuple[Any, ...],
+        rowo2019: bool = True,
+        sources: dict[str, str] | None = None,
+    ) -> None:
+        super().__init__(model, values)
+        self.rowo2019 = rowo2019
+        # name of the record combined with this one by source
+        self.sources: dict[str, str] = sources or {}
+
+    @classmethod
+    def from_model(cls, obj: AnbieterBase) -> "Target":
+        target = cast(Target, super().from_model(obj))
+        target.rowo2019 = getattr(obj, "rowo2019", True)
+        target.sources = {s: r.name for s, r in getattr(obj, "sources", {}).items()}
+        return target
+
+    @classmethod
+    def from_record(
+        cls, record: Record, model: type[AnbieterBase], source: str
+    ) -> "Target":
+        """
+        New entry of the combined table, made of a record of `source`
+        """
+        values = tuple(
+            record.get(field, model.model_fields[field].default)
+            for field in fields_of(model)
+        )
+        return cls(model, values, rowo2019=False, sources={source: record.name})
+
+    def to_model(self) -> AnbieterBase:
+        """
+        The combined model, without the records of the sources
+        """
+        return self.model.model_construct(
+            **dict(zip(fields_of(self.model), self.values)), rowo2019=self.rowo2019
+        )
+
+
+def compact(
+    data: dict[NameNormal, AnbieterBase], target: bool = False
+) -> dict[NameNormal, Record]:
+    """
+    Convert the models to records (targets if `target`)
+    """
+    record_type = Target if target else Record
+    return {key: record_type.from_model(obj) for key, obj in data.items()}
@@ -0,0 +1,120 @@
+"""
+Deferred review of the combine decisions
+
+A batch combine run never asks for input. Every record it can't decide
+automatically is written with its ranked candidates to `REVIEW_FILE`.
+`review()` works through this queue later and stores the decisions in the
+selection store, so the next combine run picks them up.
+
+    python -m rowo_oekostrom_recherche.review
+"""
+
+from typing import Literal, TypeVar
+
+from pydantic import BaseModel, Field
+
+from rowo_oekostrom_recherche.scraper.base import DATA_DIR
+from rowo_oekostrom_recherche.selections import SelectionStore
+
+REVIEW_FILE = DATA_DIR / "combine_review.json"
+
+T = TypeVar("T")
+
+
+def input_selection(choices: list[T]) -> T | None | Literal[-1]:
+    while True:
+        try:
+            result = input("> ").lower()
+            if result == "" and len(choices) == 1:
+                return choices[0]
+            if result == "x":
+                return None
+            if result == "s":
+                return -1
+            if result == "q":
+                print("Selected to exit")
+                raise KeyboardInterrupt()
+            return choices[int(result) - 1]
+        except (ValueError, IndexError):
+            print(
+                "Invalid input. Try again. Input must be number between 1 and 4 or x or q."
+            )
+
+
+class ReviewCandidate(BaseModel):
+    # full name of the combined entry, as stored in the selections
+    name: str
+    score: int
+    taken: bool
+    description: str
+    # the candidate of the global assignment, but not certain enough
+    suggested: bool = False
+
+
+class ReviewItem(BaseModel):
+    source: str
+    anbieter: str
+    description: str
+    candidates: list[ReviewCandidate]
+
+
+class ReviewQueue(BaseModel):
+    items: list[ReviewItem] = Field(default_factory=list)
+
+    def add(self, item: ReviewItem) -> None:
+        self.items.append(item)
+
+    def keys(self) -> set[tuple[str, str]]:
+        return {(item.source, item.anbieter) for item in self.items}
+
+
+def load_queue() -> ReviewQueue:
+    if not REVIEW_FILE.exists():
+        return ReviewQueue()
+    return ReviewQueue.model_validate_json(REVIEW_FILE.read_text())
+
+
+def save_queue(queue: ReviewQueue) -> None:
+    tmp = REVIEW_FILE.with_suffix(".tmp")
+    tmp.write_text(queue.model_dump_json(indent=2))
+    tmp.replace(REVIEW_FILE)
+
+
+def review() -> None:
+    """
+    Ask for every queued record which candidate is the right one
+    """
+    queue = load_queue()
+    selections = SelectionStore()
+    open_items = [
+        item for item in queue.items if (item.source, item.anbieter) not in selections
+    ]
+    print(f"{len(open_items)} records to review")
+    done = 0
+    try:
+        for item in open_items:
+            print(f"Looking for match ({item.source}): {item.description}")
+            for i, candidate in enumerate(item.candidates, start=1):
+                dup = "!taken already!" if candidate.taken else ""
+                if candidate.suggested:
+                    dup = f"(suggested) {dup}"
+                indent = " " * 5
+                print(
+                    f" ({i:>2}) [{candidate.score:>3} %] {dup}{indent}"
+                    f"{candidate.description}"
+                )
+            print(" (x) Add as new entry (q to quit, s to skip)")
+            selection = input_selection([c.name for c in item.candidates])
+            choice = "-1" if selection == -1 else selection
+            selections.add(item.source, item.anbieter, choice)
+            done += 1
+    except KeyboardInterrupt:
+        print(f"Reviewed {done} of {len(open_items)}, exiting")
+    queue.items = [
+        item for item in queue.items if (item.source, item.anbieter) not in selections
+    ]
+    save_queue(queue)
+
+
+if __name__ == "__main__":
+    review()
@@ -0,0 +1,97 @@
+"""
+Batch computation of fuzzy match scores
+
+All queries of a combine run are scored against their blocked candidates
+before the first prompt, chunked over a process pool. Only the best `LIMIT`
+candidates above `SCORE_CUTOFF` are kept per query.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+from thefuzz import process
+
+from rowo_oekostrom_recherche import log, metrics
+from rowo_oekostrom_recherche.candidates import CandidateIndex
+from rowo_oekostrom_recherche.scraper.base import NameNormal
+
+LIMIT = 20
+SCORE_CUTOFF = 75
+CHUNK_SIZE = 64
+
+Scored = list[tuple[NameNormal, int]]
+
+
+def score(query: NameNormal, choices: Iterable[NameNormal]) -> Scored:
+    return process.extractBests(
+        query, list(choices), limit=LIMIT, score_cutoff=SCORE_CUTOFF
+    )
+
+
+def score_chunk(chunk: list[tuple[NameNormal, list[NameNormal]]]) -> list[Scored]:
+    return [score(query, choices) for query, choices in chunk]
+
+
+class CandidateScores:
+    """
+    Precomputed, ranked candidates for the queries against one index
+
+    Keys added to the index after the precomputation are scored on access,
+    so the result is the same as scoring against the current index.
+    """
+
+    def __init__(self, index: CandidateIndex) -> None:
+        self.index = index
+        # scores with the index generation they have been computed for
+        self.scores: dict[NameNormal, tuple[int, Scored]] = {}
+
+    def precompute(
+        self,
+        queries: Iterable[NameNormal],
+        jobs: int | None = None,
+        source: str | None = None,
+    ) -> None:
+        """
+        Score the queries not scored yet, timed for `source`
+        """
+        todo = [
+            (query, sorted(self.index.candidates(query)))
+            for query in dict.fromkeys(queries)
+            if query not in self.scores
+        ]
+        if not todo:
+            return
+        chunks = [todo[i : i + CHUNK_SIZE] for i in range(0, len(todo), CHUNK_SIZE)]
+        jobs = jobs or os.cpu_count() or 1
+        with metrics.span("score", source=source, queries=len(todo), jobs=jobs):
+            log.info("Scoring candidates", queries=str(len(todo)), jobs=str(jobs))
+            if jobs == 1 or len(chunks) == 1:
+                self._store(todo, map(score_chunk, chunks))
+            else:
+                with ProcessPoolExecutor(max_workers=jobs) as pool:
+                    self._store(todo, pool.map(score_chunk, chunks))
+
+    def _store(
+        self,
+        todo: list[tuple[NameNormal, list[NameNormal]]],
+        results: Iterable[list[Scored]],
+    ) -> None:
+        generation = self.index.generation
+        for (query, _), scored in zip(
+            todo, (s for chunk in results for s in chunk)
+        ):
+            self.scores[query] = (generation, scored)
+
+    def get(self, query: NameNormal) -> Scored:
+        if query not in self.scores:
+            return score(query, self.index.candidates(query))
+        generation, scored = self.scores[query]
+        added = self.index.added_since(generation)
+        if added:
+            candidates = self.index.candidates(query)
+            new = score(query, (key for key in added if key in candidates))
+            if new:
+                scored = sorted(scored + new, key=lambda s: s[1], reverse=True)
+                scored = scored[:LIMIT]
+        return scored
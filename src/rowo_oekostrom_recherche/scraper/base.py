@@ -1,4 +1,8 @@
 import datetime
+import email.utils
+import functools
+import threading
+import time
 from pathlib import Path
 from typing import Generic, NewType, Protocol, TypeVar
 
@@ -40,6 +44,10 @@ word_to_remove = {
 }
 
 
+# Names are normalized over and over again while combining, so remember them.
+# Note: the chained str.replace is faster than a single pass with str.translate
+# or a regex, see benchmarks/bench_normalize.py
+@functools.lru_cache(maxsize=16384)
 def normalize_name(name: str) -> NameNormal:
     name = name.lower()
     if name[0].isnumeric():
@@ -65,11 +73,12 @@ class AnbieterBase(Address):
     mail: str = ""
     homepage: str = ""
 
-    @property
+    # Computed once per instance, the name is not changed after creation
+    @functools.cached_property
     def name_normalized(self) -> NameNormal:
         return normalize_name(self.name)
 
-    @property
+    @functools.cached_property
     def name_normalized_plz(self) -> NameNormal:
         return NameNormal(f"{self.plz} {self.name_normalized}")
 
@@ -98,3 +107,115 @@ class ScrapeResults(BaseModel, Generic[TAnbieterBase]):
 
 class Scraper(Protocol):
     def __call__(self) -> ScrapeResults: ...
+
+
+class RequestPolicy(BaseModel):
+    """
+    How the scrapers talk to a portal
+    """
+
+    # requests per second per host, `burst` requests may be sent at once
+    rate: float = 10.0
+    burst: int = 10
+    # retries after a transport error or a `retry_status` response
+    retries: int = 4
+    # first wait before retrying, doubled on every retry
+    backoff: float = 1.0
+    max_backoff: float = 60.0
+    timeout: float = 30.0
+    retry_status: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+    def delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """
+        Seconds to wait before retry number `attempt` (starting with 1)
+
+        A `Retry-After` header of the response takes precedence.
+        """
+        if retry_after:
+            seconds: float | None = None
+            if retry_after.strip().isdigit():
+                seconds = float(retry_after)
+            else:
+                try:
+                    date = email.utils.parsedate_to_datetime(retry_after)
+                except (TypeError, ValueError):
+                    pass
+                else:
+                    if date.tzinfo is None:
+                        # a `-0000` zone, meaning UTC as well
+                        date = date.replace(tzinfo=datetime.timezone.utc)
+                    seconds = (
+                        date - datetime.datetime.now(datetime.timezone.utc)
+                    ).total_seconds()
+            if seconds is not None:
+                return min(max(seconds, 0.0), self.max_backoff)
+        return min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+
+
+DEFAULT_POLICY = RequestPolicy()
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket, refilled with `rate` tokens per second
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token and get the seconds to wait until it may be used
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+# by host, rate and burst
+_buckets: dict[tuple[str, float, int], TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def host_bucket(host: str, policy: RequestPolicy = DEFAULT_POLICY) -> TokenBucket:
+    """
+    The bucket shared by all requests to `host` with the rate of `policy`
+    """
+    key = (host, policy.rate, policy.burst)
+    with _buckets_lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(policy.rate, policy.burst)
+        return _buckets[key]
+
+
+class RequestStats(BaseModel):
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+
+
+# request counters per host
+REQUEST_STATS: dict[str, RequestStats] = {}
+
+
+def host_stats(host: str) -> RequestStats:
+    return REQUEST_STATS.setdefault(host, RequestStats())
+
+
+def total_stats() -> RequestStats:
+    return RequestStats(
+        requests=sum(s.requests for s in REQUEST_STATS.values()),
+        retries=sum(s.retries for s in REQUEST_STATS.values()),
+        failures=sum(s.failures for s in REQUEST_STATS.values()),
+    )
@@ -0,0 +1,387 @@
+"""
+Shared HTTP client for all scrapers with a persistent response cache
+
+Every successful GET response is stored below `CACHE_DIR` together with its
+`ETag` / `Last-Modified` header. The next request for the same URL is sent
+as conditional request, so an unchanged page is answered with a cheap `304`
+and served from disk.
+
+Below the cache, every request going to the network follows the
+`RequestPolicy` of `base`: per host rate limit, timeouts and retries with
+exponential backoff.
+
+In offline mode (`set_offline(True)` or `ROWO_OFFLINE=1`) the network is
+never touched and only cached pages are replayed, which allows to rerun the
+parsers without crawling the portals again.
+"""
+
+import asyncio
+import datetime
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import httpx
+from pydantic import BaseModel, Field
+
+from rowo_oekostrom_recherche import log, metrics
+from rowo_oekostrom_recherche.scraper.base import (
+    DATA_DIR,
+    DEFAULT_POLICY,
+    RequestPolicy,
+    host_bucket,
+    host_stats,
+)
+
+CACHE_DIR = DATA_DIR / "http_cache"
+
+# Only these headers are stored and replayed from the cache
+KEPT_HEADERS = ("content-type", "etag", "last-modified")
+# headers not matching the already decoded body anymore, never passed on
+DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+# validators of a stored entry a `304` might update
+VALIDATORS = ("etag", "last-modified")
+
+_offline: bool = os.environ.get("ROWO_OFFLINE", "") not in ("", "0")
+_client: httpx.Client | None = None
+
+
+def set_offline(offline: bool) -> None:
+    global _offline
+    _offline = offline
+
+
+def is_offline() -> bool:
+    return _offline
+
+
+class OfflineCacheMiss(httpx.TransportError):
+    pass
+
+
+class CacheEntry(BaseModel):
+    url: str
+    status_code: int
+    headers: dict[str, str] = Field(default_factory=dict)
+    stored: datetime.datetime = Field(default_factory=datetime.datetime.now)
+
+    @property
+    def etag(self) -> str | None:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> str | None:
+        return self.headers.get("last-modified")
+
+
+class ResponseCache:
+    def __init__(self, directory: Path = CACHE_DIR) -> None:
+        self.directory = directory
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return (
+            self.directory / f"{key}.json",
+            self.directory / f"{key}.body",
+        )
+
+    def load(self, url: str) -> tuple[CacheEntry, bytes] | None:
+        meta_file, body_file = self._paths(url)
+        if not meta_file.exists() or not body_file.exists():
+            return None
+        return (
+            CacheEntry.model_validate_json(meta_file.read_text()),
+            body_file.read_bytes(),
+        )
+
+    def store(self, url: str, response: httpx.Response) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_file, body_file = self._paths(url)
+        entry = CacheEntry(
+            url=url,
+            status_code=response.status_code,
+            headers={
+                k: response.headers[k] for k in KEPT_HEADERS if k in response.headers
+            },
+        )
+        # write body first and replace atomically so a crash never leaves
+        # metadata pointing to a partial body
+        for target, content in (
+            (body_file, response.content),
+            (meta_file, entry.model_dump_json().encode()),
+        ):
+            tmp = target.with_suffix(f"{target.suffix}.tmp")
+            tmp.write_bytes(content)
+            tmp.replace(target)
+
+    def refresh(self, entry: CacheEntry, response: httpx.Response) -> CacheEntry:
+        """
+        Take over the validators a `304` sent for the stored `entry`
+        """
+        headers = {
+            **entry.headers,
+            **{k: response.headers[k] for k in VALIDATORS if k in response.headers},
+        }
+        if headers == entry.headers:
+            return entry
+        refreshed = entry.model_copy(update={"headers": headers})
+        meta_file, _ = self._paths(entry.url)
+        tmp = meta_file.with_suffix(".json.tmp")
+        tmp.write_text(refreshed.model_dump_json())
+        tmp.replace(meta_file)
+        return refreshed
+
+
+class CachingTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    Transport storing GET responses in a `ResponseCache`
+
+    Wraps a sync and/or an async transport, so it can be used for both
+    `httpx.Client` and `httpx.AsyncClient`.
+    """
+
+    def __init__(
+        self,
+        cache: ResponseCache,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.cache = cache
+        self.transport = transport
+        self.async_transport = async_transport
+
+    def _prepare(
+        self, request: httpx.Request
+    ) -> tuple[tuple[CacheEntry, bytes] | None, httpx.Response | None]:
+        """
+        Load the cached entry and add the validators to the request.
+
+        Returns a response if the request can be answered without network
+        """
+        url = str(request.url)
+        cached = self.cache.load(url)
+        if is_offline():
+            if cached is None:
+                raise OfflineCacheMiss(f"Not cached: {url}", request=request)
+            log.info("Cache replay", url=url)
+            metrics.count("cache_hit")
+            return cached, self._from_cache(request, cached)
+        if cached is not None:
+            entry = cached[0]
+            if entry.etag:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request.headers["If-Modified-Since"] = entry.last_modified
+        return cached, None
+
+    def _finish(
+        self,
+        request: httpx.Request,
+        response: httpx.Response,
+        cached: tuple[CacheEntry, bytes] | None,
+    ) -> httpx.Response:
+        url = str(request.url)
+        if response.status_code == 304 and cached is not None:
+            log.info("Cache hit", url=url)
+            metrics.count("cache_hit")
+            entry = self.cache.refresh(cached[0], response)
+            return self._from_cache(request, (entry, cached[1]))
+        # e.g. Location of a redirect and Retry-After are passed on
+        result = httpx.Response(
+            status_code=response.status_code,
+            headers=[
+                (k, v)
+                for k, v in response.headers.multi_items()
+                if k.lower() not in DROPPED_HEADERS
+            ],
+            content=response.content,
+            request=request,
+            extensions=response.extensions,
+        )
+        if response.status_code == 200:
+            self.cache.store(url, result)
+        return result
+
+    @staticmethod
+    def _from_cache(
+        request: httpx.Request, cached: tuple[CacheEntry, bytes]
+    ) -> httpx.Response:
+        entry, body = cached
+        return httpx.Response(
+            status_code=entry.status_code,
+            headers=entry.headers,
+            content=body,
+            request=request,
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        assert self.transport is not None, "No sync transport configured"
+        if request.method != "GET":
+            return self.transport.handle_request(request)
+        with metrics.span("fetch", url=str(request.url)):
+            cached, response = self._prepare(request)
+            if response is not None:
+                return response
+            response = self.transport.handle_request(request)
+            try:
+                response.read()
+            finally:
+                response.close()
+            return self._finish(request, response, cached)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        assert self.async_transport is not None, "No async transport configured"
+        if request.method != "GET":
+            return await self.async_transport.handle_async_request(request)
+        with metrics.span("fetch", url=str(request.url)):
+            cached, response = self._prepare(request)
+            if response is not None:
+                return response
+            response = await self.async_transport.handle_async_request(request)
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+            return self._finish(request, response, cached)
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+
+    async def aclose(self) -> None:
+        if self.async_transport is not None:
+            await self.async_transport.aclose()
+
+
+class PolicyTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    Transport applying the rate limit and retries of a `RequestPolicy`
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport | httpx.AsyncBaseTransport,
+        policy: RequestPolicy = DEFAULT_POLICY,
+    ) -> None:
+        self.transport = transport
+        self.policy = policy
+
+    def _should_retry(
+        self,
+        request: httpx.Request,
+        attempt: int,
+        response: httpx.Response | None,
+        error: Exception | None,
+    ) -> float | None:
+        """
+        Get the delay before the next attempt or None if not to retry
+        """
+        stats = host_stats(request.url.host)
+        if response is not None and response.status_code not in (
+            self.policy.retry_status
+        ):
+            return None
+        if attempt > self.policy.retries:
+            stats.failures += 1
+            metrics.count("request_failed")
+            return None
+        stats.retries += 1
+        metrics.count("retried")
+        if response is None:
+            retry_after = None
+            reason = repr(error)
+        else:
+            retry_after = response.headers.get("Retry-After")
+            reason = str(response.status_code)
+        delay = self.policy.delay(attempt, retry_after)
+        log.info(
+            "Retrying request",
+            url=str(request.url),
+            reason=reason,
+            delay=f"{delay:.1f}",
+        )
+        return delay
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        assert isinstance(self.transport, httpx.BaseTransport)
+        bucket = host_bucket(request.url.host, self.policy)
+        attempt = 0
+        while True:
+            attempt += 1
+            time.sleep(bucket.reserve())
+            host_stats(request.url.host).requests += 1
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError as e:
+                delay = self._should_retry(request, attempt, None, e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._should_retry(request, attempt, response, None)
+                if delay is None:
+                    return response
+                response.close()
+            time.sleep(delay)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        assert isinstance(self.transport, httpx.AsyncBaseTransport)
+        bucket = host_bucket(request.url.host, self.policy)
+        attempt = 0
+        while True:
+            attempt += 1
+            await asyncio.sleep(bucket.reserve())
+            host_stats(request.url.host).requests += 1
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                delay = self._should_retry(request, attempt, None, e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._should_retry(request, attempt, response, None)
+                if delay is None:
+                    return response
+                await response.aclose()
+            await asyncio.sleep(delay)
+
+    def close(self) -> None:
+        if isinstance(self.transport, httpx.BaseTransport):
+            self.transport.close()
+
+    async def aclose(self) -> None:
+        if isinstance(self.transport, httpx.AsyncBaseTransport):
+            await self.transport.aclose()
+
+
+def get_client() -> httpx.Client:
+    """
+    Get the client shared by all scrapers
+    """
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            transport=CachingTransport(
+                ResponseCache(),
+                transport=PolicyTransport(httpx.HTTPTransport()),
+            ),
+            timeout=DEFAULT_POLICY.timeout,
+        )
+    return _client
+
+
+def get_async_client(limits: httpx.Limits | None = None) -> httpx.AsyncClient:
+    """
+    Create an async client using the shared cache
+
+    A new client is needed for every event loop, so use it as context manager.
+    """
+    return httpx.AsyncClient(
+        transport=CachingTransport(
+            ResponseCache(),
+            async_transport=PolicyTransport(
+                httpx.AsyncHTTPTransport(limits=limits or httpx.Limits())
+            ),
+        ),
+        timeout=DEFAULT_POLICY.timeout,
+    )
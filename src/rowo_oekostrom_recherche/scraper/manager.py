@@ -1,8 +1,150 @@
-from rowo_oekostrom_recherche.scraper.base import Scraper, DATA_DIR
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable
 
+from pydantic import BaseModel, Field
 
-def run_and_save(scraper: Scraper) -> None:
-    data = scraper()
+from rowo_oekostrom_recherche import log, metrics, profiling, tables
+from rowo_oekostrom_recherche.metrics import Snapshot
+from rowo_oekostrom_recherche.scraper.base import (
+    DATA_DIR,
+    REQUEST_STATS,
+    Scraper,
+    ScrapeResults,
+    total_stats,
+)
+from rowo_oekostrom_recherche.scraper.registry import SCRAPERS, scraper
+
+
+class RunReport(BaseModel):
+    source: str
+    ok: bool
+    records: int = 0
+    seconds: float = 0.0
+    retries: int = 0
+    failed_requests: int = 0
+    error: str = ""
+    metrics: Snapshot = Field(default_factory=Snapshot)
+
+
+def save(data: ScrapeResults) -> Path:
+    """
+    Write the results atomically, so a failing run never leaves a broken file
+
+    The records are written as table (json lines, parquet) as well.
+    """
     target = DATA_DIR / f"{data.source}.json"
-    target.write_text(data.model_dump_json(indent=2))
+    tmp = target.with_suffix(".json.tmp")
+    with metrics.span("write", source=data.source):
+        tmp.write_text(data.model_dump_json(indent=2))
+        tmp.replace(target)
+    tables.save_results(data, target.parent)
+    return target
+
+
+def run_and_save(scraper: Scraper) -> None:
+    save(scraper())
+    metrics.print_summary()
+    metrics.emit_summary()
+
+
+def run_source(source: str, profile_dir: Path | None = None) -> RunReport:
+    """
+    Run the scraper of `source` and save its results, never raises
+
+    With `profile_dir` the run is profiled to `scrape-<source>.prof` there.
+    """
+    start = time.perf_counter()
+    # a worker process might have run another scraper before
+    REQUEST_STATS.clear()
+    metrics.reset()
+    try:
+        profile = profile_dir / f"scrape-{source}.prof" if profile_dir else None
+        with profiling.profile(profile):
+            data = scraper(source)()
+            save(data)
+    except Exception as e:
+        traceback.print_exc()
+        stats = total_stats()
+        return RunReport(
+            source=source,
+            ok=False,
+            seconds=time.perf_counter() - start,
+            retries=stats.retries,
+            failed_requests=stats.failures,
+            error=repr(e),
+            metrics=metrics.snapshot(),
+        )
+    stats = total_stats()
+    return RunReport(
+        source=source,
+        ok=True,
+        records=len(data.results),
+        seconds=time.perf_counter() - start,
+        retries=stats.retries,
+        failed_requests=stats.failures,
+        metrics=metrics.snapshot(),
+    )
+
+
+def run_all(
+    sources: Iterable[str] | None = None,
+    jobs: int | None = None,
+    profile_dir: Path | None = None,
+) -> list[RunReport]:
+    """
+    Run all (or the given) scrapers in parallel, each in its own process
+
+    A failing scraper does not affect the others, its old results are kept.
+    With `profile_dir` every scraper writes its profile there.
+    """
+    to_run = list(SCRAPERS if sources is None else sources)
+    start = time.perf_counter()
+    reports: list[RunReport] = []
+    with ProcessPoolExecutor(max_workers=jobs or len(to_run) or 1) as pool:
+        futures = {
+            pool.submit(run_source, source, profile_dir): source
+            for source in to_run
+        }
+        for future in as_completed(futures):
+            try:
+                report = future.result()
+            except Exception as e:
+                # e.g. the worker process died
+                report = RunReport(source=futures[future], ok=False, error=repr(e))
+            reports.append(report)
+            log.info(
+                "Scraper finished" if report.ok else "Scraper failed",
+                scraper=report.source,
+                records=str(report.records),
+                seconds=f"{report.seconds:.1f}",
+            )
+    reports.sort(key=lambda r: r.source)
+
+    print(
+        f"{'source':<15} {'status':<7} {'records':>8} {'seconds':>8}"
+        f" {'retries':>8} {'failed':>8}"
+    )
+    for report in reports:
+        status = "ok" if report.ok else "FAILED"
+        print(
+            f"{report.source:<15} {status:<7} {report.records:>8} "
+            f"{report.seconds:>8.1f} {report.retries:>8} "
+            f"{report.failed_requests:>8} {report.error}"
+        )
+    print(f"Total wall clock time: {time.perf_counter() - start:.1f}s")
+
+    # the metrics of the worker processes
+    summary = Snapshot()
+    for report in reports:
+        summary.merge(report.metrics)
+    print()
+    metrics.print_summary(summary)
+    metrics.emit_summary(summary)
+    return reports
+
 
+if __name__ == "__main__":
+    run_all()
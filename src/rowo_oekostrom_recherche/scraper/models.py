@@ -0,0 +1,32 @@
+"""
+Models of the records of every source
+
+Only pydantic is needed here, so combining and reading the results never
+imports the scrapers with their http and html dependencies.
+"""
+
+from rowo_oekostrom_recherche.scraper.base import AnbieterBase
+
+
+class Oekotest(AnbieterBase):
+    tarif: str
+    tarif_url: str
+    bewertung: str
+
+
+class OkPower(AnbieterBase):
+    tarif: str
+    tarif_url: str
+    cert_info: str
+
+
+class RoWo(AnbieterBase):
+    kennzeichnung_url: str = ""
+
+
+class Stromauskunft(AnbieterBase):
+    portal_url: str
+
+
+class VerivoxBase(AnbieterBase):
+    portal_url: str
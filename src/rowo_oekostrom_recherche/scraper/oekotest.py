@@ -1,25 +1,21 @@
-import httpx
 import bs4
 import traceback
 from rowo_oekostrom_recherche.scraper.base import (
-    AnbieterBase,
     Address,
     ScrapeResults,
 )
+from rowo_oekostrom_recherche.scraper.http_cache import get_client
 from rowo_oekostrom_recherche.scraper.manager import run_and_save
-from rowo_oekostrom_recherche import log
+from rowo_oekostrom_recherche.scraper.models import Oekotest
+from rowo_oekostrom_recherche.scraper.parse import parse_only
+from rowo_oekostrom_recherche import log, metrics
 
 # Note: Die Seite wird nicht aktualisiert. Es muss jeweils der aktuelle Test
 #       herausgesucht werden
 DOMAIN = "https://www.oekotest.de"
 BASE_URL = "https://www.oekotest.de/bauen-wohnen/Oekostrom-Vergleich-Diese-Tarife-der-Oekostromanbieter-sind-mangelhaft_12592_1.html"
 SCRAPER = "oekotest"
-
-
-class Oekotest(AnbieterBase):
-    tarif: str
-    tarif_url: str
-    bewertung: str
+STRAINER = bs4.SoupStrainer("a", class_="product-link")
 
 
 def scrape_table(tag: bs4.Tag) -> Oekotest | None:
@@ -58,22 +54,29 @@ def scrape_table(tag: bs4.Tag) -> Oekotest | None:
         return None
 
 
+def parse_page(content: bytes) -> list[Oekotest]:
+    results: list[Oekotest] = []
+    with metrics.span("parse"), parse_only(content, STRAINER) as soup:
+        links = soup.find_all("a", class_="product-link")
+        total = len(links)
+        for i, table in enumerate(links):
+            result = scrape_table(table)
+            if result:
+                results.append(result)
+                metrics.count("ok")
+                log.info("Scrape ok", num=f"{i + 1}/{total}", scraper=SCRAPER)
+            else:
+                metrics.count("failed")
+                log.info("Scrape failed", num=f"{i+1}/{total}", scraper=SCRAPER)
+    return results
+
+
+@metrics.span("scrape", source=SCRAPER)
 def scrape() -> ScrapeResults[Oekotest]:
     log.info("Start scraping", scraper=SCRAPER)
-    site = httpx.get(BASE_URL)
+    site = get_client().get(BASE_URL)
     site.raise_for_status()
-    soup = bs4.BeautifulSoup(site.content, "html.parser")
-    results: list[Oekotest] = []
-    links = soup.find_all("a", class_="product-link")
-    total = len(links)
-    for i, table in enumerate(links):
-        result = scrape_table(table)
-        if result:
-            results.append(result)
-            log.info("Scrape ok", num=f"{i + 1}/{total}", scraper=SCRAPER)
-        else:
-            log.info("Scrape failed", num=f"{i+1}/{total}", scraper=SCRAPER)
-    return ScrapeResults(results=results, source=SCRAPER)
+    return ScrapeResults(results=parse_page(site.content), source=SCRAPER)
 
 
 if __name__ == "__main__":
@@ -1,22 +1,16 @@
-import httpx
 import bs4
 import traceback
-from rowo_oekostrom_recherche.scraper.base import (
-    AnbieterBase,
-    ScrapeResults,
-)
+from rowo_oekostrom_recherche.scraper.base import ScrapeResults
+from rowo_oekostrom_recherche.scraper.http_cache import get_client
 from rowo_oekostrom_recherche.scraper.manager import run_and_save
-from rowo_oekostrom_recherche import log
+from rowo_oekostrom_recherche.scraper.models import OkPower
+from rowo_oekostrom_recherche.scraper.parse import parse_only
+from rowo_oekostrom_recherche import log, metrics
 
 DOMAIN = "https://www.ok-power.de"
 BASE_URL = "https://www.ok-power.de/fuer-strom-kunden/anbieter-uebersicht.html"
 SCRAPER = "okpower"
-
-
-class OkPower(AnbieterBase):
-    tarif: str
-    tarif_url: str
-    cert_info: str
+STRAINER = bs4.SoupStrainer(id="anbieterliste")
 
 
 def scrape_table(table: bs4.Tag) -> OkPower | None:
@@ -94,22 +88,29 @@ def scrape_table(table: bs4.Tag) -> OkPower | None:
         return None
 
 
+def parse_page(content: bytes) -> list[OkPower]:
+    results: list[OkPower] = []
+    with metrics.span("parse"), parse_only(content, STRAINER) as soup:
+        tables = soup.select("#anbieterliste .anbieter")
+        total = len(tables)
+        for i, table in enumerate(tables):
+            result = scrape_table(table)
+            if result:
+                results.append(result)
+                metrics.count("ok")
+                log.info("Scrape ok", num=f"{i + 1}/{total}", scraper=SCRAPER)
+            else:
+                metrics.count("failed")
+                log.info("Scrape failed", num=f"{i+1}/{total}", scraper=SCRAPER)
+    return results
+
+
+@metrics.span("scrape", source=SCRAPER)
 def scrape() -> ScrapeResults[OkPower]:
     log.info("Start scraping", scraper=SCRAPER)
-    site = httpx.get(BASE_URL)
+    site = get_client().get(BASE_URL)
     site.raise_for_status()
-    soup = bs4.BeautifulSoup(site.content, "html.parser")
-    results: list[OkPower] = []
-    tables = soup.select("#anbieterliste .anbieter")
-    total = len(tables)
-    for i, table in enumerate(tables):
-        result = scrape_table(table)
-        if result:
-            results.append(result)
-            log.info("Scrape ok", num=f"{i + 1}/{total}", scraper=SCRAPER)
-        else:
-            log.info("Scrape failed", num=f"{i+1}/{total}", scraper=SCRAPER)
-    return ScrapeResults(results=results, source=SCRAPER)
+    return ScrapeResults(results=parse_page(site.content), source=SCRAPER)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+"""
+Parse only the parts of a page a scraper needs
+
+Building the full tree of a portal page is the main cost of parsing it.
+`parse_only` builds only the subtrees matching a `SoupStrainer` and frees
+them again as soon as the data has been extracted.
+
+`lxml` is used as parser if it is installed, as it is a lot faster than the
+built-in `html.parser`.
+"""
+
+import contextlib
+import importlib.util
+from typing import Iterator
+
+import bs4
+
+PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+@contextlib.contextmanager
+def parse_only(
+    content: bytes | str, strainer: bs4.SoupStrainer
+) -> Iterator[bs4.BeautifulSoup]:
+    """
+    Parse only the elements matching `strainer` (including their children)
+
+    The document is decomposed when leaving the context, so only plain
+    values (str) must be kept from it.
+    """
+    soup = bs4.BeautifulSoup(content, PARSER, parse_only=strainer)
+    try:
+        yield soup
+    finally:
+        soup.decompose()
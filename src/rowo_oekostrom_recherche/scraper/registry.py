@@ -0,0 +1,40 @@
+"""
+Registry of the sources
+
+Maps every source to the model of its records and the module of its
+scraper. The models are cheap to import, the scraper modules (httpx, bs4,
+pandas, ...) are only imported when a scraper is run.
+"""
+
+import importlib
+
+from rowo_oekostrom_recherche.scraper import models
+from rowo_oekostrom_recherche.scraper.base import AnbieterBase, Scraper
+
+MODELS: dict[str, type[AnbieterBase]] = {
+    "oekotest": models.Oekotest,
+    "okpower": models.OkPower,
+    "rowo2019": models.RoWo,
+    "stromauskunft": models.Stromauskunft,
+    "verivox": models.VerivoxBase,
+}
+
+# as module name, so the scrapers are only imported in the process running them
+SCRAPERS: dict[str, str] = {
+    "oekotest": "rowo_oekostrom_recherche.scraper.oekotest",
+    "okpower": "rowo_oekostrom_recherche.scraper.okpower",
+    "rowo2019": "rowo_oekostrom_recherche.scraper.rowo_2019",
+    "stromauskunft": "rowo_oekostrom_recherche.scraper.stromauskunft",
+    "verivox": "rowo_oekostrom_recherche.scraper.verivox",
+}
+
+
+def model(source: str) -> type[AnbieterBase]:
+    return MODELS[source]
+
+
+def scraper(source: str) -> Scraper:
+    """
+    The scrape function of `source`, importing its module
+    """
+    return importlib.import_module(SCRAPERS[source]).scrape
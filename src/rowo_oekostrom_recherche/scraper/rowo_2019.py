@@ -1,31 +1,63 @@
-import traceback
+"""
+Providers of the RoWo Ökostromreport 2019, read from its excel file
+
+The sheet is read row by row in read-only mode (no DataFrame), the header
+is mapped to the fields once and every row becomes a `RoWo` record.
+Cells are converted like `pandas.read_excel` did before: empty cells and
+the usual NA markers are "", whole numbers lose their `.0`.
+"""
+
+import math
 from pathlib import Path
+from typing import Iterator
+
+import openpyxl
 
-import bs4
-import httpx
-import numpy as np
-import pandas as pd
-from rowo_oekostrom_recherche import log
-from rowo_oekostrom_recherche.scraper.base import AnbieterBase, ScrapeResults
+from rowo_oekostrom_recherche import metrics
+from rowo_oekostrom_recherche.scraper.base import ScrapeResults
 from rowo_oekostrom_recherche.scraper.manager import run_and_save
+from rowo_oekostrom_recherche.scraper.models import RoWo
 
 BASEDIR = Path(__file__).parent.parent.parent.parent.parent
 
 FILE = f"{BASEDIR}/Ökostromreport 2019/anbieterliste-2020_final.xlsx"
 SCRAPER = "rowo2019"
 
+# column of the sheet by field
+COLUMNS = {
+    "name": "Erneuerbare Energien 1",
+    "street": "Adresse",
+    "city": "Stadt",
+    "plz": "PLZ",
+    "phone": "Telefon",
+    "mail": "Kontakt (nur für relevante Anbieter)",
+    "homepage": "URL",
+    "kennzeichnung_url": "Kennzeichnung Link",
+}
+URL_FIELDS = ("homepage", "kennzeichnung_url")
+# cell values read as missing by pandas
+NA_VALUES = frozenset(
+    {
+        "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+        "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+        "n/a", "nan", "null",
+    }
+)  # fmt: skip
 
-class RoWo(AnbieterBase):
-    kennzeichnung_url: str = ""
 
-
-def to_string(val: float | str) -> str:
-    if not isinstance(val, str) and np.isnan(val):
+def to_string(val: object) -> str:
+    if val is None:
         return ""
-    return str(val)
+    if isinstance(val, float):
+        if math.isnan(val):
+            return ""
+        if val.is_integer():
+            val = int(val)
+    text = str(val)
+    return "" if text in NA_VALUES else text
 
 
-def to_url(val: float | str) -> str:
+def to_url(val: object) -> str:
     text = to_string(val)
     if not text:
         return text
@@ -34,31 +66,40 @@ def to_url(val: float | str) -> str:
     return text
 
 
-def to_plz(val: float) -> str:
-    if np.isnan(val):
-        return ""
-    return f"{int(val):05d}"
+def read_records(path: str | Path) -> Iterator[RoWo]:
+    """
+    The records of the first sheet of `path`, one row at a time
+
+    Rows without any value are skipped.
+    """
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        missing = [c for c in COLUMNS.values() if c not in header]
+        if missing:
+            raise ValueError(f"Missing columns in {path}: {', '.join(missing)}")
+        index = {field: header.index(column) for field, column in COLUMNS.items()}
+        for row in rows:
+            values = {
+                field: to_string(row[i]) if i < len(row) else ""
+                for field, i in index.items()
+            }
+            if not any(values.values()):
+                continue
+            for field in URL_FIELDS:
+                values[field] = to_url(values[field])
+            yield RoWo(**values)
+    finally:
+        workbook.close()
 
 
+@metrics.span("scrape", source=SCRAPER)
 def scrape() -> ScrapeResults[RoWo]:
-    data = pd.read_excel(FILE)
-    records = data.to_dict(orient="records")
-    return ScrapeResults(
-        results=[
-            RoWo(
-                name=to_string(r["Erneuerbare Energien 1"]),
-                street=to_string(r["Adresse"]),
-                city=to_string(r["Stadt"]),
-                plz=to_string(r["PLZ"]),
-                phone=to_string(r["Telefon"]),
-                mail=to_string(r["Kontakt (nur für relevante Anbieter)"]),
-                homepage=to_url(r['URL']),
-                kennzeichnung_url=to_url(r['Kennzeichnung Link']),
-            )
-            for r in records
-        ],
-        source=SCRAPER,
-    )
+    with metrics.span("parse"):
+        results = ScrapeResults(results=list(read_records(FILE)), source=SCRAPER)
+    metrics.count("ok", len(results.results))
+    return results
 
 
 if __name__ == "__main__":
@@ -1,11 +1,12 @@
+import html.parser
 import traceback
 from typing import cast
 
-import bs4
-import httpx
-from rowo_oekostrom_recherche import log
-from rowo_oekostrom_recherche.scraper.base import AnbieterBase, ScrapeResults
+from rowo_oekostrom_recherche import log, metrics
+from rowo_oekostrom_recherche.scraper.base import ScrapeResults
+from rowo_oekostrom_recherche.scraper.http_cache import get_client
 from rowo_oekostrom_recherche.scraper.manager import run_and_save
+from rowo_oekostrom_recherche.scraper.models import Stromauskunft
 
 # https://www.stromauskunft.de/oekostrom/oekostrom-anbieter/ lazy loads the following table
 # which a json file that contains HTML (really!)
@@ -14,22 +15,65 @@ DATA_URL = "https://www.stromauskunft.de/front/templates/stromauskunft/php/ajax/
 SCRAPER = "stromauskunft"
 
 
-class Stromauskunft(AnbieterBase):
-    portal_url: str
+class RowExtractor(html.parser.HTMLParser):
+    """
+    Collect the first link and the text of street and city of a row
 
+    A lot cheaper than building a soup for every row, the extractor
+    is reused for all rows (see `reset`).
+    """
 
-def convert_data(row: int, elements: list[str | int]) -> Stromauskunft | None:
-    data = elements[1]
-    assert isinstance(data, str)
+    FIELDS = ("carrier-street", "carrier-city")
+
+    def reset(self) -> None:
+        super().reset()
+        self.link: dict[str, str | None] | None = None
+        self.texts: dict[str, list[str]] = {}
+        # open elements with the field they contain the text of
+        self.open: list[tuple[str, str | None]] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attributes = dict(attrs)
+        if tag == "a" and self.link is None:
+            self.link = attributes
+        classes = (attributes.get("class") or "").split()
+        field = next(
+            (f for f in self.FIELDS if f in classes and f not in self.texts), None
+        )
+        if field:
+            self.texts[field] = []
+        self.open.append((tag, field))
+
+    def handle_endtag(self, tag: str) -> None:
+        for i in range(len(self.open) - 1, -1, -1):
+            if self.open[i][0] == tag:
+                del self.open[i:]
+                break
+
+    def handle_data(self, data: str) -> None:
+        for _, field in self.open:
+            if field:
+                self.texts[field].append(data)
+
+
+def convert_row(
+    row: int, data: str, extractor: RowExtractor
+) -> Stromauskunft | None:
     try:
-        soup = bs4.BeautifulSoup(data, "html.parser")
-        links = soup.find_all("a")
-        name = links[0]["title"]
-        portal_url = BASE_URL + links[0]["href"].lstrip("/")
-
-        street = soup.select(".carrier-street")[0].text
-        plz_city = soup.select(".carrier-city")[0].text
-        return Stromauskunft(
+        extractor.reset()
+        extractor.feed(data)
+        extractor.close()
+        link = extractor.link
+        if link is None:
+            raise ValueError("No link found")
+        name = link.get("title")
+        if name is None:
+            raise ValueError("No title on the link")
+        portal_url = BASE_URL + (link["href"] or "").lstrip("/")
+
+        street = "".join(extractor.texts["carrier-street"])
+        plz_city = "".join(extractor.texts["carrier-city"])
+        result = Stromauskunft(
             name=name,
             street=street,
             city=plz_city.partition(" ")[2],
@@ -39,20 +83,35 @@ def convert_data(row: int, elements: list[str | int]) -> Stromauskunft | None:
     except:
         print(f"Failed checking row {row}")
         traceback.print_exc()
+        metrics.count("failed")
         return None
+    metrics.count("ok")
+    return result
+
+
+def convert_all(rows: list[list[str | int]]) -> list[Stromauskunft | None]:
+    """
+    Convert all rows in one pass with a single lightweight extractor
+    """
+    extractor = RowExtractor(convert_charrefs=True)
+    results: list[Stromauskunft | None] = []
+    with metrics.span("parse"):
+        for i, elements in enumerate(rows):
+            data = elements[1]
+            assert isinstance(data, str)
+            results.append(convert_row(i, data, extractor))
+    return results
 
 
+@metrics.span("scrape", source=SCRAPER)
 def scrape() -> ScrapeResults[Stromauskunft]:
     log.info("Start scraping", scraper=SCRAPER)
-    response = httpx.get(DATA_URL)
+    response = get_client().get(DATA_URL)
     response.raise_for_status()
     data = response.json()
 
-    results: list[Stromauskunft] = []
-    for i, elm in enumerate(data["data"]):
-        result = convert_data(i, cast(list[str | int], elm))
-        if result:
-            results.append(result)
+    rows = [cast(list[str | int], elm) for elm in data["data"]]
+    results = [result for result in convert_all(rows) if result]
 
     return ScrapeResults(results=results, source=SCRAPER)
 
@@ -1,76 +1,165 @@
+import asyncio
+
 import httpx
 import bs4
 import traceback
 from rowo_oekostrom_recherche.scraper.base import (
-    AnbieterBase,
     Address,
     ScrapeResults,
 )
+from rowo_oekostrom_recherche.scraper.http_cache import (
+    get_async_client,
+    get_client,
+)
 from rowo_oekostrom_recherche.scraper.manager import run_and_save
-from rowo_oekostrom_recherche import log
+from rowo_oekostrom_recherche.scraper.models import VerivoxBase
+from rowo_oekostrom_recherche.scraper.parse import parse_only
+from rowo_oekostrom_recherche import log, metrics
 
 DOMAIN = "https://www.verivox.de"
 BASE_URL = "https://www.verivox.de/strom/anbieter/"
 SCRAPER = "verivox"
+# number of detail pages fetched at the same time
+CONCURRENCY = 8
 
-class VerivoxBase(AnbieterBase):
-    portal_url: str
+CARRIER_STRAINER = bs4.SoupStrainer("a", class_="carrier-list-entry")
+ADDRESS_STRAINER = bs4.SoupStrainer("div", class_="carrier-address")
 
 
-def scrape_address(url: str) -> tuple[Address, str]:
+def parse_address(site: httpx.Response) -> tuple[Address, str]:
     note = ""
-    try:
-        site = httpx.get(url)
-        site.raise_for_status()
-        if site.url == BASE_URL:
-            raise ValueError("No subpage")
-        addresses = bs4.BeautifulSoup(site.content, "html.parser").find_all(
-            "div", class_="carrier-address"
-        )
+    site.raise_for_status()
+    if site.url == BASE_URL:
+        raise ValueError("No subpage")
+    with metrics.span("parse"), parse_only(site.content, ADDRESS_STRAINER) as soup:
+        addresses = soup.find_all("div", class_="carrier-address")
         if len(addresses) != 1:
             raise ValueError(f"Multiple or none addresses found ({addresses})")
-        address = addresses[0]
-        try:
-            name, street, plz_city = address.stripped_strings
-        except ValueError as e:
-            print(f"{e} for '{list(address.stripped_strings)}': Try recover")
-            name, *streets, plz_city, = address.stripped_strings
-            street = "\n".join(streets)
-            note = "Address might be wrong"
-        plz, _, city = plz_city.partition(" ")
+        lines = [str(line) for line in addresses[0].stripped_strings]
+    try:
+        name, street, plz_city = lines
+    except ValueError as e:
+        print(f"{e} for '{lines}': Try recover")
+        name, *streets, plz_city, = lines
+        street = "\n".join(streets)
+        note = "Address might be wrong"
+    plz, _, city = plz_city.partition(" ")
+    return Address(street=street, plz=plz, city=city), note
+
+
+def parse_carriers(content: bytes) -> list[tuple[str, str]]:
+    """
+    Get name and url of all carriers listed on the overview page
+    """
+    with metrics.span("parse"), parse_only(content, CARRIER_STRAINER) as soup:
+        return [
+            (anbieter.text, f"{DOMAIN}/{anbieter['href']}")
+            for anbieter in soup.find_all("a", class_="carrier-list-entry")
+        ]
+
+
+def scrape_address(
+    url: str, client: httpx.Client | None = None
+) -> tuple[Address, str]:
+    try:
+        site = (client or get_client()).get(url)
+        result = parse_address(site)
     except Exception as e:
         traceback.print_exc()
+        metrics.count("failed")
         return Address(street="", plz="", city=""), repr(e)
-    else:
+    metrics.count("ok")
+    return result
 
-        return Address(street=street, plz=plz, city=city), note
 
+async def scrape_address_async(
+    url: str, client: httpx.AsyncClient, semaphore: asyncio.Semaphore
+) -> tuple[Address, str]:
+    try:
+        async with semaphore:
+            site = await client.get(url)
+        result = parse_address(site)
+    except Exception as e:
+        traceback.print_exc()
+        metrics.count("failed")
+        return Address(street="", plz="", city=""), repr(e)
+    metrics.count("ok")
+    return result
 
-def scrape() -> ScrapeResults[VerivoxBase]:
-    log.info("Start scraping", scraper=SCRAPER)
-    site = httpx.get(BASE_URL)
-    site.raise_for_status()
-    anbieters = bs4.BeautifulSoup(site.content, "html.parser").find_all(
-        "a", class_="carrier-list-entry"
+
+def log_start(i: int, total: int, name: str) -> None:
+    log.info(
+        "Start scraping address",
+        scraper="verivox",
+        num=f"{i+1}/{total}",
+        carrier=name,
     )
-    result: list[VerivoxBase] = []
-    added: set[str] = set()
-    total = len(anbieters)
-    for i, anbieter in enumerate(anbieters):
-        name = anbieter.text
-        url = f"{DOMAIN}/{anbieter['href']}"
-        log.info(
-            "Start scraping address",
-            scraper="verivox",
-            num=f"{i+1}/{total}",
-            carrier=name,
+
+
+def scrape_addresses_sync(carriers: list[tuple[str, str]]) -> list[tuple[Address, str]]:
+    total = len(carriers)
+    addresses: list[tuple[Address, str]] = []
+    client = get_client()
+    for i, (name, url) in enumerate(carriers):
+        log_start(i, total, name)
+        addresses.append(scrape_address(url, client))
+    return addresses
+
+
+async def scrape_addresses_async(
+    carriers: list[tuple[str, str]], concurrency: int
+) -> list[tuple[Address, str]]:
+    """
+    Fetch all detail pages over one keep-alive client, at most `concurrency`
+    at the same time. The result has the same order as `carriers`.
+    """
+    total = len(carriers)
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async def fetch(i: int, name: str, url: str) -> tuple[Address, str]:
+        log_start(i, total, name)
+        return await scrape_address_async(url, client, semaphore)
+
+    async with get_async_client(limits) as client:
+        return await asyncio.gather(
+            *(fetch(i, name, url) for i, (name, url) in enumerate(carriers))
         )
 
-        address, note = scrape_address(url)
 
+@metrics.span("scrape", source=SCRAPER)
+def scrape(concurrency: int = CONCURRENCY) -> ScrapeResults[VerivoxBase]:
+    """
+    Scrape all carriers of verivox
+
+    With `concurrency` > 1 the detail pages are fetched asynchronously,
+    otherwise one after the other.
+    """
+    log.info("Start scraping", scraper=SCRAPER)
+    site = get_client().get(BASE_URL)
+    site.raise_for_status()
+    carriers = parse_carriers(site.content)
+    # only the first entry of a name is kept, so only fetch that one
+    to_fetch: dict[str, str] = {}
+    for name, url in carriers:
+        to_fetch.setdefault(name, url)
+    if concurrency > 1:
+        fetched = asyncio.run(
+            scrape_addresses_async(list(to_fetch.items()), concurrency)
+        )
+    else:
+        fetched = scrape_addresses_sync(list(to_fetch.items()))
+    addresses = dict(zip(to_fetch.keys(), fetched))
+
+    result: list[VerivoxBase] = []
+    added: set[str] = set()
+    for name, url in carriers:
         if name in added:
             log.info("Skipping duplicate", scraper=SCRAPER, carrier=name)
         else:
+            address, note = addresses[name]
             result.append(
                 VerivoxBase(
                     name=name,
@@ -0,0 +1,251 @@
+"""
+Search index of docs/datenquellen, built from the combined data
+
+Every row of `combined.json` becomes one document with the fields of the
+records of its sources (the rowo2019 record first). Instead of one large
+index the documents are split by the first letter of their name into
+shards, each a complete lunr index with its documents (`{"idx", "store"}`)
+written gzip compressed to `SEARCH_DIR/<prefix>.json.gz`. Shards with more
+than `MAX_SHARD_DOCUMENTS` are split by a longer prefix, so the many
+"Stadtwerke ..." do not end up in one large shard. Parts of a split smaller
+than `MIN_SHARD_DOCUMENTS` stay together in the shard of the shorter prefix.
+
+`SEARCH_DIR/index.json` lists the shards with the hash of their documents.
+Only shards whose documents changed are built again. The search of
+`index.html` loads the manifest first, then the shards that can hold a
+name starting with the typed one (see `shard_keys`) and all shards only
+when searching for city or url, too (with `lunr.js` 2.3.8 next to it).
+
+Each shard is scored on its own (bm25 statistics of the shard), so shards
+stay independent of each other.
+
+    python -m rowo_oekostrom_recherche.search_index
+"""
+
+import gzip
+import hashlib
+import json
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Iterable
+
+from pydantic import BaseModel, Field
+from typing_extensions import TypedDict
+
+from rowo_oekostrom_recherche import lunr, metrics, snapshots
+from rowo_oekostrom_recherche.combine import (
+    TARGET,
+    Combined,
+    Result,
+    SOURCE_TYPES,
+    Source,
+)
+from rowo_oekostrom_recherche.scraper.base import DATA_DIR, AnbieterBase
+
+SEARCH_DIR = DATA_DIR.parent / "docs" / "datenquellen" / "suche"
+MANIFEST_FILE = SEARCH_DIR / "index.json"
+FIELDS = ("Firmenname", "URL", "Stadt")
+MAX_SHARD_DOCUMENTS = 100
+MIN_SHARD_DOCUMENTS = 20
+# increase if the documents or the index change without the data changing
+INDEX_VERSION = 1
+
+
+class Document(TypedDict):
+    index: int
+    Firmenname: str
+    URL: str
+    Stadt: str
+    PLZ: str
+    Adresse: str
+    Telefon: str
+    # name of the record in every source
+    Quellen: dict[str, str]
+
+
+class Shard(BaseModel):
+    file: str
+    hash: str
+    documents: int
+
+
+class Manifest(BaseModel):
+    version: str = lunr.VERSION
+    fields: list[str] = Field(default_factory=lambda: list(FIELDS))
+    shards: dict[str, Shard] = Field(default_factory=dict)
+
+
+def fold(name: str) -> str:
+    """
+    Lower case name without accents, "_" for everything not a letter or digit
+    """
+    decomposed = unicodedata.normalize("NFKD", name.strip().lower())
+    return "".join(
+        c if "a" <= c <= "z" or "0" <= c <= "9" else "_"
+        for c in decomposed
+        if not unicodedata.combining(c)
+    )
+
+
+def shard_keys(keys: Iterable[str], name: str) -> list[str]:
+    """
+    The shards of all documents whose folded name starts with `name`
+
+    A document is in the shard of a prefix of its name: of the prefixes of
+    `name` or of the longer ones starting with it. The search of
+    `index.html` selects the shards the same way.
+    """
+    folded = fold(name)
+    return [key for key in keys if folded.startswith(key) or key.startswith(folded)]
+
+
+def load_records() -> dict[Source, dict[str, AnbieterBase]]:
+    records: dict[Source, dict[str, AnbieterBase]] = {}
+    for source in (TARGET, *SOURCE_TYPES):
+        source_file = DATA_DIR / f"{source}.json"
+        if not source_file.exists():
+            continue
+        model = Combined if source == TARGET else SOURCE_TYPES[source]
+        with metrics.span("load", source=source):
+            results = snapshots.load_results(source_file, model)
+        records[source] = {r.name: r for r in results.results}
+    return records
+
+
+def to_document(
+    row: Result, records: dict[Source, dict[str, AnbieterBase]]
+) -> Document:
+    found = [
+        records[Source(source)][name]
+        for source, name in sorted(row.items(), key=lambda i: i[0] != TARGET)
+        if name and name in records.get(Source(source), {})
+    ]
+
+    def first(attribute: str) -> str:
+        return next((v for r in found if (v := getattr(r, attribute))), "")
+
+    return {
+        "index": 0,
+        "Firmenname": first("name"),
+        "URL": first("homepage"),
+        "Stadt": first("city"),
+        "PLZ": first("plz"),
+        "Adresse": first("street"),
+        "Telefon": first("phone"),
+        "Quellen": {source: str(name) for source, name in row.items() if name},
+    }
+
+
+def split(documents: Iterable[Document], length: int) -> dict[str, list[Document]]:
+    """
+    Group by the first `length` characters of the folded name, splitting
+    groups that are too large by one more character
+    """
+    groups: dict[str, list[Document]] = {}
+    for document in documents:
+        key = fold(document["Firmenname"])[:length] or "_"
+        groups.setdefault(key, []).append(document)
+    shards: dict[str, list[Document]] = {}
+    for key, group in groups.items():
+        if len(group) > MAX_SHARD_DOCUMENTS and any(
+            len(fold(d["Firmenname"])) > length for d in group
+        ):
+            rest: list[Document] = []
+            for child_key, child in split(group, length + 1).items():
+                if child_key == key or len(child) < MIN_SHARD_DOCUMENTS:
+                    rest += child
+                else:
+                    shards[child_key] = child
+            if rest:
+                shards[key] = rest
+        else:
+            shards[key] = group
+    return shards
+
+
+def shard_documents(documents: Iterable[Document]) -> dict[str, list[Document]]:
+    shards = split(documents, 1)
+    for shard in shards.values():
+        shard.sort(key=lambda d: (d["Firmenname"].casefold(), d["Firmenname"]))
+        for i, document in enumerate(shard):
+            document["index"] = i
+    return dict(sorted(shards.items()))
+
+
+def documents_hash(documents: list[Document]) -> str:
+    digest = hashlib.sha256(f"{lunr.VERSION}|{INDEX_VERSION}|{FIELDS}".encode())
+    digest.update(json.dumps(documents, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def build_shard(documents: list[Document]) -> bytes:
+    builder = lunr.Builder("index", FIELDS)
+    for document in documents:
+        builder.add(document)
+    content = json.dumps(
+        {"idx": builder.build(), "store": documents},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    # without timestamp, so an unchanged shard is byte for byte the same
+    return gzip.compress(content.encode(), compresslevel=9, mtime=0)
+
+
+def load_manifest() -> Manifest:
+    if not MANIFEST_FILE.exists():
+        return Manifest()
+    return Manifest.model_validate_json(MANIFEST_FILE.read_text())
+
+
+def write_atomic(path: Path, content: bytes) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(content)
+    tmp.replace(path)
+
+
+def build_index(force: bool = False) -> Manifest:
+    """
+    Build the shards whose documents changed and write the manifest
+
+    :param force: build all shards, even unchanged ones
+    """
+    records = load_records()
+    rows: list[Result] = json.loads(DATA_DIR.joinpath("combined.json").read_text())
+    shards = shard_documents(to_document(row, records) for row in rows)
+
+    previous = load_manifest()
+    manifest = Manifest()
+    SEARCH_DIR.mkdir(parents=True, exist_ok=True)
+    built = 0
+    for key, documents in shards.items():
+        shard = Shard(
+            file=f"{key}.json.gz",
+            hash=documents_hash(documents),
+            documents=len(documents),
+        )
+        manifest.shards[key] = shard
+        if (
+            not force
+            and previous.shards.get(key) == shard
+            and SEARCH_DIR.joinpath(shard.file).exists()
+        ):
+            metrics.count("unchanged", source="search_index")
+            continue
+        with metrics.span("index", source="search_index", shard=key):
+            write_atomic(SEARCH_DIR / shard.file, build_shard(documents))
+        built += 1
+
+    for key, shard in previous.shards.items():
+        if key not in manifest.shards:
+            SEARCH_DIR.joinpath(shard.file).unlink(missing_ok=True)
+    write_atomic(MANIFEST_FILE, (manifest.model_dump_json(indent=2) + "\n").encode())
+    print(
+        f"{sum(s.documents for s in manifest.shards.values())} documents in "
+        f"{len(manifest.shards)} shards, {built} built"
+    )
+    return manifest
+
+
+if __name__ == "__main__":
+    build_index(force="--force" in sys.argv[1:])
@@ -0,0 +1,80 @@
+"""
+Store of the manual combine decisions
+
+The decisions are kept in `combine_selections.csv`, a `;` separated
+append-only journal with one line per decision: `source;anbieter;choice`.
+An empty choice means "add as new entry", `-1` means "skipped".
+The journal is read once and then served from memory.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterator
+
+from rowo_oekostrom_recherche.scraper.base import DATA_DIR
+
+SELECTION_FILE = DATA_DIR / "combine_selections.csv"
+
+SelectionKey = tuple[str, str]
+
+
+class SelectionStore:
+    def __init__(self, path: Path = SELECTION_FILE) -> None:
+        self.path = path
+        self._selections: dict[SelectionKey, str | None] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        # bytes decoded as they are, so a CRLF file keeps its offsets
+        content = self.path.read_bytes().decode()
+        complete, _, last = content.rpartition("\n")
+        if last:
+            if len(last.rstrip("\r").split(";")) == 3:
+                # a complete decision, only its line end is missing
+                self._repair(f"{content}\n")
+            else:
+                # the last write was interrupted, drop the incomplete line
+                print(f"Dropping incomplete line in {self.path.name}: {last!r}")
+                content = f"{complete}\n" if complete else ""
+                self._repair(content)
+        for line in content.splitlines(keepends=False):
+            choice: str | None
+            source, anbieter, choice = line.split(";")
+            if choice == "":
+                choice = None
+            self._selections[(source, anbieter)] = choice
+
+    def _repair(self, content: str) -> None:
+        """
+        Replace the journal, so the next decision starts on its own line
+        """
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_bytes(content.encode())
+        tmp.replace(self.path)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._selections
+
+    def __getitem__(self, key: SelectionKey) -> str | None:
+        return self._selections[key]
+
+    def __iter__(self) -> Iterator[SelectionKey]:
+        return iter(self._selections)
+
+    def __len__(self) -> int:
+        return len(self._selections)
+
+    def as_dict(self) -> dict[SelectionKey, str | None]:
+        return dict(self._selections)
+
+    def add(self, source: str, anbieter: str, choice: str | None) -> None:
+        """
+        Add a decision and persist it before returning
+        """
+        with self.path.open("a") as f:
+            f.write(f"{source};{anbieter};{choice or ''}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._selections[(source, anbieter)] = choice
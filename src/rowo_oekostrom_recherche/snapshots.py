@@ -0,0 +1,79 @@
+"""
+Fast loading of the scraped json files
+
+Validating a `ScrapeResults` json with pydantic is done only once per file
+content. The validated records are stored as pickle in `SNAPSHOT_DIR`, keyed
+by a hash of the json content and the model. As long as the json file does
+not change, the snapshot is loaded without any validation.
+
+The snapshots are trusted: they are only ever written by this module.
+"""
+
+import hashlib
+import pickle
+from pathlib import Path
+
+import pydantic
+
+from rowo_oekostrom_recherche import metrics
+from rowo_oekostrom_recherche.scraper.base import (
+    DATA_DIR,
+    ScrapeResults,
+    TAnbieterBase,
+)
+
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
+# increase if the format of the snapshot changes
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_path(source_file: Path, content: bytes, model: type) -> Path:
+    digest = hashlib.sha256(content)
+    digest.update(
+        f"{model.__module__}.{model.__qualname__}"
+        f"|{SNAPSHOT_VERSION}|{pydantic.VERSION}".encode()
+    )
+    return SNAPSHOT_DIR / f"{source_file.stem}-{digest.hexdigest()[:20]}.pickle"
+
+
+def load_results(
+    source_file: Path, model: type[TAnbieterBase]
+) -> ScrapeResults[TAnbieterBase]:
+    """
+    Load the scrape results in `source_file`, validating only changed files
+
+    Raises `pydantic.ValidationError` if a changed file is invalid.
+    """
+    content = source_file.read_bytes()
+    snapshot = snapshot_path(source_file, content, model)
+    if snapshot.exists():
+        try:
+            results, source, create = pickle.loads(snapshot.read_bytes())
+        except Exception as e:
+            print(f"Ignoring broken snapshot {snapshot.name}: {e!r}")
+        else:
+            metrics.count("cache_hit")
+            return ScrapeResults[model].model_construct(  # type: ignore[valid-type]
+                results=results, source=source, create=create
+            )
+
+    with metrics.span("validate"):
+        scrape_results = ScrapeResults[model].model_validate_json(content)  # type: ignore[valid-type]
+    save_snapshot(snapshot, scrape_results)
+    return scrape_results
+
+
+def save_snapshot(snapshot: Path, scrape_results: ScrapeResults) -> None:
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    prefix = snapshot.name.rpartition("-")[0]
+    for outdated in SNAPSHOT_DIR.glob(f"{prefix}-*.pickle"):
+        if outdated.name.rpartition("-")[0] == prefix:
+            outdated.unlink()
+    tmp = snapshot.with_suffix(".tmp")
+    tmp.write_bytes(
+        pickle.dumps(
+            (scrape_results.results, scrape_results.source, scrape_results.create),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    )
+    tmp.replace(snapshot)
@@ -0,0 +1,179 @@
+"""
+Streaming json lines (and parquet) tables of the scraped and combined data
+
+Next to every `<source>.json` and `combined.json` the same records are
+written as table, one record at a time:
+
+- `<name>.jsonl`: one json object per record and line, e.g. for
+  `pandas.read_json(path, lines=True)`
+- `<name>.parquet`: only if `pyarrow` is installed (`pip install
+  rowo-oekostrom-recherche[arrow]`), all columns as strings
+
+`iter_records` and `iter_rows` read them record by record, `read_columns`
+reads only the given columns (parquet does not even load the others).
+
+    python -m rowo_oekostrom_recherche.tables   # write for all json files
+"""
+
+import datetime
+import importlib.util
+import itertools
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+from rowo_oekostrom_recherche import metrics
+from rowo_oekostrom_recherche.scraper.base import (
+    DATA_DIR,
+    AnbieterBase,
+    ScrapeResults,
+    TAnbieterBase,
+)
+
+HAS_ARROW = importlib.util.find_spec("pyarrow") is not None
+# records per parquet row group
+BATCH_SIZE = 1000
+
+
+def write_lines(path: Path, lines: Iterable[str]) -> None:
+    tmp = path.with_suffix(".jsonl.tmp")
+    with tmp.open("w") as f:
+        for line in lines:
+            f.write(f"{line}\n")
+    tmp.replace(path)
+
+
+def dump(row: Mapping[str, Any]) -> str:
+    # compact like `model_dump_json`
+    return json.dumps(row, ensure_ascii=False, separators=(",", ":"))
+
+
+def to_cell(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def write_parquet(
+    path: Path, rows: Iterable[Mapping[str, Any]], columns: Sequence[str]
+) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    tmp = path.with_suffix(".parquet.tmp")
+    rows = iter(rows)
+    with pq.ParquetWriter(tmp, schema) as writer:
+        while batch := list(itertools.islice(rows, BATCH_SIZE)):
+            writer.write_table(
+                pa.Table.from_pylist(
+                    [{c: to_cell(row.get(c, "")) for c in columns} for row in batch],
+                    schema=schema,
+                )
+            )
+    tmp.replace(path)
+
+
+def save_rows(
+    path: Path, rows: Sequence[Mapping[str, Any]], columns: Sequence[str]
+) -> None:
+    """
+    Write the rows as `path` (.jsonl) and as parquet next to it if possible
+    """
+    with metrics.span("write", source=path.stem, format="jsonl"):
+        write_lines(path, (dump(row) for row in rows))
+    if HAS_ARROW:
+        with metrics.span("write", source=path.stem, format="parquet"):
+            write_parquet(path.with_suffix(".parquet"), rows, columns)
+
+
+def columns_of(records: Iterable[AnbieterBase]) -> list[str]:
+    columns = dict.fromkeys(AnbieterBase.model_fields)
+    for model in dict.fromkeys(type(r) for r in records):
+        columns.update(dict.fromkeys(model.model_fields))
+    return list(columns)
+
+
+def save_results(data: ScrapeResults, directory: Path = DATA_DIR) -> Path:
+    """
+    Write the records of `data` as table `<source>.jsonl`
+    """
+    path = directory / f"{data.source}.jsonl"
+    with metrics.span("write", source=data.source, format="jsonl"):
+        write_lines(path, (r.model_dump_json() for r in data.results))
+    if HAS_ARROW:
+        with metrics.span("write", source=data.source, format="parquet"):
+            write_parquet(
+                path.with_suffix(".parquet"),
+                (r.model_dump() for r in data.results),
+                columns_of(data.results),
+            )
+    return path
+
+
+def iter_rows(path: Path) -> Iterator[dict[str, Any]]:
+    """
+    The rows of a json lines table, one at a time
+    """
+    with path.open() as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_records(path: Path, model: type[TAnbieterBase]) -> Iterator[TAnbieterBase]:
+    """
+    The validated records of a `<source>.jsonl` table, one at a time
+    """
+    with path.open() as f:
+        for line in f:
+            if line.strip():
+                yield model.model_validate_json(line)
+
+
+def load_results(
+    path: Path, model: type[TAnbieterBase]
+) -> ScrapeResults[TAnbieterBase]:
+    """
+    Read a `<source>.jsonl` table back, `create` is the time it was written
+    """
+    return ScrapeResults[model](  # type: ignore[valid-type]
+        results=list(iter_records(path, model)),
+        source=path.stem,
+        create=datetime.datetime.fromtimestamp(path.stat().st_mtime),
+    )
+
+
+def read_columns(path: Path, columns: Sequence[str]) -> dict[str, list[Any]]:
+    """
+    Only the given columns of a table (.jsonl or .parquet)
+    """
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, columns=list(columns)).to_pydict()
+    result: dict[str, list[Any]] = {column: [] for column in columns}
+    for row in iter_rows(path):
+        for column in columns:
+            result[column].append(row.get(column))
+    return result
+
+
+def convert_all(directory: Path = DATA_DIR) -> None:
+    """
+    Write the tables of all json files of `directory`
+    """
+    for source_file in sorted(directory.glob("*.json")):
+        content = json.loads(source_file.read_text())
+        if isinstance(content, dict) and "results" in content:
+            rows = content["results"]
+        elif isinstance(content, list):
+            # the combined table
+            rows = content
+        else:
+            continue
+        columns = list(dict.fromkeys(k for row in rows for k in row))
+        save_rows(source_file.with_suffix(".jsonl"), rows, columns)
+        print(f"Wrote table of {source_file.name}")
+
+
+if __name__ == "__main__":
+    convert_all()
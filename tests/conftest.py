@@ -0,0 +1,19 @@
+import pytest
+
+from rowo_oekostrom_recherche import metrics
+
+
+@pytest.fixture(autouse=True)
+def metrics_file(tmp_path_factory):
+    """
+    Write the metrics of a test to its own file, never to `METRICS_FILE`
+
+    Not in `tmp_path`, so the tests own that directory.
+    """
+    previous = metrics._sink
+    path = tmp_path_factory.mktemp("metrics") / "metrics.jsonl"
+    metrics.set_sink(path)
+    metrics.reset()
+    yield path
+    metrics.set_sink(previous)
+    metrics.reset()
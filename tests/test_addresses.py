@@ -0,0 +1,71 @@
+from thefuzz import fuzz
+
+from rowo_oekostrom_recherche.addresses import (
+    MIN_NAME_SCORE,
+    AddressIndex,
+    normalize_street,
+)
+from rowo_oekostrom_recherche.combine import Combined
+from rowo_oekostrom_recherche.records import Record, Target
+from rowo_oekostrom_recherche.scraper.models import OkPower
+
+STREET = "Alexander-Fleming-Straße 2"
+
+
+def target(name: str, street: str = STREET) -> Target:
+    return Target.from_model(
+        Combined(name=name, street=street, plz="50354", city="Hürth")
+    )
+
+
+def record(name: str, street: str = STREET, plz: str = "50354") -> Record:
+    return Record.from_model(
+        OkPower(
+            name=name,
+            street=street,
+            plz=plz,
+            city="Hürth (Rheinland)",
+            tarif="",
+            tarif_url="",
+            cert_info="",
+        )
+    )
+
+
+def test_normalize_street():
+    assert normalize_street(STREET) == normalize_street("Alexander Fleming Str.2")
+
+
+def test_only_target_at_address():
+    albwerk = target("Albwerk GmbH")
+    index = AddressIndex([albwerk])
+    assert index.lookup("okpower", record("Albwerk GmbH & Co. KG")) is albwerk
+    # found by city and street as well
+    found = index.lookup("okpower", record("Albwerk", "Alexander Fleming Str. 2", ""))
+    assert found is albwerk
+    assert index.lookup("okpower", record("Albwerk", "Bahnhofstraße 1")) is None
+    assert (index.lookups["okpower"], index.hits["okpower"]) == (3, 2)
+
+
+def test_several_targets_at_address():
+    index = AddressIndex([target("Albwerk GmbH"), target("Albwerk Strom GmbH")])
+    assert index.lookup("okpower", record("Albwerk GmbH")) is None
+
+
+def test_name_score_threshold():
+    hamburg = target("Naturstrom Hamburg")
+    index = AddressIndex([hamburg])
+    close, far = record("Naturstrom Homberg"), record("Naturstrom Hameln")
+    assert fuzz.ratio(close.name_normalized, hamburg.name_normalized) == 89
+    assert index.find(close) is hamburg
+    assert fuzz.ratio(far.name_normalized, hamburg.name_normalized) == 80
+    assert MIN_NAME_SCORE == 85
+    assert index.find(far) is None
+
+
+def test_added_target_found():
+    index = AddressIndex()
+    assert index.find(record("Albwerk GmbH")) is None
+    albwerk = target("Albwerk GmbH")
+    index.add(albwerk)
+    assert index.find(record("Albwerk GmbH")) is albwerk
@@ -0,0 +1,27 @@
+from rowo_oekostrom_recherche.assignment import Proposal, assign, propose
+
+
+def test_assign_maximizes_the_sum():
+    # greedily "a" would take "x" and leave "b" without a target
+    weights = {"a": {"x": 90, "y": 80}, "b": {"x": 88}}
+    assert assign(weights) == {"a": "y", "b": "x"}
+
+
+def test_record_may_stay_unmatched():
+    weights = {"a": {"x": 95}, "b": {"x": 60}}
+    assert assign(weights) == {"a": "x"}
+
+
+def test_propose_rates_by_closest_competitor():
+    # "b" stays unmatched, but could take "x"
+    weights = {"a": {"x": 98}, "b": {"x": 92}, "c": {"z": 97}}
+    assert propose(weights) == {
+        "a": Proposal(target="x", score=98, competing=92),
+        "c": Proposal(target="z", score=97, competing=0),
+    }
+
+
+def test_held_target_does_not_compete():
+    # "a" would have to take "y" from "b" scoring higher there
+    weights = {"a": {"x": 96, "y": 80}, "b": {"y": 99}}
+    assert propose(weights)["a"] == Proposal(target="x", score=96, competing=0)
@@ -0,0 +1,81 @@
+import pytest
+from thefuzz import process
+
+from rowo_oekostrom_recherche.candidates import CandidateIndex
+from rowo_oekostrom_recherche.scoring import SCORE_CUTOFF
+from rowo_oekostrom_recherche.scraper.base import NameNormal
+
+TARGETS = [
+    "albwerk",
+    "naturstrom",
+    "hochsauerland",
+    "elektrizitaetswerke schoenau",
+    "buergerwerke",
+    "gemeindewerke haßloch",
+    "energieversorgung filstal",
+    "mainova",
+    "ewe",
+    "lingen",
+    "menden",
+    "stadtwerk haßfurt",
+    "greenpeace energy",
+    "polarstern",
+    "westfalenwind",
+    "regionalwerke bodensee",
+    "bad wildbad",
+]
+QUERIES = [
+    "albwerk geislingen",
+    "naturstrom ag",
+    "hochsauerlandenergie",
+    "ews schoenau",
+    "elektrizitaetswerk schoenau",
+    "buergerwerk",
+    "gemeindewerk hassloch",
+    "filstal energieversorgung",
+    "mainova frankfurt",
+    "ewe",
+    "db",
+    "stadtwerke hassfurt",
+    "green planet energy",
+    "polarstern münchen",
+    "westfalen wind",
+    "40764 langenfeld",
+    "gemeindestrom wadgassen",
+    "voellig unbekannt",
+]
+
+
+@pytest.fixture(scope="module")
+def index() -> CandidateIndex:
+    return CandidateIndex(NameNormal(t) for t in TARGETS)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_best_match_as_full_scan(index, query):
+    full = process.extractBests(query, TARGETS, limit=None, score_cutoff=SCORE_CUTOFF)
+    candidates = sorted(index.candidates(NameNormal(query)))
+    blocked = process.extractBests(
+        query, candidates, limit=None, score_cutoff=SCORE_CUTOFF
+    )
+    assert max((s for _, s in blocked), default=0) == max(
+        (s for _, s in full), default=0
+    )
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_recall_of_strong_matches(index, query):
+    candidates = index.candidates(NameNormal(query))
+    full = process.extractBests(query, TARGETS, limit=None, score_cutoff=85)
+    assert {name for name, _ in full} <= candidates
+
+
+@pytest.mark.parametrize("query", ["ewe", "db", "voellig unbekannt"])
+def test_falls_back_to_all_targets(index, query):
+    assert index.candidates(NameNormal(query)) == set(TARGETS)
+
+
+def test_blocks_unrelated_targets(index):
+    candidates = index.candidates(NameNormal("albwerk geislingen"))
+    assert "albwerk" in candidates
+    assert "mainova" not in candidates
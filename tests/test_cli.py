@@ -0,0 +1,40 @@
+import pytest
+
+from rowo_oekostrom_recherche import cli, combine
+
+
+@pytest.fixture
+def combined(monkeypatch) -> list[dict]:
+    calls: list[dict] = []
+
+    def fake_combine(**kwargs) -> None:
+        sources = kwargs["sources"]
+        calls.append({**kwargs, "sources": None if sources is None else [*sources]})
+
+    monkeypatch.setattr(combine, "combine", fake_combine)
+    return calls
+
+
+def test_combine_all_sources(combined):
+    assert cli.main(["combine", "--batch"]) == 0
+    assert combined[0]["sources"] is None
+    assert combined[0]["batch"]
+
+
+def test_combine_partial_run(combined):
+    assert cli.main(["combine", "--skip", "okpower", "verivox"]) == 0
+    assert combined[0]["sources"] == ["oekotest", "stromauskunft"]
+
+
+def test_combine_nothing_selected(combined):
+    assert cli.main(["combine", "--only", "rowo2019"]) == 2
+    assert not combined
+
+
+@pytest.mark.parametrize(
+    "option", [["--only", "okpower"], ["--skip", "okpower"], ["--jobs", "2"]]
+)
+def test_join_takes_no_sources(option, capsys):
+    with pytest.raises(SystemExit):
+        cli.parser().parse_args(["join", *option])
+    assert "unrecognized arguments" in capsys.readouterr().err
@@ -0,0 +1,178 @@
+import json
+
+import pytest
+
+from rowo_oekostrom_recherche import combine, incremental, metrics, review, snapshots
+from rowo_oekostrom_recherche.assignment import Proposal
+from rowo_oekostrom_recherche.combine import Combined, Source, extract_combination
+from rowo_oekostrom_recherche.records import Record, Target
+from rowo_oekostrom_recherche.scraper import base
+from rowo_oekostrom_recherche.scraper.models import OkPower
+from rowo_oekostrom_recherche.selections import SelectionStore
+
+CREATE = "2024-08-04T09:50:08"
+
+
+def record(name: str, **fields: str) -> dict[str, str]:
+    return {
+        "street": "",
+        "city": "",
+        "plz": "",
+        "name": name,
+        "phone": "",
+        "fax": "",
+        "note": "",
+        "mail": "",
+        "homepage": "",
+        **fields,
+    }
+
+
+def write_source(data_dir, source: str, records: list[dict[str, str]]) -> None:
+    content = {"source": source, "create": CREATE, "results": records}
+    (data_dir / f"{source}.json").write_text(json.dumps(content))
+
+
+def row(**names: str) -> dict[str, str]:
+    return {s: names.get(s, "") for s in combine.Result.__annotations__}
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(base, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", tmp_path / "snapshots")
+    monkeypatch.setattr(incremental, "STATE_FILE", tmp_path / "state.json")
+    monkeypatch.setattr(review, "REVIEW_FILE", tmp_path / "review.json")
+    monkeypatch.setattr(
+        combine, "SelectionStore", lambda: SelectionStore(tmp_path / "sel.csv")
+    )
+    write_source(
+        tmp_path,
+        "rowo2019",
+        [
+            record("Albwerk GmbH", kennzeichnung_url=""),
+            record("Naturstrom AG", kennzeichnung_url=""),
+        ],
+    )
+    write_source(
+        tmp_path,
+        "stromauskunft",
+        [record("Neue Energie Eins", portal_url="")],
+    )
+    write_source(
+        tmp_path,
+        "okpower",
+        [record("Albwerk GmbH", tarif="", tarif_url="", cert_info="")],
+    )
+    write_source(
+        tmp_path,
+        "verivox",
+        [
+            record("Naturstrom AG", portal_url=""),
+            record("Neue Energie Eins", portal_url=""),
+            record("Noch nicht kombiniert", portal_url=""),
+        ],
+    )
+    return tmp_path
+
+
+def test_partial_run_keeps_other_sources(data_dir):
+    previous = [
+        row(rowo2019="Albwerk GmbH"),
+        row(rowo2019="Naturstrom AG", verivox="Naturstrom AG"),
+        # new entry created by stromauskunft, verivox joined it
+        row(stromauskunft="Neue Energie Eins", verivox="Neue Energie Eins"),
+    ]
+    (data_dir / "combined.json").write_text(json.dumps(previous))
+
+    combine.combine(jobs=1, sources=[Source("okpower")], batch=True)
+
+    rows = json.loads((data_dir / "combined.json").read_text())
+    assert sorted(rows, key=lambda r: r["rowo2019"] + r["stromauskunft"]) == [
+        row(rowo2019="Albwerk GmbH", okpower="Albwerk GmbH"),
+        row(rowo2019="Naturstrom AG", verivox="Naturstrom AG"),
+        row(stromauskunft="Neue Energie Eins", verivox="Neue Energie Eins"),
+    ]
+
+
+class Scores:
+    def __init__(self, ranked: list[tuple[str, int]]) -> None:
+        self.ranked = ranked
+
+    def get(self, query: str) -> list[tuple[str, int]]:
+        return self.ranked
+
+
+def extract(tmp_path, ranked, proposal=None, taken=()):
+    targets = {
+        name: Target.from_model(Combined(name=name))
+        for name in ("Naturstrom AG", "Naturwerk GmbH")
+    }
+    check_against = {t.name_normalized: t for t in targets.values()}
+    queue = review.ReviewQueue()
+    data_source = Record.from_model(
+        OkPower(name="Naturstrom Hamburg", tarif="", tarif_url="", cert_info="")
+    )
+    result = extract_combination(
+        source=Source("okpower"),
+        data_source=data_source,
+        check_for=data_source.name_normalized,
+        check_against=check_against,
+        scores=Scores([(targets[n].name_normalized, s) for n, s in ranked]),
+        full_names_to_val=targets,
+        taken_choices={targets[n].name_normalized for n in taken},
+        selections=SelectionStore(tmp_path / "sel.csv"),
+        review_queue=queue,
+        proposal=proposal,
+    )
+    return (result.name if isinstance(result, Target) else result), queue
+
+
+def test_accepts_certain_best_candidate_without_proposal(tmp_path):
+    result, queue = extract(tmp_path, [("Naturstrom AG", 96), ("Naturwerk GmbH", 80)])
+    assert result == "Naturstrom AG"
+    assert not queue.items
+
+
+@pytest.mark.parametrize(
+    "ranked, taken",
+    [
+        ([("Naturstrom AG", 96), ("Naturwerk GmbH", 91)], ()),
+        ([("Naturstrom AG", 95)], ()),
+        ([("Naturstrom AG", 99)], ("Naturstrom AG",)),
+    ],
+)
+def test_defers_uncertain_best_candidate(tmp_path, ranked, taken):
+    result, queue = extract(tmp_path, ranked, taken=taken)
+    assert result == -1
+    assert queue.keys() == {("okpower", "Naturstrom Hamburg")}
+
+
+def test_accepts_certain_proposal(tmp_path):
+    proposal = Proposal(target="Naturwerk GmbH", score=97, competing=60)
+    result, _ = extract(
+        tmp_path, [("Naturstrom AG", 98), ("Naturwerk GmbH", 97)], proposal
+    )
+    assert result == "Naturwerk GmbH"
+
+
+def test_uncertain_proposal_only_suggested(tmp_path):
+    proposal = Proposal(target="Naturstrom AG", score=98, competing=97)
+    result, queue = extract(
+        tmp_path, [("Naturstrom AG", 98), ("Naturwerk GmbH", 97)], proposal
+    )
+    assert result == -1
+    assert [c.suggested for c in queue.items[0].candidates] == [True, False]
+
+
+def test_scores_timed_per_source(data_dir):
+    combine.combine(jobs=1, sources=None, batch=True)
+
+    histograms = metrics.snapshot().histograms
+    assert "score" not in histograms.get("", {})
+    assert {s for s, h in histograms.items() if "score" in h} <= {
+        "okpower",
+        "stromauskunft",
+        "verivox",
+    }
+    assert any("score" in h for h in histograms.values())
@@ -0,0 +1,171 @@
+import json
+
+import pytest
+
+from rowo_oekostrom_recherche import combine, export, search_index, snapshots
+
+CREATE = "2024-08-04T09:50:08"
+
+
+def record(name: str, **fields: str) -> dict[str, str]:
+    return {
+        "street": "",
+        "city": "",
+        "plz": "",
+        "name": name,
+        "phone": "",
+        "fax": "",
+        "note": "",
+        "mail": "",
+        "homepage": "",
+        "portal_url": "",
+        **fields,
+    }
+
+
+def write_source(data_dir, source: str, records: list[dict[str, str]]) -> None:
+    content = {"source": source, "create": CREATE, "results": records}
+    (data_dir / f"{source}.json").write_text(json.dumps(content))
+
+
+def row(**names: str) -> dict[str, str]:
+    return {s: names.get(s, "") for s in combine.Result.__annotations__}
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    data_dir = tmp_path / "scraped_data"
+    export_dir = tmp_path / "datenquellen"
+    data_dir.mkdir()
+    export_dir.mkdir()
+    monkeypatch.setattr(export, "DATA_DIR", data_dir)
+    monkeypatch.setattr(export, "EXPORT_DIR", export_dir)
+    monkeypatch.setattr(export, "GRAPH_FILE", export_dir / "data.json")
+    monkeypatch.setattr(export, "PAGE_SIZE", 2)
+    monkeypatch.setattr(search_index, "DATA_DIR", data_dir)
+    monkeypatch.setattr(search_index, "SEARCH_DIR", export_dir / "suche")
+    monkeypatch.setattr(
+        search_index, "MANIFEST_FILE", export_dir / "suche" / "index.json"
+    )
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", data_dir / "snapshots")
+
+    write_source(
+        data_dir,
+        "rowo2019",
+        [
+            record("Naturstrom AG", plz="40477", city="Düsseldorf"),
+            record("albwerk GmbH", homepage="http://www.albwerk.de"),
+        ],
+    )
+    write_source(
+        data_dir,
+        "verivox",
+        [
+            record("Naturstrom", plz="40477", city="Duesseldorf", phone="0211"),
+            record("Mainova AG", plz="60486", city="Frankfurt"),
+            record("Ökostrom Eins"),
+        ],
+    )
+    write_source(
+        data_dir,
+        "stromauskunft",
+        [record("Mainova", plz="60486", street="Solmsstr. 38")],
+    )
+    (data_dir / "combined.json").write_text(
+        json.dumps(
+            [
+                row(rowo2019="Naturstrom AG", verivox="Naturstrom"),
+                row(rowo2019="albwerk GmbH"),
+                row(verivox="Mainova AG", stromauskunft="Mainova"),
+                row(verivox="Ökostrom Eins"),
+            ]
+        )
+    )
+    graph = {
+        "nodes": [
+            {"id": "verivox", "group": 2, "label": "Verivox"},
+            {"id": "check24", "group": 2, "label": "Check24.de"},
+        ],
+        "links": [{"source": "check24", "target": "verivox"}],
+    }
+    (export_dir / "data.json").write_text(json.dumps(graph))
+    return export_dir
+
+
+def read(path):
+    return json.loads(path.read_text())
+
+
+def test_export(export_dir, capsys):
+    export.export()
+
+    assert read(export_dir / "statistik" / "quellen.json") == {
+        "rowo2019": 2,
+        "stromauskunft": 1,
+        "verivox": 3,
+    }
+    assert read(export_dir / "statistik" / "kombinationen.json") == [
+        {"sources": ["rowo2019"], "count": 1},
+        {"sources": ["rowo2019", "verivox"], "count": 1},
+        {"sources": ["stromauskunft", "verivox"], "count": 1},
+        {"sources": ["verivox"], "count": 1},
+    ]
+    assert read(export_dir / "statistik" / "plz.json") == {
+        "zones": {"": 2, "4": 1, "6": 1},
+        "regions": {"": 2, "40": 1, "60": 1},
+    }
+    assert read(export_dir / "anbieter" / "index.json") == {
+        "pages": 2,
+        "page_size": 2,
+        "providers": 4,
+    }
+    pages = [read(export_dir / "anbieter" / f"{n}.json") for n in (1, 2)]
+    # sorted by name, ignoring the case
+    assert [[p["Firmenname"] for p in page] for page in pages] == [
+        ["albwerk GmbH", "Mainova"],
+        ["Naturstrom AG", "Ökostrom Eins"],
+    ]
+    albwerk, mainova = pages[0]
+    assert albwerk["URL"] == "http://www.albwerk.de"
+    assert albwerk["Quellen"] == {"rowo2019": "albwerk GmbH"}
+    # the first non empty field of the records, in the order of the sources
+    assert (mainova["PLZ"], mainova["Stadt"], mainova["Adresse"]) == (
+        "60486",
+        "Frankfurt",
+        "Solmsstr. 38",
+    )
+    naturstrom = pages[1][0]
+    # the rowo2019 record first
+    assert (naturstrom["Stadt"], naturstrom["Telefon"]) == ("Düsseldorf", "0211")
+    assert naturstrom["Quellen"] == {
+        "rowo2019": "Naturstrom AG",
+        "verivox": "Naturstrom",
+    }
+    nodes = {n["id"]: n for n in read(export_dir / "data.json")["nodes"]}
+    assert nodes["verivox"]["providers"] == 3
+    assert nodes["verivox"]["links"] == 1
+    assert "providers" not in nodes["check24"]
+    assert (export_dir / "suche" / "index.json").exists()
+    assert "4 providers exported" in capsys.readouterr().out
+
+
+def test_unchanged_files_not_written(export_dir, capsys):
+    export.export()
+    capsys.readouterr()
+
+    export.export()
+
+    assert "4 providers exported, 0 files written" in capsys.readouterr().out
+
+
+def test_outdated_pages_removed(export_dir, monkeypatch):
+    export.export()
+    monkeypatch.setattr(export, "PAGE_SIZE", 100)
+
+    export.export()
+
+    assert sorted(p.name for p in (export_dir / "anbieter").iterdir()) == [
+        "1.json",
+        "index.json",
+    ]
+    assert len(read(export_dir / "anbieter" / "1.json")) == 4
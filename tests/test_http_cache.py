@@ -0,0 +1,80 @@
+import gzip
+
+import httpx
+import pytest
+
+from rowo_oekostrom_recherche.scraper import http_cache
+from rowo_oekostrom_recherche.scraper.http_cache import CachingTransport, ResponseCache
+
+URL = "https://example.org/page"
+
+
+@pytest.fixture(autouse=True)
+def online():
+    http_cache.set_offline(False)
+
+
+def client(tmp_path, handler) -> httpx.Client:
+    return httpx.Client(
+        transport=CachingTransport(
+            ResponseCache(tmp_path), transport=httpx.MockTransport(handler)
+        )
+    )
+
+
+def test_redirect_keeps_location(tmp_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/old":
+            return httpx.Response(301, headers={"Location": URL})
+        return httpx.Response(200, text="new")
+
+    response = client(tmp_path, handler).get(
+        "https://example.org/old", follow_redirects=True
+    )
+    assert response.text == "new"
+    assert response.history[0].headers["location"] == URL
+
+
+def test_retry_after_passed_on(tmp_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429, headers={"Retry-After": "7"})
+
+    response = client(tmp_path, handler).get(URL)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "7"
+
+
+def test_decoded_body_without_content_encoding(tmp_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"Content-Encoding": "gzip", "X-Other": "1"},
+            content=gzip.compress(b"body"),
+        )
+
+    response = client(tmp_path, handler).get(URL)
+    assert response.content == b"body"
+    assert "content-encoding" not in response.headers
+    assert response.headers["x-other"] == "1"
+
+
+def test_304_refreshes_validators(tmp_path):
+    sent: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        if len(sent) == 1:
+            return httpx.Response(200, headers={"ETag": '"v1"'}, text="page")
+        return httpx.Response(304, headers={"ETag": '"v2"'})
+
+    with client(tmp_path, handler) as c:
+        assert c.get(URL).text == "page"
+        second = c.get(URL)
+        assert second.status_code == 200
+        assert second.text == "page"
+        c.get(URL)
+    assert sent[1].headers["if-none-match"] == '"v1"'
+    assert sent[2].headers["if-none-match"] == '"v2"'
+    entry, body = ResponseCache(tmp_path).load(URL)
+    assert entry.etag == '"v2"'
+    assert body == b"page"
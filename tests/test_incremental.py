@@ -0,0 +1,32 @@
+import hashlib
+
+from rowo_oekostrom_recherche import incremental
+from rowo_oekostrom_recherche.combine import Combined
+from rowo_oekostrom_recherche.records import Record, Target
+from rowo_oekostrom_recherche.scraper.models import OkPower
+
+OKPOWER = OkPower(
+    name="Albwerk GmbH", plz="73312", tarif="", tarif_url="", cert_info=""
+)
+
+
+def model_hash(model) -> str:
+    return hashlib.sha256(model.model_dump_json().encode()).hexdigest()
+
+
+def test_hash_of_model_computed_once(monkeypatch):
+    record = Record.from_model(OKPOWER)
+    assert incremental.record_hash(record) == model_hash(OKPOWER)
+    monkeypatch.setattr(Record, "to_model", None)
+    state = incremental.CombineState()
+    state.add("okpower", record, None)
+    assert state.get("okpower", record) is not None
+
+
+def test_hash_of_target_with_rowo2019():
+    model = Combined(name="Albwerk GmbH", rowo2019=False)
+    target = Target.from_model(model)
+    assert incremental.record_hash(target) == model_hash(target.to_model())
+    assert incremental.record_hash(target) != incremental.record_hash(
+        Target.from_model(Combined(name="Albwerk GmbH"))
+    )
@@ -0,0 +1,56 @@
+import io
+
+import pandas as pd
+
+from rowo_oekostrom_recherche.join import outer_join
+
+
+def test_duplicate_names_paired_in_order():
+    result = outer_join(
+        {
+            "A": pd.DataFrame({"Firmenname": ["Albwerk", "Albwerk"], "x": [1, 2]}),
+            "B": pd.DataFrame({"Firmenname": ["Albwerk"], "y": ["b"]}),
+        }
+    )
+    assert result["x"].tolist() == [1, 2]
+    assert result["y"].fillna("").tolist() == ["b", ""]
+    assert result["A"].tolist() == [True, True]
+    assert result["B"].tolist() == [True, False]
+
+
+def test_first_table_wins():
+    result = outer_join(
+        {
+            "A": pd.DataFrame(
+                {"Firmenname": ["Naturstrom AG", "Albwerk"], "Telefon": ["1", None]}
+            ),
+            "B": pd.DataFrame(
+                {"Firmenname": ["NATURSTROM AG", "Albwerk"], "Telefon": ["2", "3"]}
+            ),
+        }
+    ).set_index("name_normalized")
+    assert result["Firmenname"].tolist() == ["Naturstrom AG", "Albwerk"]
+    assert result["Telefon"].tolist() == ["1", "3"]
+
+
+def test_flags_of_joined_tables_combined():
+    first = outer_join(
+        {
+            "A": pd.DataFrame({"Firmenname": ["Albwerk"]}),
+            "B": pd.DataFrame({"Firmenname": ["Naturstrom"]}),
+        }
+    )
+    # as read back from the csv written by the notebooks
+    csv = io.StringIO()
+    first.to_csv(csv)
+    csv.seek(0)
+    read = pd.read_csv(csv).replace({False: None})
+    result = outer_join(
+        {
+            "AB": read,
+            "C": pd.DataFrame({"Firmenname": ["Naturstrom"], "A": [True]}),
+        }
+    ).set_index("Firmenname")
+    assert "Unnamed: 0" not in result
+    assert result["A"].to_dict() == {"Albwerk": True, "Naturstrom": True}
+    assert result["B"].to_dict() == {"Albwerk": False, "Naturstrom": True}
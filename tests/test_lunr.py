@@ -0,0 +1,14 @@
+import json
+from pathlib import Path
+
+from rowo_oekostrom_recherche import lunr
+
+COMMITTED = Path(__file__).parents[1] / "indexanddata.json"
+
+
+def test_builds_committed_index():
+    committed = json.loads(COMMITTED.read_text())
+    builder = lunr.Builder("index", committed["idx"]["fields"])
+    for document in committed["store"]:
+        builder.add(document)
+    assert builder.build() == committed["idx"]
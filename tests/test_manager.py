@@ -0,0 +1,81 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from rowo_oekostrom_recherche import metrics
+from rowo_oekostrom_recherche.scraper import manager
+from rowo_oekostrom_recherche.scraper.base import ScrapeResults
+from rowo_oekostrom_recherche.scraper.models import OkPower, Stromauskunft
+
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="the stub scrapers are inherited by forked workers only",
+)
+PREVIOUS = {"source": "verivox", "create": "2024-08-04T09:50:08", "results": []}
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(manager, "DATA_DIR", tmp_path)
+    (tmp_path / "verivox.json").write_text(json.dumps(PREVIOUS))
+    # both wait for each other, so they only finish when run at the same time
+    barrier = multiprocessing.Barrier(2, timeout=10)
+
+    def okpower() -> ScrapeResults:
+        barrier.wait()
+        metrics.count("ok", 2)
+        return ScrapeResults(
+            results=[
+                OkPower(name=n, tarif="", tarif_url="", cert_info=str(os.getpid()))
+                for n in ("Albwerk GmbH", "Naturstrom AG")
+            ],
+            source="okpower",
+        )
+
+    def stromauskunft() -> ScrapeResults:
+        barrier.wait()
+        metrics.count("ok")
+        return ScrapeResults(
+            results=[Stromauskunft(name="Mainova", portal_url=str(os.getpid()))],
+            source="stromauskunft",
+        )
+
+    def verivox() -> ScrapeResults:
+        raise ValueError("portal changed")
+
+    stubs = {"okpower": okpower, "stromauskunft": stromauskunft, "verivox": verivox}
+    monkeypatch.setattr(manager, "scraper", stubs.__getitem__)
+    return tmp_path
+
+
+def results(path) -> list[dict]:
+    return json.loads(path.read_text())["results"]
+
+
+def test_run_all(data_dir, capsys):
+    reports = manager.run_all(["verivox", "stromauskunft", "okpower"], jobs=3)
+
+    assert [(r.source, r.ok, r.records) for r in reports] == [
+        ("okpower", True, 2),
+        ("stromauskunft", True, 1),
+        ("verivox", False, 0),
+    ]
+    assert "portal changed" in reports[2].error
+    # run in their own processes
+    okpower = results(data_dir / "okpower.json")
+    stromauskunft = results(data_dir / "stromauskunft.json")
+    pids = {okpower[0]["cert_info"], stromauskunft[0]["portal_url"]}
+    assert len(pids) == 2
+    assert str(os.getpid()) not in pids
+    assert [r["name"] for r in okpower] == ["Albwerk GmbH", "Naturstrom AG"]
+    assert (data_dir / "okpower.jsonl").exists()
+    # the failed scraper keeps its previous results
+    assert json.loads((data_dir / "verivox.json").read_text()) == PREVIOUS
+    assert not (data_dir / "verivox.jsonl").exists()
+    # the metrics of each worker, without those of the others
+    assert reports[0].metrics.counters == {"": {"ok": 2}}
+    assert reports[1].metrics.counters == {"": {"ok": 1}}
+    assert "FAILED" in capsys.readouterr().out
+
@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+
+from rowo_oekostrom_recherche import log, metrics
+
+
+def events(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_span_observed_and_written(metrics_file):
+    with metrics.span("fetch", source="okpower", url="https://example.org"):
+        assert metrics.current_source() == "okpower"
+    assert metrics.current_source() == ""
+
+    histogram = metrics.snapshot().histograms["okpower"]["fetch"]
+    assert histogram.count == 1
+    [event] = events(metrics_file)
+    assert event["type"] == "span"
+    assert event["name"] == "fetch"
+    assert event["source"] == "okpower"
+    assert event["url"] == "https://example.org"
+    assert event["ok"] is True
+    assert event["seconds"] == pytest.approx(histogram.total, abs=1e-6)
+
+
+def test_failed_span_marked(metrics_file):
+    with pytest.raises(ValueError):
+        with metrics.span("parse", source="verivox"):
+            raise ValueError("broken page")
+
+    assert metrics.snapshot().histograms["verivox"]["parse"].count == 1
+    assert events(metrics_file)[0]["ok"] is False
+
+
+def test_span_as_decorator():
+    @metrics.span("scrape", source="oekotest")
+    def scrape() -> str:
+        metrics.count("ok")
+        return metrics.current_source()
+
+    assert scrape() == "oekotest"
+    assert metrics.snapshot().counters == {"oekotest": {"ok": 1}}
+
+
+def test_count_per_source():
+    metrics.count("ok")
+    metrics.count("ok", 2, source="okpower")
+    with metrics.span("parse", source="okpower"):
+        metrics.count("failed")
+        metrics.count("ok")
+
+    assert metrics.snapshot().counters == {
+        "": {"ok": 1},
+        "okpower": {"ok": 3, "failed": 1},
+    }
+
+
+def test_source_inherited_by_tasks():
+    async def fetch() -> None:
+        metrics.count("retried")
+
+    async def run() -> None:
+        with metrics.span("scrape", source="verivox"):
+            await asyncio.gather(fetch(), fetch())
+
+    asyncio.run(run())
+    assert metrics.snapshot().counters == {"verivox": {"retried": 2}}
+
+
+def test_log_info_written(metrics_file, capsys):
+    with metrics.span("scrape", source="okpower"):
+        log.info("Start scraping", scraper="okpower")
+
+    assert capsys.readouterr().out == "INFO: Start scraping scraper=okpower\n"
+    event = events(metrics_file)[0]
+    assert {k: event[k] for k in ("type", "name", "source", "scraper")} == {
+        "type": "log",
+        "name": "Start scraping",
+        "source": "okpower",
+        "scraper": "okpower",
+    }
+
+
+def test_no_sink_writes_nothing(metrics_file):
+    metrics.set_sink(None)
+    with metrics.span("write"):
+        log.info("Saved")
+
+    assert not metrics_file.exists()
+    assert metrics.snapshot().histograms[""]["write"].count == 1
@@ -0,0 +1,162 @@
+import asyncio
+import datetime
+import email.utils
+import time
+
+import httpx
+import pytest
+
+from rowo_oekostrom_recherche import metrics
+from rowo_oekostrom_recherche.scraper.base import (
+    RequestPolicy,
+    TokenBucket,
+    host_bucket,
+    host_stats,
+)
+from rowo_oekostrom_recherche.scraper.http_cache import PolicyTransport
+
+POLICY = RequestPolicy(rate=1000, burst=1000, retries=2, backoff=1, max_backoff=3)
+
+
+def in_seconds(seconds: float) -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+        seconds=seconds
+    )
+
+
+@pytest.mark.parametrize("attempt, delay", [(1, 1), (2, 2), (3, 3), (10, 3)])
+def test_delay_backoff(attempt, delay):
+    assert POLICY.delay(attempt) == delay
+
+
+@pytest.mark.parametrize(
+    "retry_after, delay", [("2", 2), (" 0 ", 0), ("120", 3), ("soon", 1)]
+)
+def test_delay_retry_after_seconds(retry_after, delay):
+    assert POLICY.delay(1, retry_after) == delay
+
+
+@pytest.mark.parametrize("naive", [False, True])
+def test_delay_retry_after_date(naive):
+    date = in_seconds(30)
+    if naive:
+        # formatted with a `-0000` zone, parsed as naive date
+        retry_after = email.utils.format_datetime(date.replace(tzinfo=None))
+    else:
+        retry_after = email.utils.format_datetime(date, usegmt=True)
+    policy = POLICY.model_copy(update={"max_backoff": 60})
+    assert policy.delay(1, retry_after) == pytest.approx(30, abs=2)
+
+
+def test_delay_retry_after_date_passed():
+    past = email.utils.format_datetime(in_seconds(-60), usegmt=True)
+    assert POLICY.delay(1, past) == 0
+
+
+def test_token_bucket_reserve(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=2, burst=2)
+
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0]
+    now[0] += 0.5
+    # the tokens reserved ahead are refilled first
+    assert bucket.reserve() == 1.0
+    now[0] += 10
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0.5]
+
+
+def test_host_bucket_per_policy():
+    bucket = host_bucket("bucket.example.org", POLICY)
+    assert host_bucket("bucket.example.org", POLICY.model_copy()) is bucket
+    slow = host_bucket("bucket.example.org", RequestPolicy(rate=0.5, burst=1))
+    assert slow is not bucket
+    assert (slow.rate, slow.capacity) == (0.5, 1)
+    assert host_bucket("other.example.org", POLICY) is not bucket
+
+
+@pytest.fixture
+def sleeps(monkeypatch) -> list[float]:
+    waited: list[float] = []
+
+    async def async_sleep(seconds: float) -> None:
+        waited.append(seconds)
+
+    monkeypatch.setattr(time, "sleep", waited.append)
+    monkeypatch.setattr(asyncio, "sleep", async_sleep)
+    return waited
+
+
+def responses(*statuses: int | None) -> httpx.MockTransport:
+    """
+    Answer with the statuses in order, None raising a connect error
+    """
+    remaining = list(statuses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = remaining.pop(0)
+        if status is None:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(status, headers={"Retry-After": "2"})
+
+    return httpx.MockTransport(handler)
+
+
+def get(host: str, transport: httpx.MockTransport, use_async: bool) -> int:
+    url = f"https://{host}/page"
+    if use_async:
+
+        async def fetch() -> int:
+            async with httpx.AsyncClient(
+                transport=PolicyTransport(transport, POLICY)
+            ) as client:
+                return (await client.get(url)).status_code
+
+        return asyncio.run(fetch())
+    with httpx.Client(transport=PolicyTransport(transport, POLICY)) as client:
+        return client.get(url).status_code
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_retried_until_success(sleeps, use_async):
+    host = f"retry-{use_async:d}.example.org"
+
+    status = get(host, responses(503, None, 200), use_async)
+
+    assert status == 200
+    # Retry-After of the response, backoff after the connect error
+    assert [s for s in sleeps if s] == [2, 2]
+    stats = host_stats(host)
+    assert (stats.requests, stats.retries, stats.failures) == (3, 2, 0)
+    assert metrics.snapshot().counters[""] == {"retried": 2}
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_gives_up_on_status(sleeps, use_async):
+    host = f"status-{use_async:d}.example.org"
+
+    assert get(host, responses(429, 429, 429), use_async) == 429
+
+    stats = host_stats(host)
+    assert (stats.requests, stats.retries, stats.failures) == (3, 2, 1)
+    assert metrics.snapshot().counters[""] == {"retried": 2, "request_failed": 1}
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_gives_up_on_transport_error(sleeps, use_async):
+    host = f"error-{use_async:d}.example.org"
+
+    with pytest.raises(httpx.ConnectError):
+        get(host, responses(None, None, None), use_async)
+
+    assert [s for s in sleeps if s] == [1, 2]
+    assert host_stats(host).failures == 1
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_other_status_not_retried(sleeps, use_async):
+    host = f"missing-{use_async:d}.example.org"
+
+    assert get(host, responses(404), use_async) == 404
+    assert host_stats(host).retries == 0
+    assert not [s for s in sleeps if s]
@@ -0,0 +1,90 @@
+import openpyxl
+import pytest
+
+from rowo_oekostrom_recherche.scraper import rowo_2019
+from rowo_oekostrom_recherche.scraper.models import RoWo
+
+HEADER = [
+    "Nr",
+    "Erneuerbare Energien 1",
+    "Adresse",
+    "PLZ",
+    "Stadt",
+    "Telefon",
+    "Kontakt (nur für relevante Anbieter)",
+    "URL",
+    "Kennzeichnung Link",
+]
+
+
+def write_sheet(path, rows: list[list[object]]) -> None:
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    assert sheet is not None
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def test_read_records(tmp_path):
+    path = tmp_path / "anbieter.xlsx"
+    write_sheet(
+        path,
+        [
+            HEADER,
+            [
+                1,
+                "Albwerk GmbH",
+                "Eybstr. 98",
+                73312.0,
+                "Geislingen",
+                7331209,
+                "n/a",
+                "www.albwerk.de",
+                "https://www.albwerk.de/kennzeichnung",
+            ],
+            [None] * len(HEADER),
+            [2, "Naturstrom AG", None, 40477, "Düsseldorf", "0211 1", "NA"],
+            [None, "Nur Name"],
+        ],
+    )
+
+    assert list(rowo_2019.read_records(path)) == [
+        RoWo(
+            name="Albwerk GmbH",
+            street="Eybstr. 98",
+            city="Geislingen",
+            plz="73312",
+            phone="7331209",
+            mail="",
+            homepage="http://www.albwerk.de",
+            kennzeichnung_url="https://www.albwerk.de/kennzeichnung",
+        ),
+        RoWo(
+            name="Naturstrom AG",
+            street="",
+            city="Düsseldorf",
+            plz="40477",
+            phone="0211 1",
+            mail="",
+            homepage="",
+            kennzeichnung_url="",
+        ),
+        RoWo(name="Nur Name"),
+    ]
+
+
+def test_missing_column(tmp_path):
+    path = tmp_path / "anbieter.xlsx"
+    write_sheet(path, [[c for c in HEADER if c != "PLZ"], ["Albwerk GmbH"]])
+
+    with pytest.raises(ValueError, match="Missing columns .*: PLZ"):
+        list(rowo_2019.read_records(path))
+
+
+@pytest.mark.parametrize(
+    "value, text",
+    [(None, ""), (float("nan"), ""), (12.0, "12"), (12.5, "12.5"), ("#N/A", "")],
+)
+def test_to_string(value, text):
+    assert rowo_2019.to_string(value) == text
@@ -0,0 +1,105 @@
+import pytest
+from thefuzz import fuzz, process
+
+from rowo_oekostrom_recherche import metrics, scoring
+from rowo_oekostrom_recherche.candidates import CandidateIndex
+from rowo_oekostrom_recherche.scoring import LIMIT, SCORE_CUTOFF, CandidateScores
+from rowo_oekostrom_recherche.scraper.base import NameNormal
+
+TARGETS = [
+    NameNormal(name)
+    for name in (
+        "albwerk",
+        "naturstrom",
+        "hochsauerland",
+        "elektrizitaetswerke schoenau",
+        "buergerwerke",
+        "gemeindewerke hassloch",
+        "energieversorgung filstal",
+        "mainova",
+        "stadtwerk hassfurt",
+        "greenpeace energy",
+        "polarstern",
+        "westfalenwind",
+    )
+]
+QUERIES = [
+    NameNormal(name)
+    for name in (
+        "albwerk geislingen",
+        "naturstrom ag",
+        "hochsauerlandenergie",
+        "elektrizitaetswerk schoenau",
+        "buergerwerk",
+        "gemeindewerk hassloch",
+        "filstal energieversorgung",
+        "stadtwerke hassfurt",
+        "green planet energy",
+        "westfalen wind",
+        "voellig unbekannt",
+    )
+]
+
+
+def expected(index: CandidateIndex, query: NameNormal) -> scoring.Scored:
+    candidates = sorted(index.candidates(query))
+    return process.extractBests(
+        query, candidates, limit=LIMIT, score_cutoff=SCORE_CUTOFF
+    )
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_precomputed_as_extract_bests(monkeypatch, jobs):
+    # several chunks, scored in worker processes for jobs > 1
+    monkeypatch.setattr(scoring, "CHUNK_SIZE", 3)
+    index = CandidateIndex(TARGETS)
+    scores = CandidateScores(index)
+
+    scores.precompute(QUERIES, jobs=jobs)
+
+    assert scores.scores.keys() == set(QUERIES)
+    for query in QUERIES:
+        assert scores.get(query) == expected(index, query)
+
+
+def test_scores_are_wratio():
+    index = CandidateIndex(TARGETS)
+    scores = CandidateScores(index)
+    scores.precompute(QUERIES, jobs=1)
+
+    for query in QUERIES:
+        for target, score in scores.get(query):
+            assert score == fuzz.WRatio(query, target) >= SCORE_CUTOFF
+
+
+def test_keys_added_after_precompute_scored():
+    index = CandidateIndex(TARGETS)
+    scores = CandidateScores(index)
+    scores.precompute(QUERIES, jobs=1)
+
+    index.add(NameNormal("albwerk geislingen gmbh"))
+    index.add(NameNormal("westfalen wind strom"))
+
+    for query in QUERIES:
+        assert sorted(scores.get(query), key=lambda s: (-s[1], s[0])) == sorted(
+            expected(index, query), key=lambda s: (-s[1], s[0])
+        )
+
+
+def test_not_precomputed_scored_on_access():
+    index = CandidateIndex(TARGETS)
+    scores = CandidateScores(index)
+
+    assert scores.get(QUERIES[0]) == expected(index, QUERIES[0])
+    assert not scores.scores
+
+
+def test_timed_for_source():
+    scores = CandidateScores(CandidateIndex(TARGETS))
+    scores.precompute(QUERIES[:2], jobs=1, source="okpower")
+    scores.precompute(QUERIES, jobs=1, source="verivox")
+
+    histograms = metrics.snapshot().histograms
+    assert histograms.keys() == {"okpower", "verivox"}
+    assert histograms["okpower"]["score"].count == 1
+    assert histograms["verivox"]["score"].count == 1
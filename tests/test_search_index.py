@@ -0,0 +1,90 @@
+import gzip
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from rowo_oekostrom_recherche import search_index
+from rowo_oekostrom_recherche.search_index import fold, shard_documents, shard_keys
+
+SEARCH_DIR = Path(__file__).parents[1] / "docs" / "datenquellen" / "suche"
+PAGE = SEARCH_DIR.parent / "index.html"
+QUERIES = ["e", "St", "Stadtwerke", "Stadtwerke M", "Ökostrom", "eins", "1", "x"]
+
+
+def document(name: str) -> search_index.Document:
+    return {
+        "index": 0,
+        "Firmenname": name,
+        "URL": "",
+        "Stadt": "",
+        "PLZ": "",
+        "Adresse": "",
+        "Telefon": "",
+        "Quellen": {},
+    }
+
+
+def assert_found(shards: dict[str, list[str]], query: str) -> None:
+    selected = shard_keys(shards, query)
+    found = {name for key in selected for name in shards[key]}
+    expected = {
+        name
+        for names in shards.values()
+        for name in names
+        if fold(name).startswith(fold(query))
+    }
+    assert expected <= found, query
+
+
+def test_shards_of_committed_index():
+    manifest = search_index.Manifest.model_validate_json(
+        SEARCH_DIR.joinpath("index.json").read_text()
+    )
+    shards = {}
+    for key, shard in manifest.shards.items():
+        content = gzip.decompress(SEARCH_DIR.joinpath(shard.file).read_bytes())
+        shards[key] = [d["Firmenname"] for d in json.loads(content)["store"]]
+    # "stadtwerke" is split into several shards
+    assert len(shard_keys(shards, "Stadtwerke")) > 2
+    for query in QUERIES:
+        assert_found(shards, query)
+
+
+def test_shards_of_split_prefixes(monkeypatch):
+    monkeypatch.setattr(search_index, "MAX_SHARD_DOCUMENTS", 4)
+    monkeypatch.setattr(search_index, "MIN_SHARD_DOCUMENTS", 2)
+    names = [f"Stadtwerke {c}{i}" for c in "MMMMNNNA" for i in range(2)] + [
+        "Stadt Eins",
+        "Süd",
+        "Energie",
+        "Elektro",
+        "Emma",
+        "!",
+    ]
+    shards = {
+        key: [d["Firmenname"] for d in documents]
+        for key, documents in shard_documents(map(document, names)).items()
+    }
+    assert len(shards) > 3
+    for query in [*QUERIES, "Stadtwerke A", "Stadt", "!"]:
+        assert_found(shards, query)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_page_selects_the_same_shards():
+    html = PAGE.read_text()
+    start = html.index("     function fold(")
+    end = html.index("     // the terms of the index")
+    keys = list(json.loads(SEARCH_DIR.joinpath("index.json").read_text())["shards"])
+    script = html[start:end] + (
+        f"const keys = {json.dumps(keys)};\n"
+        f"console.log(JSON.stringify({json.dumps(QUERIES)}.map("
+        "(q) => shardKeys(keys, q, false))));"
+    )
+    output = subprocess.run(
+        ["node", "-e", script], capture_output=True, text=True, check=True
+    ).stdout
+    assert json.loads(output) == [shard_keys(keys, q) for q in QUERIES]
@@ -0,0 +1,47 @@
+import pytest
+
+from rowo_oekostrom_recherche.selections import SelectionStore
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return tmp_path / "combine_selections.csv"
+
+
+def test_missing_final_newline_kept(journal):
+    journal.write_bytes(b"okpower;A;B\nokpower;C;D")
+    store = SelectionStore(journal)
+    assert store.as_dict() == {("okpower", "A"): "B", ("okpower", "C"): "D"}
+    store.add("verivox", "E", None)
+    assert journal.read_bytes() == b"okpower;A;B\nokpower;C;D\nverivox;E;\n"
+    assert len(SelectionStore(journal)) == 3
+
+
+def test_torn_last_line_dropped(journal, capsys):
+    journal.write_bytes(b"okpower;A;B\nokpower;C")
+    store = SelectionStore(journal)
+    assert store.as_dict() == {("okpower", "A"): "B"}
+    assert "Dropping incomplete line" in capsys.readouterr().out
+    assert journal.read_bytes() == b"okpower;A;B\n"
+    assert not journal.with_suffix(".tmp").exists()
+
+
+@pytest.mark.parametrize(
+    "content, kept",
+    [
+        (b"okpower;A;B\r\nokpower;C;-1\r\n", b"okpower;A;B\r\nokpower;C;-1\r\n"),
+        (b"okpower;A;B\r\nokpower;C;-1\r\nok", b"okpower;A;B\r\nokpower;C;-1\r\n"),
+        (b"okpower;A;B\r\nokpower;C;-1", b"okpower;A;B\r\nokpower;C;-1\n"),
+    ],
+)
+def test_crlf_journal(journal, content, kept):
+    journal.write_bytes(content)
+    store = SelectionStore(journal)
+    assert store.as_dict() == {("okpower", "A"): "B", ("okpower", "C"): "-1"}
+    assert journal.read_bytes() == kept
+
+
+def test_empty_choice_is_new_entry(journal):
+    store = SelectionStore(journal)
+    store.add("okpower", "A", None)
+    assert SelectionStore(journal)["okpower", "A"] is None
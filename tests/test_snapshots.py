@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from rowo_oekostrom_recherche import metrics, snapshots
+from rowo_oekostrom_recherche.scraper.models import OkPower, Stromauskunft
+
+RESULTS = {
+    "source": "okpower",
+    "create": "2024-08-04T09:49:57",
+    "results": [
+        {
+            "name": "Albwerk GmbH & Co. KG",
+            "plz": "73312",
+            "tarif": "ok-power Alb.NaturStrom",
+            "tarif_url": "",
+            "cert_info": "",
+        }
+    ],
+}
+
+
+@pytest.fixture
+def source_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", tmp_path / "snapshots")
+    path = tmp_path / "okpower.json"
+    path.write_text(json.dumps(RESULTS))
+    return path
+
+
+def cache_hits() -> int:
+    return metrics.snapshot().counters.get("", {}).get("cache_hit", 0)
+
+
+def test_validated_once(source_file):
+    first = snapshots.load_results(source_file, OkPower)
+    assert [p.name for p in snapshots.SNAPSHOT_DIR.iterdir()] == [
+        snapshots.snapshot_path(source_file, source_file.read_bytes(), OkPower).name
+    ]
+    assert cache_hits() == 0
+    second = snapshots.load_results(source_file, OkPower)
+    assert cache_hits() == 1
+    assert second.results == first.results
+    assert second.results[0].name_normalized == first.results[0].name_normalized
+    assert (second.source, second.create) == (first.source, first.create)
+
+
+def test_changed_file_replaces_snapshot(source_file):
+    snapshots.load_results(source_file, OkPower)
+    source_file.write_text(json.dumps({**RESULTS, "create": "2024-08-05T10:00:00"}))
+    results = snapshots.load_results(source_file, OkPower)
+    assert cache_hits() == 0
+    assert results.create.day == 5
+    assert len(list(snapshots.SNAPSHOT_DIR.iterdir())) == 1
+
+
+def test_snapshot_per_model(source_file):
+    content = source_file.read_bytes()
+    assert snapshots.snapshot_path(
+        source_file, content, OkPower
+    ) != snapshots.snapshot_path(source_file, content, Stromauskunft)
+
+
+def test_broken_snapshot_ignored(source_file, capsys):
+    snapshots.load_results(source_file, OkPower)
+    (snapshot,) = snapshots.SNAPSHOT_DIR.iterdir()
+    snapshot.write_bytes(b"broken")
+    results = snapshots.load_results(source_file, OkPower)
+    assert results.results[0].plz == "73312"
+    assert "Ignoring broken snapshot" in capsys.readouterr().out
+    assert snapshot.read_bytes() != b"broken"
+
+
+def test_invalid_file_raises(source_file):
+    source_file.write_text(json.dumps({**RESULTS, "results": [{"plz": "1"}]}))
+    with pytest.raises(Exception, match="validation error"):
+        snapshots.load_results(source_file, OkPower)
+    assert not snapshots.SNAPSHOT_DIR.exists()
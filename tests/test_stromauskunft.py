@@ -0,0 +1,62 @@
+import json
+import lzma
+from pathlib import Path
+
+import bs4
+
+from rowo_oekostrom_recherche.scraper import stromauskunft
+from rowo_oekostrom_recherche.scraper.models import Stromauskunft
+
+RECORDING = (
+    Path(__file__).parents[1] / "benchmarks" / "recorded" / "stromauskunft.json.xz"
+)
+
+
+def soup_row(data: str) -> Stromauskunft:
+    """
+    The conversion of a row before `RowExtractor`, building a soup
+    """
+    soup = bs4.BeautifulSoup(data, "html.parser")
+    link = soup.find_all("a")[0]
+    plz_city = soup.select(".carrier-city")[0].text
+    return Stromauskunft(
+        name=link["title"],
+        street=soup.select(".carrier-street")[0].text,
+        city=plz_city.partition(" ")[2],
+        plz=plz_city.partition(" ")[0],
+        portal_url=stromauskunft.BASE_URL + link["href"].lstrip("/"),
+    )
+
+
+def test_extractor_matches_soup_on_recorded_page():
+    pages = json.loads(lzma.decompress(RECORDING.read_bytes()))
+    rows = json.loads(pages[stromauskunft.DATA_URL])["data"]
+
+    results = stromauskunft.convert_all(rows)
+
+    assert len(results) == len(rows) > 0
+    assert results == [soup_row(row[1]) for row in rows]
+
+
+def test_row_without_title_fails(capsys):
+    rows: list[list[str | int]] = [
+        [0, '<a href="/a/">A</a><span class="carrier-city">1 B</span>'],
+        [
+            1,
+            '<a title="Albwerk" href="/albwerk/">Albwerk</a>'
+            '<span class="carrier-street">Weg 1</span>'
+            '<span class="carrier-city">73312 Geislingen</span>',
+        ],
+    ]
+
+    results = stromauskunft.convert_all(rows)
+
+    assert results[0] is None
+    assert "Failed checking row 0" in capsys.readouterr().out
+    assert results[1] == Stromauskunft(
+        name="Albwerk",
+        street="Weg 1",
+        city="Geislingen",
+        plz="73312",
+        portal_url=stromauskunft.BASE_URL + "albwerk/",
+    )
@@ -0,0 +1,119 @@
+import json
+
+import pandas as pd
+import pytest
+
+from rowo_oekostrom_recherche import tables
+from rowo_oekostrom_recherche.scraper.base import ScrapeResults
+from rowo_oekostrom_recherche.scraper.models import OkPower, Stromauskunft
+
+ROWS = [
+    {"rowo2019": "Naturstrom AG", "verivox": "Naturstrom", "score": 97},
+    {"rowo2019": "Ökostrom Eins", "verivox": ""},
+]
+COLUMNS = ["rowo2019", "verivox", "score"]
+
+
+def test_rows_round_trip(tmp_path):
+    path = tmp_path / "combined.jsonl"
+
+    tables.save_rows(path, ROWS, COLUMNS)
+
+    assert [p.name for p in tmp_path.iterdir()] == ["combined.jsonl"]
+    lines = path.read_text().splitlines()
+    assert lines[1] == '{"rowo2019":"Ökostrom Eins","verivox":""}'
+    assert list(tables.iter_rows(path)) == ROWS
+    assert tables.read_columns(path, ["verivox", "score"]) == {
+        "verivox": ["Naturstrom", ""],
+        "score": [97, None],
+    }
+    assert pd.read_json(path, lines=True)["rowo2019"].tolist() == [
+        "Naturstrom AG",
+        "Ökostrom Eins",
+    ]
+
+
+def test_results_round_trip(tmp_path):
+    data = ScrapeResults[OkPower](
+        results=[
+            OkPower(
+                name="Albwerk GmbH",
+                plz="73312",
+                tarif="ok-power Alb.NaturStrom",
+                tarif_url="https://www.albwerk.de",
+                cert_info="",
+            ),
+            OkPower(name="Naturstrom AG", tarif="", tarif_url="", cert_info=""),
+        ],
+        source="okpower",
+    )
+
+    path = tables.save_results(data, tmp_path)
+
+    assert path == tmp_path / "okpower.jsonl"
+    loaded = tables.load_results(path, OkPower)
+    assert loaded.source == "okpower"
+    assert loaded.results == data.results
+    assert tables.read_columns(path, ["name", "tarif"]) == {
+        "name": ["Albwerk GmbH", "Naturstrom AG"],
+        "tarif": ["ok-power Alb.NaturStrom", ""],
+    }
+
+
+def test_columns_of_all_models():
+    records = [
+        OkPower(name="Albwerk GmbH", tarif="", tarif_url="", cert_info=""),
+        Stromauskunft(name="Mainova", portal_url=""),
+    ]
+    columns = tables.columns_of(records)
+    assert columns[: len(OkPower.model_fields)] == list(OkPower.model_fields)
+    assert columns[-1] == "portal_url"
+    assert len(columns) == len(set(columns))
+
+
+def test_convert_all(tmp_path, capsys):
+    source = {
+        "source": "okpower",
+        "create": "2024-08-04T09:50:08",
+        "results": [{"name": "Albwerk GmbH", "tarif": "ok-power"}],
+    }
+    (tmp_path / "okpower.json").write_text(json.dumps(source))
+    (tmp_path / "combined.json").write_text(json.dumps(ROWS))
+    (tmp_path / "combine_state.json").write_text(json.dumps({"target_hash": ""}))
+
+    tables.convert_all(tmp_path)
+
+    assert sorted(p.name for p in tmp_path.glob("*.jsonl")) == [
+        "combined.jsonl",
+        "okpower.jsonl",
+    ]
+    assert list(tables.iter_rows(tmp_path / "combined.jsonl")) == ROWS
+    assert list(tables.iter_rows(tmp_path / "okpower.jsonl")) == source["results"]
+    assert capsys.readouterr().out.splitlines() == [
+        "Wrote table of combined.json",
+        "Wrote table of okpower.json",
+    ]
+
+
+def test_parquet_as_strings(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(tables, "HAS_ARROW", True)
+    monkeypatch.setattr(tables, "BATCH_SIZE", 1)
+    path = tmp_path / "combined.jsonl"
+
+    tables.save_rows(path, ROWS, COLUMNS)
+
+    assert tables.read_columns(path.with_suffix(".parquet"), ["score"]) == {
+        "score": ["97", ""]
+    }
+    assert tables.read_columns(
+        path.with_suffix(".parquet"), ["rowo2019"]
+    ) == tables.read_columns(path, ["rowo2019"])
+
+
+def test_no_parquet_without_arrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(tables, "HAS_ARROW", False)
+
+    tables.save_rows(tmp_path / "combined.jsonl", ROWS, COLUMNS)
+
+    assert not (tmp_path / "combined.parquet").exists()
@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+import pytest
+
+from rowo_oekostrom_recherche.scraper import verivox
+
+CARRIERS = [
+    ("Albwerk", "albwerk", "Albwerk GmbH", "Weg 1", "73312 Geislingen"),
+    ("Naturstrom", "naturstrom", "Naturstrom AG", "Parkstr. 1", "40477 Düsseldorf"),
+    ("Polarstern", "polarstern", "Polarstern GmbH", "Kistlerstr. 1", "80337 München"),
+    ("Mainova", "mainova", "Mainova AG", "Solmsstr. 38", "60486 Frankfurt am Main"),
+]
+# listed again with another page, never fetched
+DUPLICATE = ("Naturstrom", "naturstrom-2")
+MISSING = ("Unbekannt", "unbekannt")
+
+
+def overview() -> str:
+    entries = [(name, path) for name, path, *_ in CARRIERS[:2]]
+    entries += [DUPLICATE, *((name, path) for name, path, *_ in CARRIERS[2:])]
+    entries.append(MISSING)
+    return "".join(
+        f'<a class="carrier-list-entry" href="strom/anbieter/{path}/">{name}</a>'
+        for name, path in entries
+    )
+
+
+def detail(path: str) -> httpx.Response:
+    for _, carrier_path, *lines in CARRIERS:
+        if path == f"/strom/anbieter/{carrier_path}/":
+            return httpx.Response(
+                200, html=f'<div class="carrier-address">{"<br>".join(lines)}</div>'
+            )
+    return httpx.Response(404)
+
+
+@pytest.fixture
+def fetched(monkeypatch) -> list[str]:
+    paths: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        if str(request.url) == verivox.BASE_URL:
+            return httpx.Response(200, html=overview())
+        return detail(request.url.path)
+
+    async def async_handler(request: httpx.Request) -> httpx.Response:
+        # the earlier carriers answer last
+        position = next(
+            (i for i, c in enumerate(CARRIERS) if c[1] in request.url.path), 0
+        )
+        await asyncio.sleep(0.01 * (len(CARRIERS) - position))
+        return handler(request)
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(verivox, "get_client", lambda: client)
+    monkeypatch.setattr(
+        verivox,
+        "get_async_client",
+        lambda limits: httpx.AsyncClient(transport=httpx.MockTransport(async_handler)),
+    )
+    return paths
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_scrape(fetched, concurrency):
+    results = verivox.scrape(concurrency=concurrency).results
+
+    assert [(r.name, r.portal_url) for r in results] == [
+        (name, f"{verivox.BASE_URL}{path}/")
+        for name, path, *_ in [*CARRIERS, MISSING]
+    ]
+    assert [(r.street, r.plz, r.city) for r in results[:-1]] == [
+        (street, *plz_city.split(" ", 1)) for *_, street, plz_city in CARRIERS
+    ]
+    assert results[-1].street == ""
+    assert "404" in results[-1].note
+    assert f"/strom/anbieter/{DUPLICATE[1]}/" not in fetched
+    assert len(fetched) == len(CARRIERS) + 2
+
+
+def test_async_same_as_sync(fetched):
+    assert (
+        verivox.scrape(concurrency=4).results
+        == verivox.scrape(concurrency=1).results
+    )